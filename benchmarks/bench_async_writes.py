@@ -0,0 +1,60 @@
+"""Sync vs background output writes against storage with artificial latency.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_async_writes [--files N] [--latency-ms MS]
+
+SlowFileManager sleeps before every write to stand in for a slow or networked
+disk; the async rows show how much of that latency the writer threads hide.
+"""
+import argparse
+import os
+import tempfile
+import time
+from template_parser.async_file_manager import AsyncFileManager
+from template_parser.file_manager import FileManager
+
+IO_THREADS = (1, 2, 4, 8, 16)
+
+
+class SlowFileManager(FileManager):
+    def __init__(self, latency: float):
+        super().__init__()
+        self.latency = latency
+
+    def write_json(self, file_path, data, indent=None):
+        time.sleep(self.latency)
+        super().write_json(file_path, data, indent)
+
+
+def write_all(file_manager, directory, count):
+    document = {"id": 0, "items": list(range(50)), "name": "x" * 200}
+    start = time.perf_counter()
+    for n in range(count):
+        file_manager.write_json(os.path.join(directory, f"{n}.json"), document, indent=2)
+    file_manager.flush()
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=500, help='Files written per run (default: 500)')
+    parser.add_argument('--latency-ms', type=float, default=2.0, help='Added latency per write (default: 2 ms)')
+    parser.add_argument('--max-pending', type=int, default=64, help='Backpressure limit for the async writer')
+    args = parser.parse_args(argv)
+    latency = args.latency_ms / 1000
+
+    print(f"{'writer':>10} {'files/s':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        elapsed = write_all(SlowFileManager(latency), directory, args.files)
+        print(f"{'sync':>10} {args.files / elapsed:>10.0f}")
+    for threads in IO_THREADS:
+        with tempfile.TemporaryDirectory() as directory:
+            with AsyncFileManager(SlowFileManager(latency), threads, args.max_pending) as file_manager:
+                elapsed = write_all(file_manager, directory, args.files)
+            assert len(os.listdir(directory)) == args.files
+        print(f"{f'async x{threads}':>10} {args.files / elapsed:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
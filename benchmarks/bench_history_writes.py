@@ -0,0 +1,115 @@
+"""Throughput of concurrent history appends.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_history_writes [--mode threads|processes] [--entries N]
+
+In ``threads`` mode every writer shares one JsonLinesConfigManager, so writers
+that arrive during a commit are coalesced into the next one. In ``processes``
+mode each writer is a separate process; writers that find the history file
+locked spool their entries for the next lock holder to append.
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from unittest.mock import MagicMock
+from template_parser.config_manager import JsonLinesConfigManager
+from template_parser.file_manager import FileManager
+from template_parser.user_interface import UserInterface
+
+WRITER_COUNTS = (1, 2, 4, 8, 16, 32, 64)
+
+
+def slow_fsync(latency):
+    # Models storage whose fsync is slower than this machine's.
+    real_fsync = os.fsync
+
+    def fsync(fd):
+        real_fsync(fd)
+        time.sleep(latency)
+    os.fsync = fsync
+
+
+def make_history(history_path, fsync):
+    file_manager = FileManager(durability='per-file' if fsync else 'none')
+    return JsonLinesConfigManager(history_path, file_manager, MagicMock(spec=UserInterface))
+
+
+def make_entry(writer, n):
+    return {"output_filename": f"out-{writer}-{n}.json", "details": {"writer": str(writer), "n": str(n)}}
+
+
+def write_entries(history, writer, count, barrier):
+    barrier.wait()
+    for n in range(count):
+        history.save_config(make_entry(writer, n))
+
+
+def process_writer(history_path, fsync, writer, count, barrier, commits, fsync_latency):
+    if fsync_latency:
+        slow_fsync(fsync_latency)
+    history = make_history(history_path, fsync)
+    write_entries(history, writer, count, barrier)
+    with commits.get_lock():
+        commits.value += history.commits
+
+
+def run_threads(history_path, writers, per_writer, fsync, fsync_latency):
+    history = make_history(history_path, fsync)
+    history.load_config()
+    barrier = threading.Barrier(writers + 1)
+    threads = [threading.Thread(target=write_entries, args=(history, w, per_writer, barrier)) for w in range(writers)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, history.commits
+
+
+def run_processes(history_path, writers, per_writer, fsync, fsync_latency):
+    make_history(history_path, fsync).load_config()
+    barrier = multiprocessing.Barrier(writers + 1)
+    commits = multiprocessing.Value('i', 0)
+    processes = [multiprocessing.Process(target=process_writer, args=(history_path, fsync, w, per_writer, barrier, commits,
+                                                                         fsync_latency))
+                 for w in range(writers)]
+    for process in processes:
+        process.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for process in processes:
+        process.join()
+    return time.perf_counter() - start, commits.value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--mode', choices=('threads', 'processes'), default='threads')
+    parser.add_argument('--entries', type=int, default=2048, help='Total entries written per run (default: 2048)')
+    parser.add_argument('--no-fsync', action='store_true', help='Skip fsync to measure locking overhead alone')
+    parser.add_argument('--fsync-latency', type=float, default=0.0, metavar='MS',
+                        help='Add this many milliseconds to every fsync, to model slower storage (default: 0)')
+    args = parser.parse_args(argv)
+
+    run = run_threads if args.mode == 'threads' else run_processes
+    if args.mode == 'threads' and args.fsync_latency:
+        slow_fsync(args.fsync_latency / 1000)
+    print(f"{'writers':>8} {'entries/s':>12} {'entries/commit':>15}")
+    for writers in WRITER_COUNTS:
+        per_writer = max(1, args.entries // writers)
+        with tempfile.TemporaryDirectory() as directory:
+            history_path = os.path.join(directory, 'config.jsonl')
+            elapsed, commits = run(history_path, writers, per_writer, not args.no_fsync, args.fsync_latency / 1000)
+            total = len(make_history(history_path, False))
+        assert total == writers * per_writer, f"lost entries: wrote {writers * per_writer}, found {total}"
+        per_commit = f"{total / commits:.1f}" if commits else '-'
+        print(f"{writers:>8} {total / elapsed:>12.0f} {per_commit:>15}")
+
+
+if __name__ == '__main__':
+    main()
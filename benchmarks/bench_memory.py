@@ -0,0 +1,205 @@
+"""Peak memory of rendering large templates and appending to large histories.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_memory [--quick] [--filter TEXT]
+
+Every measurement runs in a fresh interpreter, once under tracemalloc (peak
+Python allocations) and once without it (growth of the peak RSS over the RSS
+after setup, from /proc, so Linux only). Both are checked against
+BUDGETS; the run fails with exit status 1 if any measurement is over budget.
+tests/test_memory.py checks the same budgets at the smallest sizes.
+"""
+import os
+import sys
+import json
+import random
+import argparse
+import tempfile
+import subprocess
+from typing import Callable, Dict, Tuple
+from .generators import generate_template, generate_value, placeholder_names
+
+MiB = 2 ** 20
+TEMPLATE_SIZES = (1 * MiB, 10 * MiB, 100 * MiB)
+HISTORY_SIZES = (10 ** 4, 10 ** 5, 10 ** 6)
+QUICK_TEMPLATE_SIZES = (1 * MiB, 10 * MiB)
+QUICK_HISTORY_SIZES = (10 ** 4, 10 ** 5)
+TEMPLATE_BLOCK_LEAVES = 2000
+TEMPLATE_VARIABLES = 20
+
+# Peak memory allowed per scenario: (bytes per byte of input, fixed bytes). The
+# input is the template file for renders and the history file for history saves.
+BUDGETS: Dict[str, Tuple[float, int]] = {
+    'render': (16.0, 32 * MiB),
+    'render --stream': (0.0, 16 * MiB),
+    'library render': (14.0, 32 * MiB),
+    'history append': (0.0, 8 * MiB),
+    'history index rebuild': (0.0, 8 * MiB),
+}
+
+
+def budget(scenario: str, input_size: int) -> int:
+    per_byte, fixed = BUDGETS[scenario]
+    return int(per_byte * input_size + fixed)
+
+
+def template_inputs() -> Dict[str, str]:
+    rng = random.Random(0)
+    return {name: generate_value(typ, rng) for name, typ in placeholder_names(TEMPLATE_VARIABLES)}
+
+
+def write_template(path: str, size: int) -> None:
+    # One generated block repeated until the file reaches size, so 100 MB
+    # templates are cheap to produce and have the shape of the small ones.
+    block = generate_template(TEMPLATE_BLOCK_LEAVES, depth=4, variables=TEMPLATE_VARIABLES)
+    with open(path, 'w') as f:
+        f.write('{"blocks": [')
+        written = 0
+        while written < size:
+            if written:
+                f.write(', ')
+            f.write(block)
+            written += len(block) + 2
+        f.write(']}')
+
+
+def write_history(path: str, entries: int) -> None:
+    with open(path, 'w') as f:
+        for number in range(entries):
+            f.write(json.dumps({"output_filename": f"output_{number}.json",
+                                "details": {"TemplateName": f"output_{number}", "number": str(number)}}) + '\n')
+
+
+def prepare(scenario: str, size: int, directory: str) -> Tuple[str, int]:
+    """Create the input for a scenario and return its path and size in bytes."""
+    if scenario.startswith('history'):
+        path = os.path.join(directory, 'files', 'config.jsonl')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_history(path, size)
+    else:
+        path = os.path.join(directory, 'files', 'templates', 'template.json')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_template(path, size)
+    return path, os.path.getsize(path)
+
+
+def workload(scenario: str, path: str) -> Callable[[], None]:
+    """Set up a scenario and return the operation whose peak memory is measured."""
+    from template_parser.main import build_application
+    from template_parser.file_manager import FileManager
+    from template_parser.config_manager import JsonLinesConfigManager
+    from template_parser.rendering import parse_template, render
+    from template_parser.user_interface import UserInterface
+    from .suite import ScriptedInputCollector
+
+    inputs = template_inputs()
+    user_interface = UserInterface(ScriptedInputCollector(inputs))
+    if scenario in ('render', 'render --stream'):
+        os.chdir(os.path.dirname(os.path.dirname(os.path.dirname(path))))
+        app = build_application(durability='none')
+        app.user_interface = app.config_manager.user_interface = user_interface
+        app.warm_up()
+        return lambda: app.run(path, stream=scenario == 'render --stream')
+    if scenario == 'library render':
+        def run():
+            with open(path, 'r') as f:
+                compiled = parse_template(f.read())
+            render(compiled, inputs, as_bytes=True)
+        return run
+    manager = JsonLinesConfigManager(path, FileManager(durability='none'), user_interface)
+    if scenario == 'history append':
+        manager.load_config()
+    elif os.path.exists(manager.index_path):
+        os.unlink(manager.index_path)
+    return lambda: manager.save_config({"output_filename": "output.json", "details": inputs})
+
+
+def measure(scenario: str, path: str, mode: str) -> int:
+    """Run a scenario in this process and return its peak memory in bytes."""
+    run = workload(scenario, path)
+    devnull = open(os.devnull, 'w')
+    stdout, sys.stdout = sys.stdout, devnull
+    try:
+        if mode == 'tracemalloc':
+            import tracemalloc
+            tracemalloc.start()
+            try:
+                run()
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        reset_peak_rss()
+        before = memory_status('VmRSS')
+        run()
+        return max(0, memory_status('VmHWM') - before)
+    finally:
+        sys.stdout = stdout
+        devnull.close()
+
+
+def memory_status(field: str) -> int:
+    # VmHWM rather than getrusage's ru_maxrss, which survives exec and so starts
+    # at the peak of whatever process spawned this one (a test runner, say).
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1]) * 1024
+    raise OSError(f"{field} not in /proc/self/status")
+
+
+def reset_peak_rss() -> None:
+    # Resets VmHWM to the current RSS, so setup does not count towards the peak.
+    with open('/proc/self/clear_refs', 'w') as f:
+        f.write('5')
+
+
+def measure_in_subprocess(scenario: str, path: str, mode: str) -> int:
+    output = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_memory', '--child', scenario, path, mode],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return int(output.split()[-1])
+
+
+def format_size(size: float) -> str:
+    return f"{size / MiB:.1f} MiB"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--quick', action='store_true', help='Skip the 100 MB template and the 10^6 entry history')
+    parser.add_argument('--filter', default='', help='Only run scenarios whose name contains this text')
+    parser.add_argument('--child', nargs=3, metavar=('SCENARIO', 'PATH', 'MODE'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        print(measure(*args.child))
+        return
+
+    template_sizes = QUICK_TEMPLATE_SIZES if args.quick else TEMPLATE_SIZES
+    history_sizes = QUICK_HISTORY_SIZES if args.quick else HISTORY_SIZES
+    over_budget = []
+    print(f"{'scenario':<24} {'input':>14} {'tracemalloc':>12} {'rss':>12} {'budget':>12}")
+    for scenario in BUDGETS:
+        if args.filter not in scenario:
+            continue
+        for size in history_sizes if scenario.startswith('history') else template_sizes:
+            with tempfile.TemporaryDirectory() as directory:
+                path, input_size = prepare(scenario, size, directory)
+                traced = measure_in_subprocess(scenario, path, 'tracemalloc')
+                rss = measure_in_subprocess(scenario, path, 'rss')
+            limit = budget(scenario, input_size)
+            label = f"{size} entries" if scenario.startswith('history') else format_size(input_size)
+            status = '' if max(traced, rss) <= limit else '  OVER'
+            print(f"{scenario:<24} {label:>14} {format_size(traced):>12} {format_size(rss):>12} {format_size(limit):>12}{status}",
+                  flush=True)
+            if status:
+                over_budget.append((scenario, label))
+
+    if over_budget:
+        print(f"FAIL: {len(over_budget)} measurement(s) over budget")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
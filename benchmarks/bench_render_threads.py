@@ -0,0 +1,60 @@
+"""Throughput of the library render() API with one template shared by a thread pool.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_render_threads [--renders N]
+
+Every thread renders the same CompiledTemplate with the same RenderConfig, as
+a service handling concurrent requests would. Results are checked against a
+single-threaded run, so the numbers are only reported for correct output.
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from template_parser.rendering import RenderConfig, parse_template, render
+
+THREADS = (1, 2, 4, 8, 16)
+
+TEMPLATE = json.dumps({
+    "customer": {"name": "<name>", "id": "<id:int>", "site": "<site:url>"},
+    "invoice": {
+        "issued": "<issued:date|format=%d %B %Y>",
+        "due": "<issued:date|format=%Y-%m-%d|add_days=30>",
+        "total": "<total:currency|currency_code=GBP>",
+        "summary": "Invoice for <name> (<id:int>) totalling <total:currency|format=short|currency_code=GBP>"
+    },
+    "lines": [{"sku": f"SKU-{n}", "quantity": n, "note": "static"} for n in range(20)]
+})
+
+
+def make_inputs(count):
+    return [
+        {'name': f'Customer {n}', 'id': str(n), 'site': f'https://example.com/{n}',
+         'issued': f'{n % 28 + 1:02d}-{n % 12 + 1:02d}-2024', 'total': f'{n * 3.5:.2f}'}
+        for n in range(count)
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--renders', type=int, default=20000, help='Renders per run (default: 20000)')
+    args = parser.parse_args(argv)
+
+    compiled = parse_template(TEMPLATE)
+    config = RenderConfig()
+    requests = make_inputs(args.renders)
+    expected = [render(compiled, inputs, config, as_bytes=True) for inputs in requests]
+
+    print(f"{'threads':>8} {'renders/s':>10}")
+    for threads in THREADS:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            start = time.perf_counter()
+            results = list(executor.map(lambda inputs: render(compiled, inputs, config, as_bytes=True), requests))
+            elapsed = time.perf_counter() - start
+        assert results == expected
+        print(f"{threads:>8} {args.renders / elapsed:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Cold-start budget for the CLI, measured with ``python -X importtime``.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_startup [--runs N] [--budget-ms MS]
+
+Imports ``template_parser.main`` in fresh interpreters, reports the fastest
+cumulative import time, and exits with status 1 when it exceeds the budget or
+when one of the heavy optional dependencies is imported before any command runs.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+# Cumulative import time of template_parser.main, in milliseconds.
+IMPORT_BUDGET_MS = 40.0
+HEAVY_MODULES = ('babel', 'num2words', 'dateutil', 'numpy')
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_import(module: str):
+    # Returns (cumulative microseconds, [(self microseconds, module name)]) for one cold import.
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    total = None
+    modules = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len('import time:'):].split('|'))
+        modules.append((int(self_us), name))
+        if name == module:
+            total = int(cumulative_us)
+    return total, modules
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10, help='Fresh interpreters to sample (default: 10)')
+    parser.add_argument('--budget-ms', type=float, default=IMPORT_BUDGET_MS,
+                        help=f'Maximum cumulative import time in ms (default: {IMPORT_BUDGET_MS})')
+    args = parser.parse_args(argv)
+
+    samples = [measure_import('template_parser.main') for _ in range(args.runs)]
+    best_us, modules = min(samples, key=lambda sample: sample[0])
+    best_ms = best_us / 1000
+    print(f"template_parser.main: {best_ms:.1f} ms (best of {args.runs}, budget {args.budget_ms:.1f} ms)")
+
+    failed = False
+    heavy = sorted({name.split('.')[0] for _, name in modules} & set(HEAVY_MODULES))
+    if heavy:
+        print(f"FAIL: imported at startup: {', '.join(heavy)}")
+        failed = True
+    if best_ms > args.budget_ms:
+        print("FAIL: over budget. Slowest modules (self time):")
+        for self_us, name in sorted(modules, reverse=True)[:10]:
+            print(f"  {self_us / 1000:7.1f} ms  {name.strip()}")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Deterministic synthetic templates, input rows and history entries for benchmarks."""
+import json
+import random
+from typing import Any, Dict, List, Sequence, Tuple
+from template_parser.template_processor import TemplateProcessor
+
+PLACEHOLDER_FORMATS = {
+    'str': '<{name}>',
+    'int': '<{name}:int>',
+    'float': '<{name}:float>',
+    'date': '<{name}:date|format=%d/%m/%Y|add_days=7>',
+    'currency': '<{name}:currency|currency_code=GBP>',
+    'url': '<{name}:url>',
+}
+DEFAULT_TYPES = tuple(PLACEHOLDER_FORMATS)
+
+
+def placeholder_names(variables: int = 20, types: Sequence[str] = DEFAULT_TYPES) -> List[Tuple[str, str]]:
+    """Return the (name, type) pairs generate_template draws its placeholders from."""
+    return [(f"{types[n % len(types)]}_{n}", types[n % len(types)]) for n in range(max(1, variables))]
+
+
+def generate_template(leaves: int = 100, depth: int = 3, density: float = 0.5, inline_ratio: float = 0.5,
+                      variables: int = 20, types: Sequence[str] = DEFAULT_TYPES, seed: int = 0) -> str:
+    """Return the JSON text of a template with exactly `leaves` scalar values.
+
+    Containers nest `depth` levels deep (alternating objects and arrays), a
+    `density` fraction of the leaves hold a placeholder, and an `inline_ratio`
+    fraction of those embed it in surrounding text instead of being the whole
+    value. Placeholders draw from `variables` names spread over `types`.
+    """
+    rng = random.Random(seed)
+    names = placeholder_names(variables, types)
+    branching = max(2, round(leaves ** (1 / depth))) if depth > 0 else leaves
+
+    def leaf() -> Any:
+        if rng.random() < density:
+            name, typ = rng.choice(names)
+            placeholder = PLACEHOLDER_FORMATS[typ].format(name=name)
+            if rng.random() < inline_ratio:
+                return f"Field {name} is {placeholder} in this document"
+            return placeholder
+        return rng.choice((rng.randint(0, 10 ** 6), f"static text {rng.randint(0, 999)}", True, None, 2.5))
+
+    def node(level: int, count: int) -> Any:
+        if level >= depth or count <= branching:
+            values = [leaf() for _ in range(count)]
+        else:
+            share, extra = divmod(count, branching)
+            values = [node(level + 1, share + (1 if n < extra else 0)) for n in range(branching)]
+        if level % 2:
+            return values
+        return {f"k{n}": value for n, value in enumerate(values)}
+
+    return json.dumps(node(0, leaves), indent=2)
+
+
+def generate_value(typ: str, rng: random.Random) -> str:
+    if typ == 'int':
+        return str(rng.randint(-10 ** 6, 10 ** 6))
+    if typ == 'float':
+        return f"{rng.uniform(-1000, 1000):.3f}"
+    if typ == 'date':
+        return f"{rng.randint(1, 28):02d}-{rng.randint(1, 12):02d}-{rng.randint(1990, 2030)}"
+    if typ == 'currency':
+        return f"{rng.uniform(0, 10 ** 6):.2f}"
+    if typ == 'url':
+        return f"https://example.com/item/{rng.randint(0, 10 ** 6)}"
+    return f"value {rng.randint(0, 10 ** 6)}"
+
+
+def generate_inputs(template_text: str, rows: int = 1, seed: int = 0) -> List[Dict[str, str]]:
+    """Return `rows` sets of valid inputs for every placeholder in the template."""
+    rng = random.Random(seed)
+    placeholders = TemplateProcessor().extract_placeholders(template_text)
+    return [{name: generate_value(info['type'], rng) for name, info in placeholders.items()} for _ in range(rows)]
+
+
+def generate_history_entry(number: int) -> Dict[str, Any]:
+    return {
+        "output_filename": f"output_{number}.json",
+        "details": {"TemplateName": f"output_{number}", "number": str(number), "eventDate": "25-12-2023", "price": "99.99"}
+    }
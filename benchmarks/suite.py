@@ -0,0 +1,321 @@
+"""Benchmark suite for the template pipeline, with baselines and a regression gate.
+
+Run from the repository root:
+
+    python -m benchmarks.suite --save-baseline      # record benchmarks/baseline.json
+    python -m benchmarks.suite                      # compare against it
+    python -m benchmarks.suite --filter convert --quick
+
+Each case is timed in batches long enough to be measurable (--min-time), and
+the fastest of --repeat batches is reported per call. Against a baseline, a
+case that is more than --threshold slower fails the run with exit status 1.
+Baselines are machine specific: record one on the machine that compares.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import tempfile
+from contextlib import ExitStack, redirect_stdout
+from typing import Callable, Dict, List, Tuple
+from template_parser import __version__
+from template_parser.application import TemplateApplication
+from template_parser.config_manager import ConfigManager, JsonLinesConfigManager, ProgramConfigManager
+from template_parser.constants import DATA_TYPES
+from template_parser.file_manager import FileManager
+from template_parser.interfaces import IInputCollector
+from template_parser.rendering import parse_template, render
+from template_parser.template_processor import TemplateProcessor
+from template_parser.type_registry import get_type
+from template_parser.user_interface import UserInterface
+from .generators import generate_history_entry, generate_inputs, generate_template, generate_value
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+BASELINE_FORMAT = 1
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_MIN_TIME = 0.05
+DEFAULT_REPEAT = 7
+
+# (name, leaves, depth, density, inline_ratio): a size sweep plus one axis varied at a time.
+TEMPLATE_SHAPES = (
+    ('leaves=100', 100, 4, 0.5, 0.5),
+    ('leaves=1000', 1000, 4, 0.5, 0.5),
+    ('leaves=10000', 10000, 4, 0.5, 0.5),
+    ('leaves=1000,depth=1', 1000, 1, 0.5, 0.5),
+    ('leaves=1000,depth=8', 1000, 8, 0.5, 0.5),
+    ('leaves=1000,density=0.1', 1000, 4, 0.1, 0.5),
+    ('leaves=1000,density=1', 1000, 4, 1.0, 0.5),
+    ('leaves=1000,full-values', 1000, 4, 0.5, 0.0),
+    ('leaves=1000,inline', 1000, 4, 0.5, 1.0),
+)
+HISTORY_SIZES = (100, 1000, 10000)
+
+Case = Tuple[str, Callable[[ExitStack], Callable[[], object]]]
+
+
+class ScriptedInputCollector(IInputCollector):
+    # Answers prompts of the form "Enter value for 'name' ..." from a dict.
+    def __init__(self, inputs: Dict[str, str]):
+        self.inputs = inputs
+
+    def collect_input(self, prompt, validation_func=None):
+        return self.inputs[prompt.split("'")[1]]
+
+
+def program_config(directory: str, required_variables=()) -> ProgramConfigManager:
+    path = os.path.join(directory, 'program_config.json')
+    with open(path, 'w') as f:
+        json.dump({'required_variables': list(required_variables), 'output_filename_format': 'output.json',
+                   'locale': 'en_GB'}, f)
+    return ProgramConfigManager(path, FileManager())
+
+
+def build_application(stack: ExitStack, inputs: Dict[str, str]) -> TemplateApplication:
+    directory = stack.enter_context(tempfile.TemporaryDirectory())
+    file_manager = FileManager(durability='none')
+    user_interface = UserInterface(ScriptedInputCollector(inputs))
+    with redirect_stdout(stack.enter_context(open(os.devnull, 'w'))):
+        program_config_manager = program_config(directory)
+    return TemplateApplication(
+        file_manager=file_manager,
+        config_manager=JsonLinesConfigManager(os.path.join(directory, 'config.jsonl'), file_manager, user_interface),
+        template_processor=TemplateProcessor(),
+        templates_dir=directory,
+        output_dir=os.path.join(directory, 'output'),
+        program_config_manager=program_config_manager,
+        user_interface=user_interface
+    )
+
+
+def template_cases() -> List[Case]:
+    cases = []
+    for label, leaves, depth, density, inline_ratio in TEMPLATE_SHAPES:
+        def make(leaves=leaves, depth=depth, density=density, inline_ratio=inline_ratio):
+            text = generate_template(leaves, depth, density, inline_ratio)
+            return text, generate_inputs(text)[0]
+
+        def extract(stack, make=make):
+            text, _ = make()
+            processor = TemplateProcessor()
+            return lambda: processor.extract_placeholders(text)
+
+        def compile_(stack, make=make):
+            text, _ = make()
+            return lambda: parse_template(text)
+
+        def replace(stack, make=make):
+            text, inputs = make()
+            app = build_application(stack, inputs)
+            return lambda: app.replace_placeholders(text, inputs)
+
+        def render_(stack, make=make):
+            text, inputs = make()
+            compiled = parse_template(text)
+            return lambda: render(compiled, inputs, as_bytes=True)
+
+        def run(stack, make=make):
+            text, inputs = make()
+            app = build_application(stack, inputs)
+            template_path = os.path.join(app.templates_dir, 'template.json')
+            with open(template_path, 'w') as f:
+                f.write(text)
+            devnull = stack.enter_context(open(os.devnull, 'w'))
+
+            def run_once():
+                with redirect_stdout(devnull):
+                    app.run(template_path)
+            return run_once
+
+        cases += [
+            (f'extract_placeholders[{label}]', extract),
+            (f'compile[{label}]', compile_),
+            (f'replace_placeholders[{label}]', replace),
+            (f'render[{label}]', render_),
+            (f'application_run[{label}]', run),
+        ]
+    return cases
+
+
+def conversion_cases() -> List[Case]:
+    cases = []
+    for typ in DATA_TYPES.values():
+        options = {'date': {'format': '%d/%m/%Y', 'add_days': '7'}, 'currency': {'currency_code': 'GBP'}}.get(typ, {})
+
+        def convert(stack, typ=typ, options=options):
+            # 1000 distinct values per call, so caches see a realistic mix of repeats.
+            import random
+            rng = random.Random(0)
+            values = [generate_value(typ, rng) for _ in range(1000)]
+            # The uncached conversion the application's cache wraps.
+            convert = get_type(typ).convert
+            return lambda: [convert(value, options, 'en_GB') for value in values]
+
+        def convert_cached(stack, typ=typ, options=options):
+            import random
+            rng = random.Random(0)
+            values = [generate_value(typ, rng) for _ in range(1000)]
+            app = build_application(stack, {})
+            return lambda: [app.convert_type(value, typ, options) for value in values]
+
+        cases += [(f'convert[{typ},x1000]', convert), (f'convert_type[{typ},x1000]', convert_cached)]
+    return cases
+
+
+def history_cases() -> List[Case]:
+    cases = []
+    for size in HISTORY_SIZES:
+        def legacy(stack, size=size):
+            directory = stack.enter_context(tempfile.TemporaryDirectory())
+            path = os.path.join(directory, 'config.json')
+            with open(path, 'w') as f:
+                json.dump([generate_history_entry(n) for n in range(size)], f)
+            devnull = stack.enter_context(open(os.devnull, 'w'))
+            manager = ConfigManager(path, FileManager(durability='none'), UserInterface(ScriptedInputCollector({})))
+            manager.load_config()
+            entry = generate_history_entry(size)
+
+            def save():
+                with redirect_stdout(devnull):
+                    manager.save_config(entry)
+                # Keep the history at its nominal size between calls.
+                manager.config_data.pop()
+            return save
+
+        def append_only(stack, size=size):
+            directory = stack.enter_context(tempfile.TemporaryDirectory())
+            path = os.path.join(directory, 'config.jsonl')
+            with open(path, 'w') as f:
+                f.writelines(json.dumps(generate_history_entry(n)) + '\n' for n in range(size))
+            devnull = stack.enter_context(open(os.devnull, 'w'))
+            manager = JsonLinesConfigManager(path, FileManager(durability='none'), UserInterface(ScriptedInputCollector({})))
+            manager.load_config()
+            entry = generate_history_entry(size)
+
+            def save():
+                with redirect_stdout(devnull):
+                    manager.save_config(entry)
+            return save
+
+        cases += [(f'config_save[legacy,history={size}]', legacy), (f'config_save[jsonl,history={size}]', append_only)]
+    return cases
+
+
+def all_cases() -> List[Case]:
+    return template_cases() + conversion_cases() + history_cases()
+
+
+def time_case(func: Callable[[], object], min_time: float, repeat: int) -> Dict[str, float]:
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed * 2 >= min_time else 10
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+    return {'best': min(samples), 'median': statistics.median(samples), 'number': number}
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float) -> List[Tuple[str, float]]:
+    # Returns (name, ratio) for every case slower than the baseline by more than threshold.
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference and reference['best'] > 0:
+            ratio = result['best'] / reference['best']
+            if ratio > 1 + threshold:
+                regressions.append((name, ratio))
+    return regressions
+
+
+def machine_info() -> Dict[str, str]:
+    return {'python': platform.python_version(), 'platform': platform.platform(), 'machine': platform.machine(),
+            'template_parser': __version__}
+
+
+def load_baseline(path: str) -> Dict:
+    try:
+        with open(path, 'r') as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        return {}
+    if baseline.get('format') != BASELINE_FORMAT:
+        return {}
+    return baseline
+
+
+def format_time(seconds: float) -> str:
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--filter', default='', help='Only run cases whose name contains this text')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='Baseline file (default: benchmarks/baseline.json)')
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'Allowed slowdown against the baseline (default: {DEFAULT_THRESHOLD * 100:.0f}%%)')
+    parser.add_argument('--min-time', type=float, default=DEFAULT_MIN_TIME, help='Seconds per timed batch (default: 0.05)')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='Timed batches per case (default: 7)')
+    parser.add_argument('--quick', action='store_true', help='Shorter batches and fewer repeats, for a smoke test')
+    parser.add_argument('--json', help='Also write the results to this file')
+    parser.add_argument('--list', action='store_true', help='List the cases and exit')
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.min_time, args.repeat = 0.01, 3
+
+    cases = [(name, factory) for name, factory in all_cases() if args.filter in name]
+    if args.list:
+        for name, _ in cases:
+            print(name)
+        return
+
+    baseline = load_baseline(args.baseline)
+    reference = baseline.get('results', {})
+    if baseline and baseline.get('machine') != machine_info():
+        print(f"Note: the baseline was recorded on {baseline.get('machine')}; comparisons may not be meaningful.")
+
+    results = {}
+    print(f"{'case':<52} {'best':>10} {'median':>10} {'vs base':>8}")
+    for name, factory in cases:
+        with ExitStack() as stack:
+            results[name] = time_case(factory(stack), args.min_time, args.repeat)
+        result = results[name]
+        ratio = f"{result['best'] / reference[name]['best']:.2f}x" if name in reference else '-'
+        print(f"{name:<52} {format_time(result['best']):>10} {format_time(result['median']):>10} {ratio:>8}", flush=True)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'machine': machine_info(), 'results': results}, f, indent=2)
+    if args.save_baseline:
+        # Cases not run this time keep their previous baseline.
+        merged = {**reference, **results} if baseline.get('machine') == machine_info() else results
+        with open(args.baseline, 'w') as f:
+            json.dump({'format': BASELINE_FORMAT, 'machine': machine_info(), 'results': merged}, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    regressions = compare(results, reference, args.threshold)
+    if regressions:
+        print(f"FAIL: {len(regressions)} case(s) more than {args.threshold:.0%} slower than the baseline:")
+        for name, ratio in regressions:
+            print(f"  {name}: {ratio:.2f}x")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,18 @@
+import os
+import re
 from setuptools import setup, find_packages
 
 def parse_requirements(filename):
     with open(filename, 'r') as f:
         return [line.strip() for line in f if line.strip() and not line.startswith('#')]
 
+def read_version():
+    with open(os.path.join('template_parser', '__init__.py'), 'r') as f:
+        return re.search(r"__version__ = '([^']+)'", f.read()).group(1)
+
 setup(
     name='template_parser',
-    version='1.0.0',
+    version=read_version(),
     description='A CLI tool for parsing templates and replacing placeholders in a JSON file.',
     author='Patryk Wegrzynski',
     author_email='wegosh16@gmail.com',
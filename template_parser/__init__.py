@@ -0,0 +1,28 @@
+__version__ = '1.0.0'
+
+# The library API is imported on first access, so the CLI does not pay for it.
+_EXPORTS = {
+    'render': 'rendering',
+    'parse_template': 'rendering',
+    'output_filename': 'rendering',
+    'RenderConfig': 'rendering',
+    'CompiledTemplate': 'compiled_template',
+    'PlaceholderType': 'type_registry',
+    'register_type': 'type_registry',
+    'TemplateParserError': 'errors',
+    'TemplateSyntaxError': 'errors',
+    'ConfigError': 'errors',
+    'MissingInputError': 'errors',
+    'InvalidInputError': 'errors',
+    'OutputFilenameError': 'errors',
+}
+
+__all__ = ['__version__', *_EXPORTS]
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    return getattr(import_module(f'.{module_name}', __name__), name)
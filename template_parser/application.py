@@ -1,20 +1,29 @@
 from datetime import datetime
-from typing import Optional, Dict, Any, List, Callable, Tuple
+from contextlib import nullcontext
+from typing import Optional, Dict, Any, List, Callable, Mapping, Tuple
 from .interfaces import IFileManager, IConfigManager, ITemplateProcessor
-from .validators import InputValidators
 from .config_manager import ProgramConfigManager
 from .helpers.wrappers import handle_file_exceptions
-from .helpers.date_utils import apply_date_operations
-from .constants import DATA_TYPES, PLACEHOLDER_PATTERN
+from .helpers.cache import LRUCache, MISSING
+from .helpers.currency import get_currency_formatter
+from .constants import PLACEHOLDER_PATTERN
+from .errors import InvalidInputError, MissingInputError
+from .compiled_template import CompiledTemplate, PlaceholderSpec, Resolver, UNRESOLVED
+from .streaming import scan_placeholders, stream_render
+from .template_manifest import TemplateManifest
+from .render_cache import RenderCache
+from .type_registry import PlaceholderType, get_type
 from .user_interface import UserInterface
-from babel.numbers import format_currency, get_currency_symbol
-from num2words import num2words
+from .timings import Timings
 import sys
 import os
 import json
+import time
 import uuid
 import logging
 
+DEFAULT_CONVERSION_CACHE_SIZE = 4096
+
 class TemplateApplication:
     def __init__(self,
                  file_manager: IFileManager,
@@ -23,7 +32,11 @@ class TemplateApplication:
                  templates_dir: str,
                  output_dir: str,
                  program_config_manager: ProgramConfigManager,
-                 user_interface: UserInterface):
+                 user_interface: UserInterface,
+                 conversion_cache_size: int = DEFAULT_CONVERSION_CACHE_SIZE,
+                 template_manifest: Optional[TemplateManifest] = None,
+                 render_cache: Optional[RenderCache] = None,
+                 timings: Optional[Timings] = None):
         self.file_manager = file_manager
         self.config_manager = config_manager
         self.template_processor = template_processor
@@ -31,9 +44,14 @@ class TemplateApplication:
         self.output_dir = output_dir
         self.program_config_manager = program_config_manager
         self.user_interface = user_interface
+        self._compiled_template: Optional[CompiledTemplate] = None
+        self.conversion_cache = LRUCache(conversion_cache_size)
+        self.template_manifest = template_manifest
+        self.render_cache = render_cache
+        self.timings = timings
 
     @handle_file_exceptions
-    def run(self, template_path: Optional[str] = None) -> None:
+    def run(self, template_path: Optional[str] = None, stream: bool = False) -> None:
         if template_path:
             json_file_path = template_path
             if not os.path.isfile(json_file_path):
@@ -47,7 +65,10 @@ class TemplateApplication:
                 print("Please create the directory and add template files before running the program.")
                 raise FileNotFoundError(msg)
                 
-            templates = self.file_manager.list_directory(self.templates_dir, '.json')
+            if self.template_manifest is not None:
+                templates = self.template_manifest.list_templates()
+            else:
+                templates = self.file_manager.list_directory(self.templates_dir, '.json')
 
             if not templates:
                 msg = f"No JSON template files found in '{self.templates_dir}'."
@@ -55,35 +76,70 @@ class TemplateApplication:
                 print("Please add template files to the directory before running the program.")
                 raise FileNotFoundError(msg)
 
-            selected_template = self.select_template(templates)
+            with self.phase('select'):
+                selected_template = self.select_template(templates)
             json_file_path = os.path.join(self.templates_dir, selected_template)
 
-        template_text = self.file_manager.read_file(json_file_path)
-        placeholder_set = self.template_processor.extract_placeholders(template_text)
-        user_inputs = self.collect_user_inputs(placeholder_set)
+        if stream:
+            with self.phase('extract'), self.file_manager.open_file(json_file_path) as source:
+                placeholder_set = scan_placeholders(source)
+        elif self.template_manifest is not None and self.template_manifest.contains(json_file_path):
+            with self.phase('manifest'):
+                compiled, placeholder_set = self.load_from_manifest(json_file_path)
+        else:
+            with self.phase('read'):
+                template_text = self.file_manager.read_file(json_file_path)
+            with self.phase('extract'):
+                placeholder_set = self.template_processor.extract_placeholders(template_text)
+            compiled = None
+        with self.phase('prompt'):
+            user_inputs = self.collect_user_inputs(placeholder_set)
         self.warn_unused_required_variables(placeholder_set)
-        new_template_text = self.replace_placeholders(template_text, user_inputs)
-
-        try:
-            parsed_json = json.loads(new_template_text)
-        except json.JSONDecodeError as e:
-            self.user_interface.display_error(f"The modified JSON is invalid: {e}")
-            sys.exit(1)
+        if not stream:
+            with self.phase('compile'):
+                compiled = compiled or self.compile_template(template_text)
 
         output_filename = self.generate_output_filename(user_inputs)
         self.file_manager.ensure_directory(self.output_dir)
         output_path = os.path.join(self.output_dir, output_filename)
-        try:
-            self.file_manager.write_file(output_path, json.dumps(parsed_json, indent=2))
-            self.user_interface.display_message(f"Modified JSON saved to {output_path}")
-        except Exception as e:
-            self.user_interface.display_error(f"Error writing to file {output_path}: {e}")
+        with self.phase('cache check'):
+            render_key = None if stream else self.get_render_key(compiled, user_inputs)
+            fresh = render_key is not None and self.render_cache.is_fresh(output_path, render_key)
+        if fresh:
+            self.render_cache.record_hit()
+            self.user_interface.display_message(f"Output unchanged, skipped writing {output_path}")
+        else:
+            rendered = None
+            if not stream:
+                with self.phase('render'):
+                    rendered = self.render_compiled(compiled, user_inputs, copy_static=False)
+            try:
+                if stream:
+                    with self.phase('stream'):
+                        self.stream_template(json_file_path, output_path, user_inputs)
+                else:
+                    with self.phase('write'):
+                        written = self.file_manager.write_json(output_path, rendered, indent=2)
+                    if render_key is not None:
+                        self.render_cache.record(output_path, render_key, *written)
+                with self.phase('write'):
+                    self.file_manager.flush()
+                self.user_interface.display_message(f"Modified JSON saved to {output_path}")
+            except Exception as e:
+                self.user_interface.display_error(f"Error writing to file {output_path}: {e}")
+        if self.render_cache is not None:
+            with self.phase('cache save'):
+                self.render_cache.save()
 
-        self.config_manager.load_config()
-        self.config_manager.save_config({
-            "output_filename": output_filename,
-            "details": user_inputs.copy()
-        })
+        with self.phase('history'):
+            self.config_manager.load_config()
+            self.config_manager.save_config({
+                "output_filename": output_filename,
+                "details": user_inputs.copy()
+            })
+
+    def phase(self, name: str):
+        return self.timings.phase(name) if self.timings is not None else nullcontext()
 
     def collect_user_inputs(self, placeholder_set):
         user_inputs = {}
@@ -105,16 +161,10 @@ class TemplateApplication:
 
     def prompt_for_input(self, key, typ, options=None, required=False):
         options = options or {}
-        example = ''
+        kind = get_type(typ)
 
-        if typ == DATA_TYPES['DATE']:
-            example_with_time = datetime.now().strftime('%d-%m-%Y %H:%M')
-            example_without_time = datetime.now().strftime('%d-%m-%Y')
-            prompt = (
-                f"Enter value for '{key}' (type: {typ} | examples: {example_without_time} or {example_with_time})"
-            )
-        elif typ == DATA_TYPES['CURRENCY']:
-            prompt = f"Enter value for '{key}' (type: {typ} | example: 1000000)"
+        if kind.example is not None:
+            prompt = f"Enter value for '{key}' (type: {typ} | {kind.example()})"
         else:
             prompt = f"Enter value for '{key}' (type: {typ})"
 
@@ -123,7 +173,7 @@ class TemplateApplication:
         else:
             prompt += ": "
             
-        value = self.user_interface.get_input(prompt=prompt, validation_func=self.get_validator(typ))
+        value = self.user_interface.get_input(prompt=prompt, validation_func=kind.validator)
         return value 
 
     def warn_unused_required_variables(self, placeholder_set: Dict[str, str]) -> None:
@@ -157,70 +207,45 @@ class TemplateApplication:
 
 
     def get_validator(self, typ: str) -> Callable[[str], Tuple[bool, Optional[str]]]:
-        validators = {
-            DATA_TYPES['INTEGER']: InputValidators.validate_int,
-            DATA_TYPES['FLOAT']: InputValidators.validate_float,
-            DATA_TYPES['URL']: InputValidators.validate_url,
-            DATA_TYPES['STRING']: InputValidators.validate_non_empty,
-            DATA_TYPES['DATE']: InputValidators.validate_date,
-            DATA_TYPES['CURRENCY']: InputValidators.validate_currency,
-        }
-        return validators.get(typ, InputValidators.validate_non_empty)
+        return get_type(typ).validator
 
     def convert_type(self, value: str, typ: str, options: Optional[Dict[str, Any]] = None) -> Any:
         options = options or {}
-        if typ == DATA_TYPES['INTEGER']:
-            return int(value)
-        elif typ == DATA_TYPES['FLOAT']:
-            return float(value)
-        elif typ == DATA_TYPES['DATE']:
-            input_formats = ['%d-%m-%Y %H:%M', '%d-%m-%Y']
-            date_obj = None
-            for input_format in input_formats:
-                try:
-                    date_obj = datetime.strptime(value.strip(), input_format)
-                    break 
-                except ValueError:
-                    continue
-            if date_obj is None:
-                self.user_interface.display_error(
-                    f"Invalid date input: '{value}'. Expected formats: DD-MM-YYYY or DD-MM-YYYY HH:MM"
-                )
-                raise ValueError(f"Invalid date input: '{value}'")
-
-            date_operations = {
-                k: v for k, v in options.items() if k.startswith('add_') or k.startswith('subtract_')
-            }
-
-            if date_operations:
-                date_obj = apply_date_operations(date_obj, date_operations)
-
-            output_format = options.get('format', '%Y-%m-%dT%H:%M:%S')
-            return date_obj.strftime(output_format)
-        elif typ == DATA_TYPES['CURRENCY']:
-            number = float(value)
-            locale = self.program_config_manager.get_locale()
-            format_style = options.get('format', 'standard')
-            include_symbol = options.get('symbol', 'true').lower() == 'true'
-            currency_code = options.get('currency_code', 'USD')
-
-            if format_style == 'long':
-                amount_in_words = num2words(number, to='currency', lang=locale)
-                return amount_in_words
-            elif format_style == 'short':
-                formatted_currency = format_currency(
-                    number, currency_code, locale=locale, format='¤#,##0.00', currency_digits=True
-                )
-                return formatted_currency
-            else:
-                formatted_currency = format_currency(
-                    number, currency_code, locale=locale, currency_digits=True
-                )
-                if not include_symbol:
-                    formatted_currency = formatted_currency.replace(get_currency_symbol(currency_code, locale), '').strip()
-                return formatted_currency
-        else:
-            return value
+        return self.convert(value, get_type(typ), options)
+
+    def convert_spec(self, value: str, spec: PlaceholderSpec) -> Any:
+        return self.convert(value, spec.kind, spec.options, spec.options_key)
+
+    def convert(self, value: str, kind: PlaceholderType, options: Mapping[str, Any],
+                options_key: Optional[Tuple[Tuple[str, Any], ...]] = None) -> Any:
+        if self.timings is None:
+            return self._convert_cached(value, kind, options, options_key)
+        start = time.perf_counter()
+        try:
+            return self._convert_cached(value, kind, options, options_key)
+        finally:
+            self.timings.record_conversion(kind.name, time.perf_counter() - start)
+
+    def _convert_cached(self, value: str, kind: PlaceholderType, options: Mapping[str, Any],
+                        options_key: Optional[Tuple[Tuple[str, Any], ...]]) -> Any:
+        locale = self.program_config_manager.get_locale()
+        if not kind.cacheable:
+            return kind.convert(value, options, locale)
+        try:
+            if options_key is None:
+                options_key = tuple(sorted(options.items(), key=lambda item: item[0]))
+            key = (value, kind.name, options_key, locale)
+            hash(key)
+        except TypeError:
+            return kind.convert(value, options, locale)
+        converted = self.conversion_cache.get(key)
+        if converted is MISSING:
+            converted = kind.convert(value, options, locale)
+            self.conversion_cache.put(key, converted)
+        return converted
+
+    def warm_up(self) -> None:
+        get_currency_formatter(self.program_config_manager.get_locale(), 'USD')
 
     def get_context_variables(self) -> Dict[str, str]:
         return {
@@ -228,9 +253,9 @@ class TemplateApplication:
             'time': datetime.now().strftime('%H%M%S')
         }
 
-    def generate_output_filename(self, user_inputs: Dict[str, Any]) -> str:
+    def generate_output_filename(self, user_inputs: Dict[str, Any], context: Optional[Dict[str, Any]] = None) -> str:
         format_string = self.program_config_manager.get_output_filename_format()
-        context = self.get_context_variables()
+        context = context if context is not None else self.get_context_variables()
         all_inputs = {**user_inputs, **context}
         try:
             output_filename = format_string.format(**all_inputs)
@@ -246,70 +271,75 @@ class TemplateApplication:
             sys.exit(1)
         return output_filename
 
-    def replace_placeholders(self, template_text, user_inputs):
+    def compile_template(self, template_text: str) -> CompiledTemplate:
+        compiled = self._compiled_template
+        if compiled is None or compiled.source != template_text:
+            try:
+                compiled = self.template_processor.compile(template_text)
+            except json.JSONDecodeError as e:
+                self.user_interface.display_error(f"Invalid JSON template: {e}")
+                raise
+            self._compiled_template = compiled
+        return compiled
+
+    def load_from_manifest(self, template_path: str) -> Tuple[CompiledTemplate, Dict[str, Dict[str, Any]]]:
         try:
-            template_data = json.loads(template_text)
+            entry = self.template_manifest.get(template_path)
         except json.JSONDecodeError as e:
             self.user_interface.display_error(f"Invalid JSON template: {e}")
             raise
+        except OSError as e:
+            raise IOError(f"Error reading file {template_path}: {e}") from e
+        self.template_manifest.save()
+        self._compiled_template = entry.compiled
+        return entry.compiled, entry.placeholders
 
-        def replace_in_data(data):
-            if isinstance(data, dict):
-                return {key: replace_in_data(value) for key, value in data.items()}
-            elif isinstance(data, list):
-                return [replace_in_data(item) for item in data]
-            elif isinstance(data, str):
-                match_full = PLACEHOLDER_PATTERN.fullmatch(data.strip())
-                if match_full:
-                    name = match_full.group('name')
-                    typ = match_full.group('type') or 'str'
-                    options_str = match_full.group('options')
-                    options = {}
-                    if options_str:
-                        for opt in options_str.lstrip('|').split('|'):
-                            if '=' in opt:
-                                key, value = opt.split('=', 1)
-                                options[key.strip()] = value.strip()
-                            else:
-                                options[opt.strip()] = True
-                    base_value = user_inputs.get(name)
-                    if base_value is None:
-                        self.user_interface.display_warning(f"Value for '{name}' not provided. Leaving placeholder unchanged.")
-                        return data
-                    try:
-                        converted_value = self.convert_type(base_value, typ, options)
-                        return converted_value 
-                    except Exception as e:
-                        self.user_interface.display_error(f"Error processing placeholder '{data}': {e}")
-                        return data 
-                else:
-                    def placeholder_replacer(match):
-                        name = match.group('name')
-                        typ = match.group('type') or 'str'
-                        options_str = match.group('options')
-                        options = {}
-                        if options_str:
-                            for opt in options_str.lstrip('|').split('|'):
-                                if '=' in opt:
-                                    key, value = opt.split('=', 1)
-                                    options[key.strip()] = value.strip()
-                                else:
-                                    options[opt.strip()] = True
-                        base_value = user_inputs.get(name)
-                        if base_value is None:
-                            self.user_interface.display_warning(f"Value for '{name}' not provided. Leaving placeholder unchanged.")
-                            return match.group(0)
-                        try:
-                            converted_value = self.convert_type(base_value, typ, options)
-                            return str(converted_value)
-                        except Exception as e:
-                            self.user_interface.display_error(f"Error processing placeholder '{match.group(0)}': {e}")
-                            return match.group(0)
-
-                    return PLACEHOLDER_PATTERN.sub(placeholder_replacer, data)
-            else:
-                return data
+    def get_render_key(self, compiled: CompiledTemplate, user_inputs: Dict[str, Any]) -> Optional[str]:
+        if self.render_cache is None:
+            return None
+        template_key = self.render_cache.template_key(
+            compiled,
+            self.program_config_manager.get_locale(),
+            self.program_config_manager.get_output_filename_format()
+        )
+        return self.render_cache.render_key(template_key, user_inputs)
+
+    def render_compiled(self, compiled: CompiledTemplate, user_inputs: Dict[str, Any],
+                        converted: Optional[Dict[PlaceholderSpec, Any]] = None, copy_static: bool = True,
+                        strict: bool = False) -> Any:
+        # copy_static=False is for callers that serialize the result straight away.
+        return compiled.render(self.make_resolver(user_inputs, converted, strict), copy_static)
 
-        replaced_data = replace_in_data(template_data)
+    def make_resolver(self, user_inputs: Dict[str, Any],
+                      converted: Optional[Dict[PlaceholderSpec, Any]] = None, strict: bool = False) -> Resolver:
+        # Interactively a placeholder that cannot be resolved is reported and left
+        # in the output; strict resolvers raise instead, so nothing is written.
+        def resolve(spec: PlaceholderSpec, text: str) -> Any:
+            if converted and spec in converted:
+                return converted[spec]
+            base_value = user_inputs.get(spec.name)
+            if base_value is None:
+                if strict:
+                    raise MissingInputError(spec.name)
+                self.user_interface.display_warning(f"Value for '{spec.name}' not provided. Leaving placeholder unchanged.")
+                return UNRESOLVED
+            try:
+                return self.convert_spec(base_value, spec)
+            except Exception as e:
+                if strict:
+                    raise InvalidInputError(spec.name, spec.type, base_value, str(e)) from e
+                self.user_interface.display_error(f"Error processing placeholder '{text}': {e}")
+                return UNRESOLVED
+
+        return resolve
+
+    def stream_template(self, template_path: str, output_path: str, user_inputs: Dict[str, Any]) -> None:
+        with self.file_manager.open_file(template_path) as source, \
+                self.file_manager.open_file(output_path, 'w') as destination:
+            stream_render(source, destination, self.make_resolver(user_inputs), indent=2)
+
+    def replace_placeholders(self, template_text, user_inputs):
+        compiled = self.compile_template(template_text)
+        replaced_data = self.render_compiled(compiled, user_inputs, copy_static=False)
         result = json.dumps(replaced_data)
         return result
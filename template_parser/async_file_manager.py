@@ -0,0 +1,87 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, IO, List, Optional, Tuple
+from .constants import DEFAULT_IO_THREADS, DEFAULT_MAX_PENDING
+from .interfaces import IFileManager
+
+
+class AsyncFileManager(IFileManager):
+    """Runs writes of another file manager on a bounded thread pool.
+
+    At most max_pending writes are queued or running; further writes block the
+    caller until one finishes, so a fast renderer cannot buffer an unbounded
+    number of documents. Reads go straight to the wrapped manager. A future from
+    submit_json() holds the (digest, size) of the written file; write_json() waits
+    for it. Errors from writes made through write_file are raised by flush().
+    """
+    def __init__(self, file_manager: IFileManager, max_workers: int = DEFAULT_IO_THREADS,
+                 max_pending: int = DEFAULT_MAX_PENDING):
+        self.file_manager = file_manager
+        self.max_pending = max(1, max_pending)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='file-writer')
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._pending: List[Future] = []
+
+    def submit_json(self, file_path: str, data: Any, indent: Optional[int] = None) -> Future:
+        return self._submit(self.file_manager.write_json, file_path, data, indent)
+
+    def submit_file(self, file_path: str, content: str) -> Future:
+        return self._submit(self.file_manager.write_file, file_path, content)
+
+    def write_json(self, file_path: str, data: Any, indent: Optional[int] = None) -> Tuple[str, int]:
+        return self.submit_json(file_path, data, indent).result()
+
+    def write_file(self, file_path: str, content: str) -> None:
+        self._track(self.submit_file(file_path, content))
+
+    def read_file(self, file_path: str) -> str:
+        return self.file_manager.read_file(file_path)
+
+    def open_file(self, file_path: str, mode: str = 'r') -> IO[str]:
+        return self.file_manager.open_file(file_path, mode)
+
+    def list_directory(self, directory_path: str, extension: Optional[str] = None) -> List[str]:
+        return self.file_manager.list_directory(directory_path, extension)
+
+    def ensure_directory(self, directory_path: str) -> None:
+        self.file_manager.ensure_directory(directory_path)
+
+    def sync_file(self, handle: IO) -> None:
+        self.file_manager.sync_file(handle)
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, []
+        errors = [future.exception() for future in pending]
+        self.file_manager.flush()
+        for error in errors:
+            if error is not None:
+                raise error
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> 'AsyncFileManager':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _submit(self, write, *args) -> Future:
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(write, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _track(self, future: Future) -> None:
+        with self._lock:
+            self._pending = [item for item in self._pending if not item.done() or item.exception() is not None]
+            self._pending.append(future)
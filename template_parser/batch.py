@@ -0,0 +1,408 @@
+import os
+import csv
+import json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import AbstractSet, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from .application import TemplateApplication
+from .columnar import ColumnarConverter
+from .compiled_template import CompiledTemplate, PlaceholderSpec
+from .constants import VALIDATION_POLICIES
+from .errors import OutputFilenameError, TemplateParserError
+from .helpers.paths import is_within
+from .rendering import RenderConfig, normalize_value, output_filename
+from .type_registry import get_type
+
+INPUT_FORMATS = ('.jsonl', '.ndjson', '.csv')
+DEFAULT_CHUNK_SIZE = 256
+# Checking a row is far cheaper than rendering it, so validation chunks are
+# larger to keep the cost of shipping them to workers worthwhile.
+DEFAULT_VALIDATION_CHUNK_SIZE = 4096
+
+
+def read_input_rows(inputs_path: str) -> Iterator[Dict[str, str]]:
+    extension = os.path.splitext(inputs_path)[1].lower()
+    if extension not in INPUT_FORMATS:
+        raise ValueError(f"Unsupported inputs file '{inputs_path}'. Expected one of: {', '.join(INPUT_FORMATS)}")
+    with open(inputs_path, 'r', encoding='utf-8', newline='') as f:
+        if extension == '.csv':
+            for row in csv.DictReader(f):
+                yield normalize_row(row)
+        else:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Invalid JSON on line {line_number} of '{inputs_path}': {e}") from e
+                if not isinstance(row, dict):
+                    raise ValueError(f"Line {line_number} of '{inputs_path}' is not a JSON object.")
+                yield normalize_row(row)
+
+
+def normalize_row(row: Dict[str, Any]) -> Dict[str, str]:
+    return {key: normalize_value(value) for key, value in row.items() if key is not None and value is not None}
+
+
+class RowOutcome:
+    __slots__ = ('row_number', 'row', 'output_filename', 'output_path', 'error', 'skipped', 'input_error', 'write',
+                 'unchanged', 'render_key', 'cache_entry')
+
+    def __init__(self, row_number: int, row: Dict[str, str], output_filename: Optional[str] = None,
+                 output_path: Optional[str] = None, error: Optional[str] = None, skipped: bool = False):
+        self.row_number = row_number
+        self.row = row
+        self.output_filename = output_filename
+        self.output_path = output_path
+        self.error = error
+        self.skipped = skipped
+        # The error is the fault of the row's values or the output filename, not of writing.
+        self.input_error = skipped
+        # Pending write from the file manager's submit_json, until settle() collects it.
+        self.write = None
+        # Render cache bookkeeping: the output was already up to date, or the
+        # render key of the file being written and, once it is written, the
+        # (render key, digest, size) to record for it.
+        self.unchanged = False
+        self.render_key = None
+        self.cache_entry = None
+
+
+class BatchResult:
+    def __init__(self):
+        self.rendered = 0
+        self.failed = 0
+        self.errors: List[Tuple[int, str]] = []
+        self.output_paths: List[str] = []
+        # Rows counted in rendered whose output was already up to date and left alone.
+        self.unchanged = 0
+
+    def add_error(self, row_number: int, message: str) -> None:
+        self.failed += 1
+        self.errors.append((row_number, message))
+
+
+class ValidationReport:
+    def __init__(self, policy: str):
+        self.policy = policy
+        self.checked = 0
+        self.invalid_rows: List[int] = []
+        # (row number, field, error) for every problem found.
+        self.errors: List[Tuple[int, str, str]] = []
+
+    @property
+    def valid(self) -> bool:
+        return not self.errors
+
+    def add(self, checked: int, errors: List[Tuple[int, str, str]]) -> None:
+        self.checked += checked
+        for error in errors:
+            if not self.invalid_rows or self.invalid_rows[-1] != error[0]:
+                self.invalid_rows.append(error[0])
+            self.errors.append(error)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'policy': self.policy,
+            'rows_checked': self.checked,
+            'invalid_rows': len(self.invalid_rows),
+            'errors': [{'row': row_number, 'field': field, 'error': error} for row_number, field, error in self.errors],
+        }
+
+    def write_json(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+class BatchRunner:
+    def __init__(self, app: TemplateApplication):
+        self.app = app
+
+    def get_input_fields(self, placeholder_set: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+        fields = {}
+        for var in self.app.program_config_manager.get_required_variables():
+            fields[var['name']] = var.get('type', 'str')
+        for name, placeholder_info in placeholder_set.items():
+            fields.setdefault(name, placeholder_info.get('type', 'str'))
+        return fields
+
+    def validate_row(self, row: Dict[str, str], fields: Dict[str, str]) -> List[str]:
+        return [message for _, message in check_row(row, _field_validators(fields))]
+
+    def validate_inputs(self, template_path: str, rows: Iterable[Dict[str, str]], policy: str = 'fail',
+                        workers: int = 1, chunk_size: int = DEFAULT_VALIDATION_CHUNK_SIZE) -> ValidationReport:
+        """Check every row against its field types before anything is rendered.
+
+        With the fail-fast policy checking stops at the first invalid row; skip
+        and fail check every row. What to do with the report is up to the caller.
+        """
+        if policy not in VALIDATION_POLICIES:
+            raise ValueError(f"Unknown validation policy '{policy}'. Expected one of: {', '.join(VALIDATION_POLICIES)}")
+        _, fields = self.prepare(template_path)
+        fail_fast = policy == 'fail-fast'
+        chunks = _chunked(enumerate(rows, start=1), chunk_size)
+        if workers > 1:
+            results = _validate_parallel(fields, chunks, workers, fail_fast)
+        else:
+            validators = _field_validators(fields)
+            results = (_validate_rows(chunk, validators, fail_fast) for chunk in chunks)
+
+        report = ValidationReport(policy)
+        for checked, errors in results:
+            report.add(checked, errors)
+            if fail_fast and errors:
+                results.close()
+                break
+        return report
+
+    def prepare(self, template_path: str) -> Tuple[CompiledTemplate, Dict[str, str]]:
+        manifest = self.app.template_manifest
+        if manifest is not None and manifest.contains(template_path):
+            compiled, placeholder_set = self.app.load_from_manifest(template_path)
+        else:
+            template_text = self.app.file_manager.read_file(template_path)
+            compiled = self.app.compile_template(template_text)
+            placeholder_set = self.app.template_processor.extract_placeholders(template_text)
+        return compiled, self.get_input_fields(placeholder_set)
+
+    def run(self, template_path: str, rows: Iterable[Dict[str, str]],
+            context: Optional[Dict[str, str]] = None, workers: int = 1,
+            app_factory: Optional[Callable[[], TemplateApplication]] = None,
+            chunk_size: int = DEFAULT_CHUNK_SIZE,
+            on_progress: Optional[Callable[[BatchResult], None]] = None,
+            vectorize: bool = False, skip_rows: AbstractSet[int] = frozenset()) -> BatchResult:
+        compiled, fields = self.prepare(template_path)
+        self.app.warn_unused_required_variables(compiled.placeholders)
+
+        context = context or self.app.get_context_variables()
+        self.app.file_manager.ensure_directory(self.app.output_dir)
+        self.app.config_manager.load_config()
+
+        numbered_rows = enumerate(rows, start=1)
+        if skip_rows:
+            numbered_rows = ((row_number, row) for row_number, row in numbered_rows if row_number not in skip_rows)
+        chunks = _chunked(numbered_rows, chunk_size)
+        if workers > 1:
+            if app_factory is None:
+                raise ValueError("An application factory is required to render with more than one worker.")
+            outcomes = self.run_parallel(template_path, chunks, context, workers, app_factory, vectorize)
+        else:
+            converter = ColumnarConverter(self.app) if vectorize else None
+            outcomes = (outcome for chunk in chunks
+                        for outcome in self.process_chunk(compiled, fields, chunk, context, converter))
+
+        result = BatchResult()
+        produced: Dict[str, int] = {}
+        with self.app.config_manager.group_commit(chunk_size):
+            for outcome in outcomes:
+                self.record(outcome, result, produced)
+                if on_progress and (result.rendered + result.failed) % chunk_size == 0:
+                    on_progress(result)
+        self.app.file_manager.flush()
+        if self.app.render_cache is not None:
+            self.app.render_cache.save()
+        return result
+
+    def run_parallel(self, template_path: str, chunks: Iterator[List[Tuple[int, Dict[str, str]]]],
+                     context: Dict[str, str], workers: int,
+                     app_factory: Callable[[], TemplateApplication], vectorize: bool = False) -> Iterator[RowOutcome]:
+        # Keep a bounded window of chunks in flight and yield them in submission order,
+        # so outputs, history and progress stay deterministic without reading every row up front.
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(app_factory, template_path, context, vectorize)) as executor:
+            pending = deque()
+            while True:
+                while len(pending) < workers * 2:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        break
+                    pending.append(executor.submit(_process_chunk, chunk))
+                if not pending:
+                    break
+                yield from pending.popleft().result()
+
+    def process_chunk(self, compiled: CompiledTemplate, fields: Dict[str, str],
+                      chunk: List[Tuple[int, Dict[str, str]]], context: Dict[str, str],
+                      converter: Optional[ColumnarConverter] = None) -> List[RowOutcome]:
+        outcomes: List[Optional[RowOutcome]] = []
+        valid_rows = []
+        validators = _field_validators(fields)
+        for row_number, row in chunk:
+            errors = check_row(row, validators)
+            if errors:
+                outcomes.append(RowOutcome(row_number, row, error=' '.join(message for _, message in errors), skipped=True))
+            else:
+                outcomes.append(None)
+                valid_rows.append((len(outcomes) - 1, row_number, row))
+
+        converted_rows = None
+        if converter is not None and valid_rows:
+            converted_rows = converter.convert_rows(compiled, [row for _, _, row in valid_rows])
+        for position, (index, row_number, row) in enumerate(valid_rows):
+            converted = converted_rows[position] if converted_rows is not None else None
+            outcomes[index] = self.process_row(compiled, row_number, row, context, converted)
+        for outcome in outcomes:
+            self.settle(outcome)
+        return outcomes
+
+    def settle(self, outcome: RowOutcome) -> None:
+        # Waits for the outcome's write; a failed write fails the row.
+        if outcome.write is None:
+            return
+        error = outcome.write.exception()
+        if error is None and outcome.render_key is not None:
+            outcome.cache_entry = (outcome.render_key, *outcome.write.result())
+        outcome.write = None
+        if error is not None:
+            outcome.error = str(error)
+            outcome.output_filename = outcome.output_path = outcome.cache_entry = None
+
+    def process_row(self, compiled: CompiledTemplate, row_number: int, row: Dict[str, str],
+                    context: Dict[str, str], converted: Optional[Dict[PlaceholderSpec, Any]] = None,
+                    confine_output: bool = False) -> RowOutcome:
+        try:
+            # Unlike generate_output_filename, a bad filename fails the row
+            # rather than falling back to a random name or exiting.
+            config = RenderConfig(output_filename_format=self.app.program_config_manager.get_output_filename_format())
+            filename = output_filename(row, config, {**context, 'row': row_number})
+            output_path = os.path.join(self.app.output_dir, filename)
+            if confine_output and not is_within(output_path, self.app.output_dir):
+                raise OutputFilenameError(f"The output filename '{filename}' is outside the output directory.")
+            outcome = RowOutcome(row_number, row, filename, output_path)
+            render_key = self.app.get_render_key(compiled, row)
+            if render_key is not None and self.app.render_cache.is_fresh(output_path, render_key):
+                outcome.unchanged = True
+                return outcome
+            rendered = self.app.render_compiled(compiled, row, converted, copy_static=False, strict=True)
+            outcome.render_key = render_key
+            outcome.write = self.app.file_manager.submit_json(output_path, rendered, indent=2)
+        except Exception as e:
+            outcome = RowOutcome(row_number, row, error=str(e))
+            outcome.input_error = isinstance(e, TemplateParserError)
+            return outcome
+        return outcome
+
+    def record(self, outcome: RowOutcome, result: BatchResult, produced: Dict[str, int]) -> None:
+        if outcome.error is not None:
+            result.add_error(outcome.row_number, outcome.error)
+            status = 'skipped' if outcome.skipped else 'failed'
+            self.app.user_interface.display_error(f"Row {outcome.row_number} {status}: {outcome.error}")
+            return
+        if outcome.output_filename in produced:
+            self.app.user_interface.display_warning(
+                f"Row {outcome.row_number} overwrites '{outcome.output_filename}' already produced by row {produced[outcome.output_filename]}."
+            )
+        produced[outcome.output_filename] = outcome.row_number
+        result.rendered += 1
+        result.output_paths.append(outcome.output_path)
+        render_cache = self.app.render_cache
+        if outcome.unchanged:
+            result.unchanged += 1
+            render_cache.record_hit()
+        elif outcome.cache_entry is not None:
+            render_cache.record(outcome.output_path, *outcome.cache_entry)
+        self.app.config_manager.save_config({
+            "output_filename": outcome.output_filename,
+            "details": outcome.row.copy()
+        })
+
+
+# Per-process state for parallel batches, built once by the pool initializer.
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_worker(app_factory: Callable[[], TemplateApplication], template_path: str,
+                 context: Dict[str, str], vectorize: bool = False) -> None:
+    app = app_factory()
+    app.warm_up()
+    runner = BatchRunner(app)
+    compiled, fields = runner.prepare(template_path)
+    converter = ColumnarConverter(app) if vectorize else None
+    _worker_state.update(runner=runner, compiled=compiled, fields=fields, context=context, converter=converter)
+
+
+def _process_chunk(chunk: List[Tuple[int, Dict[str, str]]]) -> List[RowOutcome]:
+    runner = _worker_state['runner']
+    outcomes = runner.process_chunk(
+        _worker_state['compiled'], _worker_state['fields'], chunk,
+        _worker_state['context'], _worker_state['converter']
+    )
+    # Outputs must be durable before the parent records them in the history.
+    runner.app.file_manager.flush()
+    return outcomes
+
+
+# Field name -> (type name, validator).
+FieldValidators = Dict[str, Tuple[str, Callable[[str], Tuple[bool, Optional[str]]]]]
+
+
+def _field_validators(fields: Dict[str, str]) -> FieldValidators:
+    return {name: (typ, get_type(typ).validator) for name, typ in fields.items()}
+
+
+def check_row(row: Dict[str, str], validators: FieldValidators) -> List[Tuple[str, str]]:
+    """(field, message) for every missing or invalid value in row.
+
+    The single source of row validation messages, for rendering and for the
+    validation pre-pass alike.
+    """
+    errors = []
+    for name, (typ, validator) in validators.items():
+        value = row.get(name)
+        if value is None:
+            errors.append((name, f"Missing value for '{name}'."))
+            continue
+        valid, error_message = validator(value)
+        if not valid:
+            errors.append((name, f"Invalid value for '{name}' (type: {typ}): {error_message}"))
+    return errors
+
+
+def _validate_rows(chunk: List[Tuple[int, Dict[str, str]]], validators: FieldValidators,
+                   fail_fast: bool = False) -> Tuple[int, List[Tuple[int, str, str]]]:
+    errors = []
+    for checked, (row_number, row) in enumerate(chunk, start=1):
+        row_errors = check_row(row, validators)
+        errors.extend((row_number, name, message) for name, message in row_errors)
+        if row_errors and fail_fast:
+            return checked, errors
+    return len(chunk), errors
+
+
+def _validate_parallel(fields: Dict[str, str], chunks: Iterator[List[Tuple[int, Dict[str, str]]]], workers: int,
+                       fail_fast: bool) -> Iterator[Tuple[int, List[Tuple[int, str, str]]]]:
+    # Same bounded, ordered window as BatchRunner.run_parallel, so the report
+    # lists rows in input order and fail-fast stops at the first invalid row.
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_validation_worker, initargs=(fields,)) as executor:
+        pending = deque()
+        try:
+            while True:
+                while len(pending) < workers * 2:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        break
+                    pending.append(executor.submit(_validate_chunk, chunk, fail_fast))
+                if not pending:
+                    break
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def _init_validation_worker(fields: Dict[str, str]) -> None:
+    _worker_state.update(validators=_field_validators(fields))
+
+
+def _validate_chunk(chunk: List[Tuple[int, Dict[str, str]]], fail_fast: bool) -> Tuple[int, List[Tuple[int, str, str]]]:
+    return _validate_rows(chunk, _worker_state['validators'], fail_fast)
+
+
+def _chunked(numbered_rows: Iterator[Tuple[int, Dict[str, str]]], chunk_size: int) -> Iterator[List[Tuple[int, Dict[str, str]]]]:
+    while True:
+        chunk = list(islice(numbered_rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
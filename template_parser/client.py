@@ -0,0 +1,98 @@
+import json
+import socket
+from typing import Any, Dict, List, Optional, Tuple
+from .constants import DEFAULT_CLIENT_TIMEOUT
+
+# A minimal HTTP/1.1 client over a plain socket: http.client pulls in the email
+# package and ssl, which would double the import cost of a `render` call.
+
+
+class ServerError(Exception):
+    def __init__(self, status: int, message: str, errors: Optional[List[str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.errors = errors or []
+
+
+class RenderClient:
+    """Sends render requests to a `template-parser serve` process.
+
+    The connection is kept open between requests, so one client can issue many
+    renders without reconnecting.
+    """
+    def __init__(self, socket_path: Optional[str] = None, port: Optional[int] = None,
+                 timeout: float = DEFAULT_CLIENT_TIMEOUT):
+        self.socket_path = socket_path
+        self.port = port
+        self.timeout = timeout
+        self._sock: Optional[socket.socket] = None
+        self._reader = None
+
+    def render(self, template: str, inputs: Dict[str, Any], write: bool = False) -> Dict[str, Any]:
+        return self.request('POST', '/render', {'template': template, 'inputs': inputs, 'write': write})
+
+    def health(self) -> Dict[str, Any]:
+        return self.request('GET', '/health')
+
+    def request(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+        message = (f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                   f"Content-Length: {len(body)}\r\n\r\n").encode('ascii') + body
+        reused = self._sock is not None
+        try:
+            status, reason, data = self._exchange(message)
+        except ConnectionError:
+            self.close()
+            if not reused:
+                raise
+            # The server closed an idle keep-alive connection; retry once on a new one.
+            status, reason, data = self._exchange(message)
+        if status != 200:
+            raise ServerError(status, data.get('error', reason), data.get('errors'))
+        return data
+
+    def _exchange(self, message: bytes) -> Tuple[int, str, Dict[str, Any]]:
+        if self._sock is None:
+            self._connect()
+        self._sock.sendall(message)
+        status_line = self._reader.readline()
+        if not status_line:
+            raise ConnectionResetError("The render server closed the connection.")
+        _, status, reason = status_line.decode('latin-1').rstrip('\r\n').split(' ', 2)
+        headers = {}
+        while True:
+            line = self._reader.readline().decode('latin-1').rstrip('\r\n')
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        body = self._reader.read(int(headers.get('content-length', 0)))
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+        return int(status), reason, json.loads(body or b'{}')
+
+    def _connect(self) -> None:
+        if self.port is not None:
+            sock = socket.create_connection(('127.0.0.1', self.port), timeout=self.timeout)
+        else:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.socket_path)
+            except OSError:
+                sock.close()
+                raise
+        self._sock = sock
+        self._reader = sock.makefile('rb')
+
+    def close(self) -> None:
+        if self._sock is not None:
+            self._reader.close()
+            self._sock.close()
+            self._sock = self._reader = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
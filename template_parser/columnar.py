@@ -0,0 +1,135 @@
+from typing import Any, Dict, List, Optional, Sequence
+from .application import TemplateApplication
+from .compiled_template import CompiledTemplate, PlaceholderSpec
+from .constants import DATA_TYPES
+from .helpers.cache import MISSING
+from .helpers.currency import get_currency_formatter
+from .helpers.date_utils import DEFAULT_OUTPUT_FORMAT, compile_date_format, get_date_delta, parse_input_date
+from .type_registry import CURRENCY, DATE, FLOAT, INTEGER
+
+# NumPy is optional and slow to import, so it is loaded the first time a column is converted.
+_UNLOADED = object()
+np: Any = _UNLOADED
+
+# The built-in types, by identity: a type registered over one of them is converted row by row.
+VECTORIZED_TYPES = frozenset((INTEGER, FLOAT, DATE, CURRENCY))
+
+_SECONDS_PER_UNIT = {'days': 86400, 'hours': 3600, 'minutes': 60, 'seconds': 1}
+# datetime64 happily goes past the range Python datetimes support.
+_MIN_YEAR, _MAX_YEAR = 1, 9999
+
+
+def _load_numpy():
+    global np
+    if np is _UNLOADED:
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            np = None
+    return np
+
+
+def numpy_available() -> bool:
+    return _load_numpy() is not None
+
+
+class ColumnarConverter:
+    def __init__(self, app: TemplateApplication):
+        self.app = app
+
+    def convert_rows(self, compiled: CompiledTemplate, rows: Sequence[Dict[str, str]]) -> List[Dict[PlaceholderSpec, Any]]:
+        converted = [{} for _ in rows]
+        seen = set()
+        for site in compiled.sites:
+            for spec in site.specs:
+                if spec in seen or spec.kind not in VECTORIZED_TYPES:
+                    continue
+                seen.add(spec)
+                column = [row.get(spec.name) for row in rows]
+                for index, value in enumerate(self.convert_column(column, spec.type, spec.options)):
+                    if value is not MISSING:
+                        converted[index][spec] = value
+        return converted
+
+    def convert_column(self, column: Sequence[Optional[str]], typ: str, options: Dict[str, Any]) -> List[Any]:
+        # Entries that cannot be converted come back as MISSING, so the renderer
+        # falls back to convert_spec and reports the error for that row.
+        if _load_numpy() is not None and column and all(isinstance(value, str) for value in column):
+            try:
+                if typ == DATA_TYPES['INTEGER']:
+                    return np.asarray(column).astype(np.int64).tolist()
+                if typ == DATA_TYPES['FLOAT']:
+                    return np.asarray(column).astype(np.float64).tolist()
+                if typ == DATA_TYPES['DATE']:
+                    return self._convert_date_column(column, options)
+                if typ == DATA_TYPES['CURRENCY']:
+                    return self._convert_currency_column(column, options)
+            except Exception:
+                pass
+        return [self._convert_scalar(value, typ, options) for value in column]
+
+    def _convert_scalar(self, value: Optional[str], typ: str, options: Dict[str, Any]) -> Any:
+        if value is None:
+            return MISSING
+        try:
+            return self.app.convert_type(value, typ, options)
+        except Exception:
+            return MISSING
+
+    def _convert_date_column(self, column: Sequence[str], options: Dict[str, Any]) -> List[Any]:
+        uniques, inverse = np.unique(np.asarray(column), return_inverse=True)
+        parsed = [parse_input_date(value) for value in uniques.tolist()]
+        valid = np.array([date_obj is not None for date_obj in parsed], dtype=bool)
+        base = np.array([date_obj if date_obj is not None else 0 for date_obj in parsed], dtype='datetime64[s]')
+        shifted = _shift_dates(base, get_date_delta(tuple(sorted(options.items(), key=lambda item: item[0]))))
+
+        years = shifted.astype('datetime64[Y]').astype(np.int64) + 1970
+        valid &= (years >= _MIN_YEAR) & (years <= _MAX_YEAR)
+        format_date = compile_date_format(options.get('format', DEFAULT_OUTPUT_FORMAT))
+        formatted = [
+            format_date(date_obj) if is_valid else MISSING
+            for date_obj, is_valid in zip(shifted.astype('datetime64[us]').tolist(), valid.tolist())
+        ]
+        return _expand(formatted, inverse)
+
+    def _convert_currency_column(self, column: Sequence[str], options: Dict[str, Any]) -> List[Any]:
+        numbers = np.asarray(column).astype(np.float64)
+        uniques, inverse = np.unique(numbers, return_inverse=True)
+        format_style = options.get('format', 'standard')
+        if format_style == 'long':
+            formatted = [self._convert_scalar(repr(number), DATA_TYPES['CURRENCY'], options) for number in uniques.tolist()]
+        else:
+            formatter = get_currency_formatter(
+                self.app.program_config_manager.get_locale(),
+                options.get('currency_code', 'USD'),
+                format_style,
+                options.get('symbol', 'true').lower() == 'true'
+            )
+            formatted = [formatter.format(number) for number in uniques.tolist()]
+        return _expand(formatted, inverse)
+
+
+def _shift_dates(base, delta):
+    # Mirrors relativedelta: move by whole months first (clamping the day to the
+    # length of the target month), then add the fixed-length part.
+    if delta is None:
+        return base
+    total_months = delta.years * 12 + delta.months
+    if total_months:
+        days = base.astype('datetime64[D]')
+        months = days.astype('datetime64[M]')
+        day_offset = days - months.astype('datetime64[D]')
+        time_of_day = base - days
+        target = months + total_months
+        month_length = (target + 1).astype('datetime64[D]') - target.astype('datetime64[D]')
+        day_offset = np.minimum(day_offset, month_length - np.timedelta64(1, 'D'))
+        base = target.astype('datetime64[D]') + day_offset + time_of_day
+    seconds = sum(getattr(delta, unit) * factor for unit, factor in _SECONDS_PER_UNIT.items())
+    if seconds:
+        base = base + np.timedelta64(seconds, 's')
+    return base
+
+
+def _expand(values: List[Any], inverse) -> List[Any]:
+    return [values[index] for index in inverse.ravel().tolist()]
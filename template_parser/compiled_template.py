@@ -0,0 +1,250 @@
+import json
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple, Union
+from .constants import PLACEHOLDER_PATTERN
+from .helpers.frozen import _Frozen
+from .type_registry import PlaceholderType, get_type
+
+# Returned by a resolver to leave the placeholder text in the output untouched.
+UNRESOLVED = object()
+
+Path = Tuple[Union[str, int], ...]
+Resolver = Callable[['PlaceholderSpec', str], Any]
+
+
+def parse_options(options_str: Optional[str]) -> Dict[str, Any]:
+    options = {}
+    if options_str:
+        for opt in options_str.lstrip('|').split('|'):
+            if '=' in opt:
+                key, value = opt.split('=', 1)
+                options[key.strip()] = value.strip()
+            else:
+                options[opt.strip()] = True
+    return options
+
+
+class PlaceholderSpec(_Frozen):
+    __slots__ = ('text', 'name', 'type', 'kind', 'options', 'options_key')
+
+    def __init__(self, text: str, name: str, typ: str, options: Dict[str, Any]):
+        object.__setattr__(self, 'text', text)
+        object.__setattr__(self, 'name', name)
+        object.__setattr__(self, 'type', typ)
+        object.__setattr__(self, 'kind', get_type(typ))
+        object.__setattr__(self, 'options', MappingProxyType(dict(options)))
+        object.__setattr__(self, 'options_key', tuple(sorted(options.items(), key=lambda item: item[0])))
+
+    @classmethod
+    def from_match(cls, match) -> 'PlaceholderSpec':
+        return cls(
+            match.group(0),
+            match.group('name'),
+            match.group('type') or 'str',
+            parse_options(match.group('options'))
+        )
+
+    def __repr__(self) -> str:
+        return f"PlaceholderSpec({self.text!r})"
+
+
+class PlaceholderSite(_Frozen):
+    __slots__ = ('path', 'text', 'full', 'segments')
+
+    def __init__(self, path: Path, text: str, full: bool, segments: Tuple[Union[str, PlaceholderSpec], ...]):
+        object.__setattr__(self, 'path', path)
+        object.__setattr__(self, 'text', text)
+        object.__setattr__(self, 'full', full)
+        object.__setattr__(self, 'segments', segments)
+
+    @property
+    def specs(self) -> Tuple[PlaceholderSpec, ...]:
+        return tuple(seg for seg in self.segments if isinstance(seg, PlaceholderSpec))
+
+    def render(self, resolve: Resolver) -> Any:
+        if self.full:
+            value = resolve(self.segments[0], self.text)
+            return self.text if value is UNRESOLVED else value
+        parts = []
+        for segment in self.segments:
+            if isinstance(segment, PlaceholderSpec):
+                value = resolve(segment, segment.text)
+                parts.append(segment.text if value is UNRESOLVED else str(value))
+            else:
+                parts.append(segment)
+        return ''.join(parts)
+
+    def __repr__(self) -> str:
+        return f"PlaceholderSite(path={self.path!r}, text={self.text!r}, full={self.full})"
+
+
+class CompiledTemplate(_Frozen):
+    """A parsed template together with the location of every placeholder in it.
+
+    render() returns a new document that shares no containers with ``data``,
+    so callers may mutate it. Callers that only serialize the result can pass
+    copy_static=False to share the placeholder-free subtrees instead; those
+    must then not be mutated.
+    """
+    # Weak-referenceable so per-template caches, like RenderCache's template
+    # keys, let go of templates that serve and watch have replaced.
+    __slots__ = ('source', 'data', 'sites', 'placeholders', '_plan', '__weakref__')
+
+    def __init__(self, source: str, data: Any, sites: Optional[Tuple[PlaceholderSite, ...]] = None):
+        if sites is None:
+            sites = []
+            plan = _build_plan(data, (), sites, {})
+        else:
+            plan = _plan_from_sites(sites)
+        placeholders = {}
+        for site in sites:
+            for spec in site.specs:
+                placeholders[spec.name] = {'type': spec.type, 'options': dict(spec.options)}
+        object.__setattr__(self, 'source', source)
+        object.__setattr__(self, 'data', data)
+        object.__setattr__(self, 'sites', tuple(sites))
+        object.__setattr__(self, 'placeholders', MappingProxyType(placeholders))
+        object.__setattr__(self, '_plan', plan)
+
+    def render(self, resolve: Resolver, copy_static: bool = True) -> Any:
+        copy = _copy_static if copy_static else _shared
+        if self._plan is None:
+            return copy(self.data)
+        return _render_node(self.data, self._plan, resolve, copy)
+
+    def __reduce__(self):
+        # Pickled as the source and the sites: loading re-parses the source with
+        # json.loads and rebuilds the plan from the site paths, which is smaller and
+        # faster than pickling and restoring every node of the document.
+        sites = tuple((site.path, site.full, site.segments) for site in self.sites)
+        return _restore_compiled, (self.source, sites)
+
+    def __repr__(self) -> str:
+        return f"CompiledTemplate(sites={len(self.sites)})"
+
+
+def _restore_compiled(source: str, site_states: Tuple[Tuple[Path, bool, tuple], ...]) -> CompiledTemplate:
+    data = json.loads(source)
+    sites = []
+    for path, full, segments in site_states:
+        node = data
+        for key in path:
+            node = node[key]
+        sites.append(PlaceholderSite(path, node, full, segments))
+    return CompiledTemplate(source, data, tuple(sites))
+
+
+def compile_template(template_text: str) -> CompiledTemplate:
+    return CompiledTemplate(template_text, json.loads(template_text))
+
+
+def compile_at(template_text: str, site_paths: Tuple[Path, ...]) -> CompiledTemplate:
+    """Compile a template whose placeholder strings are known to be at site_paths.
+
+    Only those strings are parsed; the rest of the document is not walked.
+    Raises LookupError or TypeError if a path does not lead to a string, and
+    ValueError if that string has no placeholder.
+    """
+    data = json.loads(template_text)
+    specs: Dict[str, PlaceholderSpec] = {}
+    sites = []
+    for path in site_paths:
+        node = data
+        for key in path:
+            node = node[key]
+        if not isinstance(node, str):
+            raise TypeError(f"{path!r} is not a string")
+        site = compile_string(path, node, specs)
+        if site is None:
+            raise ValueError(f"{path!r} has no placeholder")
+        sites.append(site)
+    return CompiledTemplate(template_text, data, tuple(sites))
+
+
+def compile_string(path: Path, text: str,
+                   specs: Optional[Dict[str, PlaceholderSpec]] = None) -> Optional[PlaceholderSite]:
+    # specs, when given, maps placeholder text to the spec already built for it, so
+    # a placeholder repeated across a template is one shared (immutable) object.
+    match_full = PLACEHOLDER_PATTERN.fullmatch(text.strip())
+    if match_full:
+        return PlaceholderSite(path, text, True, (_get_spec(match_full, specs),))
+
+    segments = []
+    position = 0
+    for match in PLACEHOLDER_PATTERN.finditer(text):
+        if match.start() > position:
+            segments.append(text[position:match.start()])
+        segments.append(_get_spec(match, specs))
+        position = match.end()
+    if not segments:
+        return None
+    if position < len(text):
+        segments.append(text[position:])
+    return PlaceholderSite(path, text, False, tuple(segments))
+
+
+def _get_spec(match, specs: Optional[Dict[str, PlaceholderSpec]]) -> PlaceholderSpec:
+    if specs is None:
+        return PlaceholderSpec.from_match(match)
+    spec = specs.get(match.group(0))
+    if spec is None:
+        spec = specs[match.group(0)] = PlaceholderSpec.from_match(match)
+    return spec
+
+
+def _build_plan(node: Any, path: Path, sites: list, specs: Dict[str, PlaceholderSpec]):
+    if isinstance(node, dict):
+        items = node.items()
+    elif isinstance(node, list):
+        items = enumerate(node)
+    elif isinstance(node, str):
+        site = compile_string(path, node, specs)
+        if site is not None:
+            sites.append(site)
+        return site
+    else:
+        return None
+
+    plan = {}
+    for key, value in items:
+        child_plan = _build_plan(value, path + (key,), sites, specs)
+        if child_plan is not None:
+            plan[key] = child_plan
+    return plan or None
+
+
+def _plan_from_sites(sites: Tuple[PlaceholderSite, ...]):
+    if not sites:
+        return None
+    if not sites[0].path:
+        return sites[0]
+    plan = {}
+    for site in sites:
+        node = plan
+        for key in site.path[:-1]:
+            node = node.setdefault(key, {})
+        node[site.path[-1]] = site
+    return plan
+
+
+def _render_node(node: Any, plan: Union[PlaceholderSite, Mapping], resolve: Resolver,
+                 copy: Callable[[Any], Any]) -> Any:
+    if isinstance(plan, PlaceholderSite):
+        return plan.render(resolve)
+    if isinstance(node, dict):
+        return {key: _render_node(value, plan[key], resolve, copy) if key in plan else copy(value)
+                for key, value in node.items()}
+    return [_render_node(value, plan[index], resolve, copy) if index in plan else copy(value)
+            for index, value in enumerate(node)]
+
+
+def _copy_static(node: Any) -> Any:
+    if isinstance(node, dict):
+        return {key: _copy_static(value) for key, value in node.items()}
+    if isinstance(node, list):
+        return [_copy_static(value) for value in node]
+    return node
+
+
+def _shared(node: Any) -> Any:
+    return node
@@ -1,9 +1,19 @@
 import os
 import json
-from typing import Any, Dict, List
+import time
+import uuid
+import struct
+import threading
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
 from .interfaces import IConfigManager, IFileManager
 from .user_interface import UserInterface
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
 class ConfigManager(IConfigManager):
     def __init__(self, config_path, file_manager: IFileManager, user_interface: UserInterface):
         self.config_path = config_path
@@ -34,6 +44,316 @@ class ConfigManager(IConfigManager):
         except Exception as e:
             self.user_interface.display_error(f"Error writing to {self.config_path}: {e}")
 
+class _PendingCommit:
+    __slots__ = ('entries', 'done', 'error')
+
+    def __init__(self, entries: List[Dict[str, Any]]):
+        self.entries = entries
+        self.done = False
+        self.error = None
+
+
+class JsonLinesConfigManager(IConfigManager):
+    """Append-only history: one JSON entry per line plus a fixed-width offset index.
+
+    Saving an entry appends one line and one index record, and nothing is read
+    until entries are actually requested. Appends hold an exclusive flock on the
+    history file and are group-committed: entries saved by other threads while a
+    commit is in progress are written by the next one, and a process that finds
+    the lock taken leaves its entries in a spool directory next to the history,
+    which whichever process holds the lock next appends along with its own, with
+    a single sync (subject to the file manager's durability policy).
+    """
+    INDEX_RECORD = struct.Struct('<Q')
+    INDEX_WRITE_BATCH = 8192
+    SPOOL_POLL_INTERVAL = 0.0005
+
+    def __init__(self, history_path, file_manager: IFileManager, user_interface: UserInterface,
+                 legacy_path: Optional[str] = None):
+        self.history_path = history_path
+        self.index_path = history_path + '.idx'
+        self.spool_path = history_path + '.spool'
+        self.legacy_path = legacy_path
+        self.file_manager = file_manager
+        self.user_interface = user_interface
+        self.commits = 0
+        self._loaded = False
+        # (history size, index size) as this process last left them.
+        self._tail: Optional[Tuple[int, int]] = None
+        self._commit_lock = threading.Lock()
+        self._queue_lock = threading.Lock()
+        self._queue: List[_PendingCommit] = []
+        self._deferred = threading.local()
+
+    def load_config(self) -> None:
+        if self._loaded:
+            return
+        try:
+            self.file_manager.ensure_directory(os.path.dirname(self.history_path) or '.')
+            with self._commit_lock, open(self.history_path, 'ab+') as history:
+                _lock_exclusive(history)
+                if self.legacy_path and os.path.isfile(self.legacy_path) and history.seek(0, os.SEEK_END) == 0:
+                    self.migrate_legacy(history)
+                self._repair_index(history)
+            self._loaded = True
+        except Exception as e:
+            self.user_interface.display_error(f"Error reading {self.history_path}: {e}")
+
+    def save_config(self, config_entry: Dict[str, Any]) -> None:
+        deferred = getattr(self._deferred, 'entries', None)
+        if deferred is not None:
+            deferred.append(config_entry)
+            if self._deferred.max_pending and len(deferred) >= self._deferred.max_pending:
+                self.flush_deferred()
+            return
+        if self.save_configs([config_entry]):
+            self.user_interface.display_message(f"User inputs appended to {self.history_path}")
+
+    def save_configs(self, entries: List[Dict[str, Any]]) -> bool:
+        if not entries:
+            return True
+        self.load_config()
+        try:
+            self._commit(entries)
+            return True
+        except Exception as e:
+            self.user_interface.display_error(f"Error writing to {self.history_path}: {e}")
+            return False
+
+    @contextmanager
+    def group_commit(self, max_pending: Optional[int] = None):
+        # Entries saved by this thread inside the block are buffered and committed
+        # together, every max_pending entries and when the block exits.
+        if getattr(self._deferred, 'entries', None) is not None:
+            yield self
+            return
+        self._deferred.entries = []
+        self._deferred.max_pending = max_pending
+        try:
+            yield self
+        finally:
+            try:
+                self.flush_deferred()
+            finally:
+                self._deferred.entries = None
+
+    def flush_deferred(self) -> None:
+        entries = getattr(self._deferred, 'entries', None)
+        if not entries:
+            return
+        self._deferred.entries = []
+        if self.save_configs(entries):
+            self.user_interface.display_message(f"{len(entries)} entries appended to {self.history_path}")
+
+    def __len__(self) -> int:
+        self.load_config()
+        try:
+            return os.path.getsize(self.index_path) // self.INDEX_RECORD.size
+        except FileNotFoundError:
+            return 0
+
+    def get_entry(self, position: int) -> Dict[str, Any]:
+        count = len(self)
+        if position < 0:
+            position += count
+        if not 0 <= position < count:
+            raise IndexError(f"History entry {position} out of range")
+        with open(self.index_path, 'rb') as index:
+            index.seek(position * self.INDEX_RECORD.size)
+            offset, = self.INDEX_RECORD.unpack(index.read(self.INDEX_RECORD.size))
+        with open(self.history_path, 'rb') as history:
+            history.seek(offset)
+            return json.loads(history.readline())
+
+    def iter_entries(self) -> Iterator[Dict[str, Any]]:
+        self.load_config()
+        if not os.path.isfile(self.history_path):
+            return
+        with open(self.history_path, 'rb') as history:
+            for line_number, line in enumerate(history, start=1):
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    self.user_interface.display_warning(f"Skipping invalid entry on line {line_number} of {self.history_path}.")
+
+    @property
+    def config_data(self) -> List[Dict[str, Any]]:
+        return list(self.iter_entries())
+
+    def migrate_legacy(self, history: BinaryIO) -> None:
+        try:
+            content: str = self.file_manager.read_file(self.legacy_path)
+            entries: Any = json.loads(content)
+        except json.JSONDecodeError:
+            self.user_interface.display_warning(f"{self.legacy_path} contains invalid JSON. Skipping migration.")
+            return
+        if not isinstance(entries, list):
+            self.user_interface.display_warning(f"{self.legacy_path} is not a list. Skipping migration.")
+            return
+        self._write_entries(history, entries)
+        os.replace(self.legacy_path, self.legacy_path + '.migrated')
+        self.user_interface.display_message(
+            f"Migrated {len(entries)} entries from {self.legacy_path} to {self.history_path}"
+        )
+
+    def _commit(self, entries: List[Dict[str, Any]]) -> None:
+        # Group commit: whoever gets the commit lock writes every entry queued so far,
+        # so writers arriving during a commit share the next lock and fsync.
+        pending = _PendingCommit(entries)
+        with self._queue_lock:
+            self._queue.append(pending)
+        with self._commit_lock:
+            if not pending.done:
+                with self._queue_lock:
+                    batch, self._queue = self._queue, []
+                try:
+                    if self._append([entry for item in batch for entry in item.entries]):
+                        self.commits += 1
+                except Exception as e:
+                    for item in batch:
+                        item.error = e
+                for item in batch:
+                    item.done = True
+        if pending.error is not None:
+            raise pending.error
+
+    def _append(self, entries: List[Dict[str, Any]]) -> bool:
+        # The same across processes: if the history lock is taken, the entries are
+        # spooled, and the holder, or the next process to get the lock, appends
+        # every spooled entry with its own and syncs once. A spool file is only
+        # removed once its entries are synced, so a waiter polls for either its
+        # file to disappear (done, without ever taking the lock) or the lock to
+        # come free. Returns whether this call wrote.
+        lines = [json.dumps(entry).encode('utf-8') + b'\n' for entry in entries]
+        with open(self.history_path, 'ab+') as history:
+            if not _try_lock_exclusive(history):
+                spooled = self._spool(lines)
+                while not _try_lock_exclusive(history):
+                    if not os.path.exists(spooled):
+                        return False
+                    time.sleep(self.SPOOL_POLL_INTERVAL)
+                if not os.path.exists(spooled):
+                    return False
+                lines = []
+            # Another process may have crashed mid-append since this one
+            # last looked; appending after a torn line would corrupt the index.
+            # Unchanged sizes mean nobody else has written since.
+            if self._tail != self._current_tail(history):
+                self._repair_index(history)
+            spool_files, spooled_lines = self._read_spool()
+            self._write_lines(history, spooled_lines + lines)
+            # Still under the lock, or the next holder would append them again.
+            for path in spool_files:
+                os.unlink(path)
+        return True
+
+    def _spool(self, lines: List[bytes]) -> str:
+        # Written under a hidden name and renamed, so a drainer never sees a partial file.
+        # Names sort in arrival order.
+        os.makedirs(self.spool_path, exist_ok=True)
+        name = f"{time.time_ns():020d}-{os.getpid()}-{uuid.uuid4().hex[:8]}.jsonl"
+        temp_path = os.path.join(self.spool_path, '.' + name)
+        with open(temp_path, 'xb') as f:
+            f.write(b''.join(lines))
+        path = os.path.join(self.spool_path, name)
+        os.replace(temp_path, path)
+        return path
+
+    def _read_spool(self) -> Tuple[List[str], List[bytes]]:
+        try:
+            names = sorted(name for name in os.listdir(self.spool_path) if not name.startswith('.'))
+        except FileNotFoundError:
+            return [], []
+        paths = []
+        lines = []
+        for name in names:
+            path = os.path.join(self.spool_path, name)
+            with open(path, 'rb') as f:
+                lines.extend(f.read().splitlines(keepends=True))
+            paths.append(path)
+        return paths, lines
+
+    def _write_entries(self, history: BinaryIO, entries: List[Dict[str, Any]]) -> None:
+        self._write_lines(history, [json.dumps(entry).encode('utf-8') + b'\n' for entry in entries])
+
+    def _write_lines(self, history: BinaryIO, lines: List[bytes]) -> None:
+        # The index is written after the history is synced, so it never points past
+        # durable data; a lagging index is caught up by _repair_index.
+        offset = history.seek(0, os.SEEK_END)
+        history.write(b''.join(lines))
+        self.file_manager.sync_file(history)
+        records = []
+        for line in lines:
+            records.append(self.INDEX_RECORD.pack(offset))
+            offset += len(line)
+        with open(self.index_path, 'ab') as index:
+            index.write(b''.join(records))
+            self._tail = (offset, index.tell())
+
+    def _current_tail(self, history: BinaryIO) -> Tuple[int, int]:
+        try:
+            index_size = os.path.getsize(self.index_path)
+        except FileNotFoundError:
+            index_size = 0
+        return os.fstat(history.fileno()).st_size, index_size
+
+    def _repair_index(self, history: BinaryIO) -> None:
+        # Bring the index back in line with the history after an interrupted write:
+        # drop a torn trailing line and index any complete lines the index is missing.
+        # Cheap when nothing needs repairing: one index record and one history line are read.
+        history_size = history.seek(0, os.SEEK_END)
+        stored_index_size = os.path.getsize(self.index_path) if os.path.isfile(self.index_path) else 0
+        index_size = stored_index_size - stored_index_size % self.INDEX_RECORD.size
+        with open(self.index_path, 'ab+') as index:
+            start = 0
+            if index_size:
+                index.seek(index_size - self.INDEX_RECORD.size)
+                last, = self.INDEX_RECORD.unpack(index.read(self.INDEX_RECORD.size))
+                history.seek(last)
+                if last < history_size and history.readline().endswith(b'\n'):
+                    start = history.tell()
+                else:
+                    # The index may run ahead of history lost in a crash; rebuild it.
+                    index_size = 0
+            if index_size != stored_index_size:
+                index.truncate(index_size)
+            if start == history_size:
+                return
+            index.seek(0, os.SEEK_END)
+            history.seek(start)
+            records = []
+            offset = start
+            for line in history:
+                if not line.endswith(b'\n'):
+                    history.truncate(offset)
+                    break
+                records.append(self.INDEX_RECORD.pack(offset))
+                offset += len(line)
+                # Written in batches, so rebuilding the index of a long history takes bounded memory.
+                if len(records) >= self.INDEX_WRITE_BATCH:
+                    index.write(b''.join(records))
+                    records.clear()
+            if records:
+                index.write(b''.join(records))
+
+
+def _lock_exclusive(handle: BinaryIO) -> None:
+    # Released when the handle is closed. Without fcntl (Windows) appends are
+    # only serialized within the process.
+    if fcntl is not None:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+
+
+def _try_lock_exclusive(handle: BinaryIO) -> bool:
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except BlockingIOError:
+        return False
+
+
 class ProgramConfigManager:
     def __init__(self, config_path, file_manager: IFileManager):
         self.config_path = config_path
@@ -9,6 +9,21 @@ DATA_TYPES = {
     'CURRENCY': 'currency'
 }
 
+DURABILITY_POLICIES = ('none', 'per-file', 'batched')
+DEFAULT_DURABILITY_BATCH_SIZE = 64
+
+VALIDATION_POLICIES = ('skip', 'fail', 'fail-fast')
+
+DEFAULT_IO_THREADS = 4
+DEFAULT_MAX_PENDING = 64
+DEFAULT_POLL_INTERVAL = 0.5
+
+DEFAULT_SOCKET_NAME = 'serve.sock'
+DEFAULT_CLIENT_TIMEOUT = 60.0
+
+ZYGOTE_ENV_VAR = 'TEMPLATE_PARSER_ZYGOTE'
+DEFAULT_ZYGOTE_IDLE_TIMEOUT = 30 * 60
+
 PLACEHOLDER_PATTERN = re.compile(
     r'<(?P<name>\w+)(:(?P<type>\w+))?(?P<options>(\|[^>]+)?)>'
 )
\ No newline at end of file
@@ -0,0 +1,35 @@
+from typing import Any
+
+
+class TemplateParserError(Exception):
+    pass
+
+
+class TemplateSyntaxError(TemplateParserError, ValueError):
+    def __init__(self, message: str, line: int = 0, column: int = 0):
+        super().__init__(message)
+        self.line = line
+        self.column = column
+
+
+class ConfigError(TemplateParserError, ValueError):
+    pass
+
+
+class MissingInputError(TemplateParserError, ValueError):
+    def __init__(self, name: str):
+        super().__init__(f"Value for '{name}' not provided.")
+        self.name = name
+
+
+class InvalidInputError(TemplateParserError, ValueError):
+    def __init__(self, name: str, typ: str, value: Any, reason: str):
+        super().__init__(f"Invalid value {value!r} for '{name}' (type: {typ}): {reason}")
+        self.name = name
+        self.type = typ
+        self.value = value
+        self.reason = reason
+
+
+class OutputFilenameError(TemplateParserError, ValueError):
+    pass
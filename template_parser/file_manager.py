@@ -1,8 +1,32 @@
 import os
-from typing import List
+import json
+import uuid
+import threading
+from typing import Any, IO, List, Optional, Set, Tuple
+from .constants import DEFAULT_DURABILITY_BATCH_SIZE, DURABILITY_POLICIES
+from .helpers.digest import content_hasher
 from .interfaces import IFileManager
 
+WRITE_BUFFER_SIZE = 64 * 1024
+
 class FileManager(IFileManager):
+    """Reads and writes files; every write lands atomically via a temp file and os.replace.
+
+    durability controls fsync: 'none' never syncs, 'per-file' syncs each file and
+    its directory, and 'batched' syncs each file's contents before the rename, so
+    a crash can never leave an empty or truncated file in place of a good one, but
+    syncs its directory only once every batch_size files (and on flush).
+    """
+    def __init__(self, durability: str = 'none', batch_size: int = DEFAULT_DURABILITY_BATCH_SIZE):
+        if durability not in DURABILITY_POLICIES:
+            raise ValueError(f"Unknown durability policy '{durability}'. Expected one of: {', '.join(DURABILITY_POLICIES)}.")
+        self.durability = durability
+        self.batch_size = max(1, batch_size)
+        self._lock = threading.Lock()
+        self._unsynced_directories: Set[str] = set()
+        self._unsynced_files = 0
+        self._ensured_directories: Set[str] = set()
+
     def read_file(self, file_path: str) -> str:
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
@@ -12,11 +36,42 @@ class FileManager(IFileManager):
 
     def write_file(self, file_path: str, content: str) -> None:
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
+            with self._open_atomic(file_path) as f:
                 f.write(content)
         except Exception as e:
             raise IOError(f"Error writing to file {file_path}: {e}") from e
 
+    def open_file(self, file_path: str, mode: str = 'r') -> IO[str]:
+        try:
+            if mode == 'w':
+                return self._open_atomic(file_path)
+            return open(file_path, mode, encoding='utf-8')
+        except Exception as e:
+            action = 'reading' if 'r' in mode else 'writing to'
+            raise IOError(f"Error {action} file {file_path}: {e}") from e
+
+    def write_json(self, file_path: str, data: Any, indent: Optional[int] = None) -> Tuple[str, int]:
+        # Encode incrementally and flush in bounded blocks, so the document is never
+        # held in memory as one string. Returns the content digest and size of what
+        # was written, hashed block by block on the way out.
+        hasher = content_hasher()
+        size = 0
+        try:
+            with self._open_atomic(file_path, binary=True) as f:
+                buffer = []
+                buffered = 0
+                for chunk in json.JSONEncoder(indent=indent).iterencode(data):
+                    buffer.append(chunk)
+                    buffered += len(chunk)
+                    if buffered >= WRITE_BUFFER_SIZE:
+                        size += _write_block(f, hasher, buffer)
+                        buffer.clear()
+                        buffered = 0
+                size += _write_block(f, hasher, buffer)
+        except Exception as e:
+            raise IOError(f"Error writing to file {file_path}: {e}") from e
+        return hasher.hexdigest(), size
+
     def list_directory(self, directory_path: str, extension: str) -> List[str]:
         try:
             return [f for f in os.listdir(directory_path) if f.endswith(extension)]
@@ -26,7 +81,127 @@ class FileManager(IFileManager):
             raise IOError(f"Error accessing directory '{directory_path}': {e}") from e
 
     def ensure_directory(self, directory_path: str) -> None:
+        key = os.path.abspath(directory_path)
+        if key in self._ensured_directories:
+            return
         try:
             os.makedirs(directory_path, exist_ok=True)
+            self._ensured_directories.add(key)
         except Exception as e:
             raise PermissionError(f"Error creating directory '{directory_path}': {e}") from e
+
+    def sync_file(self, handle: IO) -> None:
+        handle.flush()
+        if self.durability == 'batched':
+            # Renames of files written before this one must not become durable after it.
+            self.flush()
+        if self.durability != 'none':
+            os.fsync(handle.fileno())
+
+    def flush(self) -> None:
+        with self._lock:
+            directories, self._unsynced_directories = self._unsynced_directories, set()
+            self._unsynced_files = 0
+        for directory in directories:
+            _sync_directory(directory)
+
+    def _open_atomic(self, file_path: str, binary: bool = False) -> '_AtomicFile':
+        # Same directory as the destination, so os.replace never crosses filesystems.
+        head, tail = os.path.split(file_path)
+        temp_path = os.path.join(head, f".{tail}.{uuid.uuid4().hex[:12]}.tmp")
+        mode, encoding = ('xb', None) if binary else ('x', 'utf-8')
+        try:
+            handle = open(temp_path, mode, encoding=encoding)
+        except FileNotFoundError:
+            # A directory ensure_directory() created may have been removed since,
+            # e.g. while serving or watching; recreate it once.
+            directory = os.path.abspath(head)
+            if directory not in self._ensured_directories:
+                raise
+            self._ensured_directories.discard(directory)
+            self.ensure_directory(head)
+            handle = open(temp_path, mode, encoding=encoding)
+        return _AtomicFile(self, handle, temp_path, file_path)
+
+    def _commit(self, handle: IO, temp_path: str, file_path: str) -> None:
+        if self.durability != 'none':
+            handle.flush()
+            os.fsync(handle.fileno())
+        handle.close()
+        os.replace(temp_path, file_path)
+        directory = os.path.dirname(os.path.abspath(file_path))
+        if self.durability == 'per-file':
+            _sync_directory(directory)
+        elif self.durability == 'batched':
+            with self._lock:
+                self._unsynced_directories.add(directory)
+                self._unsynced_files += 1
+                full = self._unsynced_files >= self.batch_size
+            if full:
+                self.flush()
+
+
+class _AtomicFile:
+    # Text or binary handle onto a temp file that replaces the destination when closed
+    # cleanly and is removed if the block raises.
+    def __init__(self, manager: FileManager, handle: IO[str], temp_path: str, file_path: str):
+        self.manager = manager
+        self.handle = handle
+        self.temp_path = temp_path
+        self.file_path = file_path
+        self.closed = False
+
+    def write(self, data) -> int:
+        return self.handle.write(data)
+
+    def writelines(self, lines) -> None:
+        self.handle.writelines(lines)
+
+    def flush(self) -> None:
+        self.handle.flush()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.manager._commit(self.handle, self.temp_path, self.file_path)
+        except BaseException:
+            self.discard()
+            raise
+
+    def discard(self) -> None:
+        self.closed = True
+        self.handle.close()
+        if os.path.exists(self.temp_path):
+            os.unlink(self.temp_path)
+
+    def __enter__(self) -> '_AtomicFile':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+def _write_block(handle: '_AtomicFile', hasher, chunks: List[str]) -> int:
+    block = ''.join(chunks).encode('utf-8')
+    hasher.update(block)
+    handle.write(block)
+    return len(block)
+
+
+def _sync_directory(directory: str) -> None:
+    # Persists renames into the directory; not supported on Windows.
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
@@ -0,0 +1,52 @@
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+# babel is imported on first use; loading its locale machinery dominates CLI startup.
+if TYPE_CHECKING:
+    from babel.core import Locale
+    from babel.numbers import NumberPattern
+
+SHORT_CURRENCY_PATTERN = '¤#,##0.00'
+
+
+class CurrencyFormatter:
+    __slots__ = ('locale', 'currency_code', 'pattern', 'symbol')
+
+    def __init__(self, locale: 'Locale', currency_code: str, pattern: 'NumberPattern', symbol: str = None):
+        self.locale = locale
+        self.currency_code = currency_code
+        self.pattern = pattern
+        # Symbol stripped from the formatted value, or None to keep it.
+        self.symbol = symbol
+
+    def format(self, number: float) -> str:
+        formatted = self.pattern.apply(number, self.locale, currency=self.currency_code, currency_digits=True)
+        if self.symbol is not None:
+            formatted = formatted.replace(self.symbol, '').strip()
+        return formatted
+
+
+def get_currency_formatter(locale: str, currency_code: str, style: str = 'standard', include_symbol: bool = True) -> CurrencyFormatter:
+    # The short pattern always carries the symbol, so the flag only matters for the standard style.
+    if style == 'short':
+        return _build_currency_formatter(locale, currency_code, 'short', True)
+    return _build_currency_formatter(locale, currency_code, 'standard', include_symbol)
+
+
+@lru_cache(maxsize=None)
+def _build_currency_formatter(locale: str, currency_code: str, style: str, include_symbol: bool) -> CurrencyFormatter:
+    from babel.core import Locale
+    from babel.numbers import get_currency_symbol
+    parsed_locale = Locale.parse(locale)
+    if style == 'short':
+        pattern = _parse_short_pattern()
+    else:
+        pattern = parsed_locale.currency_formats['standard']
+    symbol = None if include_symbol else get_currency_symbol(currency_code, parsed_locale)
+    return CurrencyFormatter(parsed_locale, currency_code, pattern, symbol)
+
+
+@lru_cache(maxsize=None)
+def _parse_short_pattern() -> 'NumberPattern':
+    from babel.numbers import parse_pattern
+    return parse_pattern(SHORT_CURRENCY_PATTERN)
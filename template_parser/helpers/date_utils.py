@@ -1,15 +1,58 @@
-from dateutil.relativedelta import relativedelta
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Optional, Tuple
 
-def apply_date_operations(date_obj, operations):
+if TYPE_CHECKING:
+    from dateutil.relativedelta import relativedelta
+
+INPUT_DATE_FORMATS = ('%d-%m-%Y %H:%M', '%d-%m-%Y')
+DEFAULT_OUTPUT_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+# Accepts exactly what datetime.strptime accepts for INPUT_DATE_FORMATS, in a single match.
+INPUT_DATE_PATTERN = re.compile(
+    r'(?P<d>3[0-1]|[1-2]\d|0[1-9]|[1-9]| [1-9])'
+    r'-(?P<m>1[0-2]|0[1-9]|[1-9])'
+    r'-(?P<Y>\d\d\d\d)'
+    r'(?:\s+(?P<H>2[0-3]|[0-1]\d|\d):(?P<M>[0-5]\d|\d))?',
+    re.IGNORECASE
+)
+
+ALLOWED_DATE_OPERATIONS = frozenset((
+    'add_years', 'subtract_years', 'add_months', 'subtract_months',
+    'add_days', 'subtract_days', 'add_weeks', 'subtract_weeks',
+    'add_hours', 'subtract_hours', 'add_minutes', 'subtract_minutes',
+    'add_seconds', 'subtract_seconds'
+))
+
+# strftime directives that can be rendered without calling strftime.
+_FAST_DIRECTIVES = {
+    'Y': '{0}', 'm': '{1:02d}', 'd': '{2:02d}', 'H': '{3:02d}',
+    'M': '{4:02d}', 'S': '{5:02d}', 'y': '{6:02d}', '%': '%',
+}
+_DIRECTIVE_PATTERN = re.compile(r'%(.?)', re.DOTALL)
+
+
+@lru_cache(maxsize=4096)
+def parse_input_date(value: str) -> Optional[datetime]:
+    match = INPUT_DATE_PATTERN.fullmatch(value.strip())
+    if match is None:
+        return None
+    hour, minute = match.group('H'), match.group('M')
+    try:
+        return datetime(
+            int(match.group('Y')), int(match.group('m')), int(match.group('d')),
+            int(hour) if hour else 0, int(minute) if minute else 0
+        )
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=1024)
+def get_date_delta(operations: Tuple[Tuple[str, Any], ...]) -> Optional['relativedelta']:
     delta_args = {}
-    allowed_operations = [
-        'add_years', 'subtract_years', 'add_months', 'subtract_months',
-        'add_days', 'subtract_days', 'add_weeks', 'subtract_weeks',
-        'add_hours', 'subtract_hours', 'add_minutes', 'subtract_minutes',
-        'add_seconds', 'subtract_seconds'
-    ]
-    for op_name, value in operations.items():
-        if op_name in allowed_operations:
+    for op_name, value in operations:
+        if op_name in ALLOWED_DATE_OPERATIONS:
             try:
                 amount = int(value)
             except ValueError:
@@ -18,5 +61,49 @@ def apply_date_operations(date_obj, operations):
                 amount = -amount
             delta_key = op_name.replace('add_', '').replace('subtract_', '')
             delta_args[delta_key] = delta_args.get(delta_key, 0) + amount
-    return date_obj + relativedelta(**delta_args)
+    if not delta_args:
+        return None
+    from dateutil.relativedelta import relativedelta
+    return relativedelta(**delta_args)
+
+
+def apply_date_operations(date_obj, operations):
+    delta = get_date_delta(_freeze(operations.items()))
+    return date_obj + delta if delta is not None else date_obj
+
+
+@lru_cache(maxsize=1024)
+def compile_date_format(output_format: str) -> Callable[[datetime], str]:
+    pieces = []
+    position = 0
+    for match in _DIRECTIVE_PATTERN.finditer(output_format):
+        directive = _FAST_DIRECTIVES.get(match.group(1))
+        if directive is None:
+            return lambda date_obj: date_obj.strftime(output_format)
+        pieces.append(output_format[position:match.start()].replace('{', '{{').replace('}', '}}'))
+        pieces.append(directive)
+        position = match.end()
+    pieces.append(output_format[position:].replace('{', '{{').replace('}', '}}'))
+    template = ''.join(pieces)
+
+    def format_date(date_obj: datetime) -> str:
+        if date_obj.year < 1000:
+            # Platform strftime implementations disagree on padding small years.
+            return date_obj.strftime(output_format)
+        return template.format(
+            date_obj.year, date_obj.month, date_obj.day, date_obj.hour,
+            date_obj.minute, date_obj.second, date_obj.year % 100
+        )
+    return format_date
+
+
+def convert_date(date_obj: datetime, options: Dict[str, Any]) -> str:
+    options_key = _freeze(options.items())
+    delta = get_date_delta(options_key)
+    if delta is not None:
+        date_obj = date_obj + delta
+    return compile_date_format(options.get('format', DEFAULT_OUTPUT_FORMAT))(date_obj)
+
 
+def _freeze(items: Iterable[Tuple[str, Any]]) -> Tuple[Tuple[str, Any], ...]:
+    return tuple(sorted(items, key=lambda item: item[0]))
@@ -0,0 +1,12 @@
+import hashlib
+
+DIGEST_SIZE = 20
+
+
+def content_hasher():
+    """A hasher whose hexdigest() matches content_digest() of the same bytes."""
+    return hashlib.blake2b(digest_size=DIGEST_SIZE)
+
+
+def content_digest(content: bytes) -> str:
+    return hashlib.blake2b(content, digest_size=DIGEST_SIZE).hexdigest()
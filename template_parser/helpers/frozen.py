@@ -0,0 +1,33 @@
+from types import MappingProxyType
+
+
+class _Frozen:
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        # Pickle support for process pools; mapping proxies are not picklable.
+        state = {}
+        proxies = []
+        for cls in type(self).__mro__:
+            for name in getattr(cls, '__slots__', ()):
+                if name == '__weakref__':
+                    continue
+                value = getattr(self, name)
+                if isinstance(value, MappingProxyType):
+                    value = dict(value)
+                    proxies.append(name)
+                state[name] = value
+        return _restore_frozen, (type(self), state, tuple(proxies))
+
+
+def _restore_frozen(cls, state, proxies):
+    instance = object.__new__(cls)
+    for name, value in state.items():
+        object.__setattr__(instance, name, MappingProxyType(value) if name in proxies else value)
+    return instance
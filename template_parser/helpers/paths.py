@@ -0,0 +1,8 @@
+import os
+
+
+def is_within(path: str, directory: str) -> bool:
+    """Whether path, with symlinks resolved, is directory or somewhere below it."""
+    path = os.path.realpath(path)
+    directory = os.path.realpath(directory)
+    return os.path.commonpath([path, directory]) == directory
@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Callable, List, Optional, Any
+from concurrent.futures import Future
+from contextlib import nullcontext
+from typing import Callable, IO, List, Optional, Any, Tuple
 
 class IFileManager(ABC):
     @abstractmethod
@@ -10,6 +12,24 @@ class IFileManager(ABC):
     def write_file(self, file_path: str, content: str) -> None:
         pass
 
+    @abstractmethod
+    def open_file(self, file_path: str, mode: str = 'r') -> IO[str]:
+        pass
+
+    @abstractmethod
+    def write_json(self, file_path: str, data: Any, indent: Optional[int] = None) -> Tuple[str, int]:
+        pass
+
+    def submit_json(self, file_path: str, data: Any, indent: Optional[int] = None) -> Future:
+        # Managers that write in the background return the pending write; this
+        # one writes now and returns it already settled.
+        future = Future()
+        try:
+            future.set_result(self.write_json(file_path, data, indent))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
     @abstractmethod
     def list_directory(self, directory_path: str, extension: Optional[str] = None) -> List[str]:
         pass
@@ -18,6 +38,14 @@ class IFileManager(ABC):
     def ensure_directory(self, directory_path: str) -> None:
         pass
 
+    @abstractmethod
+    def sync_file(self, handle: IO) -> None:
+        pass
+
+    @abstractmethod
+    def flush(self) -> None:
+        pass
+
 class IInputCollector(ABC):
     @abstractmethod
     def collect_input(self, prompt: str, validation_func: Optional[Callable[[str], Any]] = None) -> str:
@@ -32,7 +60,14 @@ class IConfigManager(ABC):
     def save_config(self, config_entry: dict) -> None:
         pass
 
+    def group_commit(self, max_pending: Optional[int] = None):
+        return nullcontext()
+
 class ITemplateProcessor(ABC):
     @abstractmethod
     def extract_placeholders(self, template_text: str) -> List[str]:
         pass
+
+    @abstractmethod
+    def compile(self, template_text: str) -> Any:
+        pass
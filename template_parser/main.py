@@ -1,47 +1,406 @@
 import os
+import sys
 import argparse
-from .file_manager import FileManager
-from .input_collector import InputCollector
-from .config_manager import ConfigManager, ProgramConfigManager
-from .template_processor import TemplateProcessor
-from .application import TemplateApplication
-from .user_interface import UserInterface
-
-def main():
-    parser = argparse.ArgumentParser(description='Template Parser CLI')
-    parser.add_argument('template', nargs='?', help='Path to the template JSON file')
-    parser.add_argument('--config', help='Path to the program configuration file', default=None)
-    args = parser.parse_args()
+from functools import partial
+from typing import TYPE_CHECKING
+from .constants import (
+    DEFAULT_CLIENT_TIMEOUT, DEFAULT_DURABILITY_BATCH_SIZE, DEFAULT_MAX_PENDING, DEFAULT_POLL_INTERVAL,
+    DEFAULT_SOCKET_NAME, DURABILITY_POLICIES, VALIDATION_POLICIES, ZYGOTE_ENV_VAR
+)
+
+# Everything beyond argument parsing is imported on demand, so `--help`, usage
+# errors and commands that never reach a given module do not pay for importing it.
+if TYPE_CHECKING:
+    from .application import TemplateApplication
 
-    file_manager = FileManager()
+def build_application(program_config_path=None, output_dir=None, durability='batched',
+                      io_threads=0, max_pending=DEFAULT_MAX_PENDING, force=False) -> 'TemplateApplication':
+    from .file_manager import FileManager
+    from .async_file_manager import AsyncFileManager
+    from .input_collector import InputCollector
+    from .config_manager import JsonLinesConfigManager, ProgramConfigManager
+    from .template_processor import TemplateProcessor
+    from .template_manifest import TemplateManifest
+    from .render_cache import RENDER_CACHE_NAME, RenderCache
+    from .application import TemplateApplication
+    from .user_interface import UserInterface
+
+    file_manager = FileManager(durability=durability)
+    if io_threads > 0:
+        file_manager = AsyncFileManager(file_manager, io_threads, max_pending)
     input_collector = InputCollector()
 
     cwd = os.getcwd()
-    config_path = os.path.join(cwd, 'files', 'config.json')
-    program_config_path = args.config if args.config else os.path.join(cwd, 'files', 'program_config.json')
+    history_path = os.path.join(cwd, 'files', 'config.jsonl')
+    legacy_config_path = os.path.join(cwd, 'files', 'config.json')
+    program_config_path = program_config_path if program_config_path else os.path.join(cwd, 'files', 'program_config.json')
     templates_dir = os.path.join(cwd, 'files', 'templates')
-    output_dir = os.path.join(cwd, 'files', 'output')
+    output_dir = output_dir if output_dir else os.path.join(cwd, 'files', 'output')
 
     program_config_manager = ProgramConfigManager(program_config_path, file_manager)
     program_config_manager.load_config()
 
     template_processor = TemplateProcessor()
+    template_manifest = TemplateManifest(templates_dir, template_processor)
+    render_cache = RenderCache(os.path.join(output_dir, RENDER_CACHE_NAME), file_manager, force=force)
 
     user_interface = UserInterface(input_collector=input_collector)
-    config_manager = ConfigManager(config_path, file_manager, user_interface=user_interface)
+    config_manager = JsonLinesConfigManager(history_path, file_manager, user_interface=user_interface, legacy_path=legacy_config_path)
 
-    app = TemplateApplication(
+    return TemplateApplication(
         file_manager=file_manager,
         config_manager=config_manager,
         template_processor=template_processor,
         templates_dir=templates_dir,
         output_dir=output_dir,
         program_config_manager=program_config_manager,
-        user_interface=user_interface
+        user_interface=user_interface,
+        template_manifest=template_manifest,
+        render_cache=render_cache
+    )
+
+def batch_main(argv):
+    parser = argparse.ArgumentParser(prog='template-parser batch', description='Render a template once for every row of an inputs file')
+    parser.add_argument('template', help='Path to the template JSON file')
+    parser.add_argument('--inputs', required=True, help='Path to a .jsonl or .csv file with one set of inputs per row')
+    parser.add_argument('--config', help='Path to the program configuration file', default=None)
+    parser.add_argument('--output-dir', help='Directory where output files will be saved', default=None)
+    parser.add_argument('--workers', type=int, default=1, help='Number of worker processes used to validate and render rows (default: 1)')
+    parser.add_argument('--vectorize', action='store_true', help='Convert int, float, date and currency columns with NumPy (falls back to per-value conversion without it)')
+    parser.add_argument('--io-threads', type=int, default=0, help='Write outputs on this many background threads (default: 0, write inline)')
+    parser.add_argument('--max-pending', type=int, default=DEFAULT_MAX_PENDING,
+                        help=f'Most outputs queued for background writing before rendering waits (default: {DEFAULT_MAX_PENDING})')
+    parser.add_argument('--validate', choices=VALIDATION_POLICIES,
+                        help='Check every row before writing anything: skip renders only the valid rows, fail renders '
+                             'nothing if any row is invalid, fail-fast also stops checking at the first invalid row')
+    parser.add_argument('--validation-report', metavar='PATH',
+                        help='Write the rows that fail validation to this JSON file (implies --validate fail)')
+    add_durability_argument(parser)
+    add_force_argument(parser)
+    args = parser.parse_args(argv)
+    if args.validation_report and not args.validate:
+        args.validate = 'fail'
+
+    if args.workers < 1:
+        parser.error("--workers must be at least 1.")
+    if args.io_threads < 0:
+        parser.error("--io-threads cannot be negative.")
+    if args.max_pending < 1:
+        parser.error("--max-pending must be at least 1.")
+
+    if not os.path.isfile(args.template):
+        parser.error(f"The template file '{args.template}' does not exist.")
+    if not os.path.isfile(args.inputs):
+        parser.error(f"The inputs file '{args.inputs}' does not exist.")
+
+    from .async_file_manager import AsyncFileManager
+    from .batch import BatchRunner, read_input_rows
+    from .columnar import numpy_available
+
+    app = build_application(args.config, args.output_dir, args.durability, args.io_threads, args.max_pending, args.force)
+    if args.vectorize and not numpy_available():
+        app.user_interface.display_warning("NumPy is not installed; --vectorize falls back to per-value conversion.")
+    runner = BatchRunner(app)
+    try:
+        skip_rows = frozenset()
+        if args.validate:
+            report = runner.validate_inputs(args.template, read_input_rows(args.inputs), args.validate, args.workers)
+            if not validation_passed(app, args, report):
+                sys.exit(1)
+            skip_rows = frozenset(report.invalid_rows)
+        result = runner.run(
+            args.template,
+            read_input_rows(args.inputs),
+            workers=args.workers,
+            app_factory=partial(build_application, args.config, args.output_dir, args.durability,
+                                args.io_threads, args.max_pending, args.force),
+            on_progress=report_progress,
+            vectorize=args.vectorize,
+            skip_rows=skip_rows
+        )
+    except (IOError, ValueError) as e:
+        app.user_interface.display_error(str(e))
+        sys.exit(1)
+    finally:
+        if isinstance(app.file_manager, AsyncFileManager):
+            app.file_manager.close()
+
+    app.user_interface.display_message(
+        f"Batch complete: {result.rendered - result.unchanged} rendered, {result.unchanged} unchanged, "
+        f"{result.failed} failed. Output saved to {app.output_dir}"
     )
+    report_cache_stats(app)
+    for row_number, message in result.errors:
+        print(f"Row {row_number}: {message}")
+    if result.failed:
+        sys.exit(1)
+
+def validation_passed(app, args, report):
+    for row_number, field, error in report.errors:
+        app.user_interface.display_error(f"Row {row_number}, field '{field}': {error}")
+    if args.validation_report:
+        report.write_json(args.validation_report)
+    if report.valid:
+        app.user_interface.display_message(f"Validation passed: {report.checked} rows checked.")
+        return True
+    if args.validate == 'skip':
+        app.user_interface.display_warning(
+            f"Validation: skipping {len(report.invalid_rows)} of {report.checked} rows with invalid values."
+        )
+        return True
+    checked = 'first invalid row found' if args.validate == 'fail-fast' else f"{len(report.invalid_rows)} of {report.checked} rows invalid"
+    app.user_interface.display_error(f"Validation failed ({checked}); no outputs were written.")
+    return False
+
+def watch_main(argv):
+    parser = argparse.ArgumentParser(prog='template-parser watch', description='Re-render outputs whenever templates or their inputs change')
+    parser.add_argument('templates', nargs='+', help='Template JSON files to watch')
+    parser.add_argument('--inputs', required=True, help='Path to a .jsonl or .csv file with one set of inputs per row')
+    parser.add_argument('--config', help='Path to the program configuration file', default=None)
+    parser.add_argument('--output-dir', help='Directory where output files will be saved', default=None)
+    parser.add_argument('--interval', type=float, default=DEFAULT_POLL_INTERVAL,
+                        help=f'Seconds between checks for changes (default: {DEFAULT_POLL_INTERVAL})')
+    parser.add_argument('--poll', action='store_true', help='Poll modification times even where inotify is available')
+    add_durability_argument(parser)
+    add_force_argument(parser)
+    args = parser.parse_args(argv)
+
+    if args.interval <= 0:
+        parser.error("--interval must be positive.")
+    for path in args.templates + [args.inputs]:
+        if not os.path.isfile(path):
+            parser.error(f"The file '{path}' does not exist.")
+
+    from .watch import Watcher, create_waiter
+
+    app = build_application(args.config, args.output_dir, args.durability, force=args.force)
+    watcher = Watcher(app, args.templates, args.inputs)
+    waiter = create_waiter(watcher.watched_paths, poll=args.poll)
+    app.user_interface.display_message(f"Watching {len(args.templates)} template(s) and {args.inputs}. Press Ctrl+C to stop.")
+    try:
+        watcher.run(waiter, args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        waiter.close()
+
+def serve_main(argv):
+    parser = argparse.ArgumentParser(prog='template-parser serve', description='Keep templates and locale data loaded and render requests sent over a local socket')
+    add_address_arguments(parser)
+    parser.add_argument('--config', help='Path to the program configuration file', default=None)
+    parser.add_argument('--output-dir', help='Directory where output files will be saved', default=None)
+    add_durability_argument(parser)
+    add_force_argument(parser)
+    args = parser.parse_args(argv)
+
+    import signal
+    from .server import RenderService, create_server, serve
+
+    app = build_application(args.config, args.output_dir, args.durability, force=args.force)
+    service = RenderService(app)
+    try:
+        server = create_server(service, args.socket, args.port)
+    except OSError as e:
+        app.user_interface.display_error(str(e))
+        sys.exit(1)
+    address = f"http://127.0.0.1:{server.server_address[1]}" if args.port is not None else args.socket
+    app.user_interface.display_message(f"Listening on {address}. Press Ctrl+C to stop.")
+    # Let `kill` shut down as cleanly as Ctrl+C: flush outputs and remove the socket.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        serve(service, server)
+    except KeyboardInterrupt:
+        pass
+
+def render_main(argv):
+    parser = argparse.ArgumentParser(prog='template-parser render', description='Render a template on a running `template-parser serve` process')
+    parser.add_argument('template', help='Template path, or its name in the server\'s templates directory')
+    parser.add_argument('--inputs', default='{}', help='Inputs as a JSON object, @path to read them from a file, or - for stdin')
+    parser.add_argument('--write', action='store_true', help='Save the output in the server\'s output directory instead of printing it')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_CLIENT_TIMEOUT, help=f'Seconds to wait for the server (default: {DEFAULT_CLIENT_TIMEOUT:g})')
+    add_address_arguments(parser)
+    args = parser.parse_args(argv)
+
+    import json
+    try:
+        if args.inputs == '-':
+            inputs = json.load(sys.stdin)
+        elif args.inputs.startswith('@'):
+            with open(args.inputs[1:], 'r', encoding='utf-8') as f:
+                inputs = json.load(f)
+        else:
+            inputs = json.loads(args.inputs)
+    except (OSError, ValueError) as e:
+        parser.error(f"Cannot read --inputs: {e}")
+    if not isinstance(inputs, dict):
+        parser.error("--inputs must be a JSON object.")
+    # Paths are resolved by the server, which may run in another directory.
+    template = os.path.abspath(args.template) if os.path.isfile(args.template) else args.template
+
+    from .client import RenderClient, ServerError
+
+    try:
+        with RenderClient(args.socket, args.port, args.timeout) as client:
+            response = client.render(template, inputs, write=args.write)
+    except ServerError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        for error in e.errors:
+            print(f"  {error}", file=sys.stderr)
+        sys.exit(1)
+    except OSError as e:
+        address = f"port {args.port}" if args.port is not None else args.socket
+        print(f"Cannot reach a render server on {address} ({e}). Start one with `template-parser serve`.", file=sys.stderr)
+        sys.exit(1)
+    if args.write:
+        if response['unchanged']:
+            print(f"Output unchanged, skipped writing {response['output_path']}")
+        else:
+            print(f"Modified JSON saved to {response['output_path']}")
+    else:
+        json.dump(response['output'], sys.stdout, indent=2)
+        print()
+
+def zygote_main(argv):
+    parser = argparse.ArgumentParser(
+        prog='template-parser zygote',
+        description=f'Manage the pre-loaded process that runs template-parser commands when {ZYGOTE_ENV_VAR}=1 is set'
+    )
+    parser.add_argument('action', choices=('start', 'stop', 'status', 'run'),
+                        help='start it in the background, stop it, report whether it is running, or run it in the foreground')
+    args = parser.parse_args(argv)
+
+    from . import zygote
+    if not zygote.supported():
+        print("The zygote needs fork() and Unix domain sockets, which this platform does not provide.", file=sys.stderr)
+        sys.exit(1)
+    path = zygote.socket_path()
+    if args.action == 'run':
+        zygote.serve(path)
+        return
+    status = zygote.request('status')
+    if args.action == 'status':
+        if status is None:
+            print("Zygote is not running.")
+            sys.exit(1)
+        print(f"Zygote is running (pid {status['pid']}) on {path}")
+    elif args.action == 'stop':
+        if status is not None:
+            zygote.request('stop')
+            print(f"Zygote (pid {status['pid']}) stopped.")
+    elif status is not None:
+        print(f"Zygote is already running (pid {status['pid']}) on {path}")
+    else:
+        import time
+        zygote.spawn_zygote()
+        deadline = time.monotonic() + zygote.ZYGOTE_START_TIMEOUT
+        while status is None and time.monotonic() < deadline:
+            time.sleep(0.05)
+            status = zygote.request('status')
+        if status is None:
+            print("The zygote did not start.", file=sys.stderr)
+            sys.exit(1)
+        print(f"Zygote started (pid {status['pid']}) on {path}")
+
+def add_address_arguments(parser):
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--socket', default=os.path.join(os.getcwd(), 'files', DEFAULT_SOCKET_NAME),
+                       help=f'Unix domain socket of the render server (default: files/{DEFAULT_SOCKET_NAME})')
+    group.add_argument('--port', type=int, default=None, help='Use HTTP on 127.0.0.1 at this port instead of a Unix socket')
+
+def add_force_argument(parser):
+    parser.add_argument('--force', action='store_true', help='Render and write every output even if its template and inputs are unchanged')
+
+def report_cache_stats(app):
+    stats = app.render_cache.stats()
+    app.user_interface.display_message(f"Render cache: {stats['hits']} hits, {stats['misses']} misses")
+
+def add_durability_argument(parser, default='batched'):
+    parser.add_argument('--durability', choices=DURABILITY_POLICIES, default=default,
+                        help='When written files are fsynced: none, per-file, or batched (each file synced, its directory '
+                             f'once every {DEFAULT_DURABILITY_BATCH_SIZE} files) (default: {default})')
+
+def add_timing_arguments(parser):
+    parser.add_argument('--timings', action='store_true',
+                        help='Print time per phase, per-type conversion counts and latency, and cache hit rates to stderr')
+    parser.add_argument('--timings-json', metavar='PATH', default=None, help='Write the same timings as JSON to PATH')
+    parser.add_argument('--profile', choices=('cprofile', 'tracemalloc'), default=None,
+                        help='Profile the run with cProfile (CPU) or tracemalloc (memory) and dump the result to a file')
+    parser.add_argument('--profile-output', metavar='PATH', default=None,
+                        help='Where to write the profile (default: template-parser.prof or template-parser.tracemalloc)')
+
+def profile_run(args, timings=None):
+    if args.profile is None:
+        from contextlib import nullcontext
+        return nullcontext()
+    from .timings import default_profile_path, profiling
+    return profiling(args.profile, args.profile_output or default_profile_path(args.profile), timings)
+
+def report_timings(args, timings):
+    if args.timings:
+        print(timings.format(), file=sys.stderr)
+    if args.timings_json:
+        timings.write_json(args.timings_json)
+
+def report_progress(result):
+    print(f"Processed {result.rendered + result.failed} rows ({result.failed} failed)", file=sys.stderr)
+
+COMMANDS = {
+    'batch': batch_main,
+    'watch': watch_main,
+    'serve': serve_main,
+    'render': render_main,
+    'zygote': zygote_main,
+}
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if os.environ.get(ZYGOTE_ENV_VAR, '') not in ('', '0') and argv[:1] != ['zygote']:
+        from . import zygote
+        if zygote.supported():
+            code = zygote.run_in_zygote(argv)
+            if code is not None:
+                sys.exit(code)
+    return run_command(argv)
+
+def run_command(argv):
+    if argv and argv[0] in COMMANDS:
+        return COMMANDS[argv[0]](argv[1:])
+
+    parser = argparse.ArgumentParser(description='Template Parser CLI', epilog='Commands: batch, watch, serve, render, zygote (run "template-parser <command> -h" for details)')
+    parser.add_argument('template', nargs='?', help='Path to the template JSON file')
+    parser.add_argument('--config', help='Path to the program configuration file', default=None)
+    parser.add_argument('--stream', action='store_true', help='Render the template token by token with constant memory (for very large templates)')
+    # A single output has nothing to batch.
+    add_durability_argument(parser, default='per-file')
+    add_force_argument(parser)
+    add_timing_arguments(parser)
+    args = parser.parse_args(argv)
 
-    template_path = args.template
-    app.run(template_path)
+    timings = None
+    if args.timings or args.timings_json:
+        from .timings import Timings
+        timings = Timings()
+    app = None
+    try:
+        with profile_run(args, timings):
+            build = partial(build_application, args.config, durability=args.durability, force=args.force)
+            if timings is not None:
+                with timings.phase('setup'):
+                    app = build()
+            else:
+                app = build()
+            app.timings = timings
+            try:
+                template_path = args.template
+                app.run(template_path, stream=args.stream)
+                if not args.stream:
+                    report_cache_stats(app)
+            finally:
+                if timings is not None:
+                    timings.finish(app)
+    finally:
+        if timings is not None:
+            report_timings(args, timings)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,128 @@
+import os
+import json
+import time
+import weakref
+import threading
+from typing import Any, Dict, List, Optional
+from . import __version__
+from .compiled_template import CompiledTemplate
+from .helpers.digest import content_digest
+from .interfaces import IFileManager
+from .template_manifest import MTIME_GRANULARITY_NS
+
+RENDER_CACHE_NAME = '.render-cache.json'
+RENDER_CACHE_FORMAT = 1
+
+
+class RenderCache:
+    """Remembers, per output file, the render key that produced it and its content hash.
+
+    The key covers the template text, the inputs, the locale, the output filename
+    format and the tool version. A render whose key is unchanged, and whose output
+    file still hashes to the recorded digest, can be skipped. With force=True nothing
+    is skipped, but the cache is still brought up to date. Safe to share between
+    the threads of the render server.
+    """
+    def __init__(self, cache_path: str, file_manager: IFileManager, force: bool = False):
+        self.cache_path = cache_path
+        self.file_manager = file_manager
+        self.force = force
+        self.hits = 0
+        self.misses = 0
+        self._entries: Optional[Dict[str, List[Any]]] = None
+        # Compiled template -> {(locale, filename format): template key}; weak, so
+        # templates replaced while serving or watching are not kept alive.
+        self._template_keys = weakref.WeakKeyDictionary()
+        self._dirty = False
+        self._lock = threading.RLock()
+
+    @property
+    def entries(self) -> Dict[str, List[Any]]:
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._load()
+            return self._entries
+
+    def template_key(self, compiled: CompiledTemplate, locale: str, filename_format: str) -> str:
+        with self._lock:
+            keys = self._template_keys.get(compiled)
+            if keys is None:
+                keys = self._template_keys[compiled] = {}
+            template_key = keys.get((locale, filename_format))
+            if template_key is None:
+                parts = [__version__, content_digest(compiled.source.encode('utf-8')), locale, filename_format]
+                template_key = content_digest(json.dumps(parts).encode('utf-8'))
+                keys[(locale, filename_format)] = template_key
+            return template_key
+
+    def render_key(self, template_key: str, inputs: Dict[str, Any]) -> str:
+        normalized = json.dumps(inputs, sort_keys=True, default=str)
+        return content_digest(f"{template_key}\n{normalized}".encode('utf-8'))
+
+    def is_fresh(self, output_path: str, render_key: str) -> bool:
+        if self.force:
+            return False
+        with self._lock:
+            entry = self.entries.get(self._name(output_path))
+            if entry is None or entry[0] != render_key:
+                return False
+            digest, size, mtime_ns, checked_ns = entry[1:5]
+        try:
+            stat = os.stat(output_path)
+        except OSError:
+            return False
+        if stat.st_size != size:
+            return False
+        if mtime_ns == stat.st_mtime_ns and mtime_ns + MTIME_GRANULARITY_NS < checked_ns:
+            return True
+        # Hashed outside the lock; other requests only wait for the bookkeeping.
+        try:
+            with open(output_path, 'rb') as f:
+                if content_digest(f.read()) != digest:
+                    return False
+        except OSError:
+            return False
+        # Verified by content; trust the file's stat next time.
+        with self._lock:
+            entry[3], entry[4] = stat.st_mtime_ns, time.time_ns()
+            self._dirty = True
+        return True
+
+    def record_hit(self) -> None:
+        with self._lock:
+            self.hits += 1
+
+    def record(self, output_path: str, render_key: str, digest: str, size: int) -> None:
+        with self._lock:
+            self.misses += 1
+            self.entries[self._name(output_path)] = [render_key, digest, size, None, 0]
+            self._dirty = True
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses}
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            self.file_manager.write_json(self.cache_path, {
+                'format': RENDER_CACHE_FORMAT,
+                'version': __version__,
+                'entries': self.entries
+            })
+            self._dirty = False
+
+    def _name(self, output_path: str) -> str:
+        return os.path.relpath(os.path.abspath(output_path), os.path.dirname(os.path.abspath(self.cache_path)))
+
+    def _load(self) -> Dict[str, List[Any]]:
+        if not os.path.isfile(self.cache_path):
+            return {}
+        try:
+            data = json.loads(self.file_manager.read_file(self.cache_path))
+        except (IOError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get('format') != RENDER_CACHE_FORMAT or data.get('version') != __version__:
+            return {}
+        entries = data.get('entries')
+        return entries if isinstance(entries, dict) else {}
@@ -0,0 +1,155 @@
+import json
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple, Union
+from .compiled_template import CompiledTemplate, PlaceholderSpec, compile_template
+from .errors import ConfigError, InvalidInputError, MissingInputError, OutputFilenameError, TemplateSyntaxError
+from .helpers.frozen import _Frozen
+
+DEFAULT_LOCALE = 'en_GB'
+DEFAULT_OUTPUT_FILENAME_FORMAT = 'output_{date}_{time}.json'
+DEFAULT_INDENT = 2
+ENCODE_BATCH_CHUNKS = 8192
+
+
+class RenderConfig(_Frozen):
+    """Immutable rendering settings, equivalent to program_config.json.
+
+    Instances hold no caches or handles, so one can be shared by any number of
+    threads rendering at once.
+    """
+    __slots__ = ('locale', 'output_filename_format', 'required_variables', 'indent')
+
+    def __init__(self, locale: str = DEFAULT_LOCALE, output_filename_format: str = DEFAULT_OUTPUT_FILENAME_FORMAT,
+                 required_variables: Iterable[Union[Mapping[str, str], Tuple[str, str]]] = (),
+                 indent: Optional[int] = DEFAULT_INDENT):
+        variables = []
+        for variable in required_variables:
+            if isinstance(variable, Mapping):
+                if not isinstance(variable.get('name'), str):
+                    raise ConfigError(f"Required variable {variable!r} has no name.")
+                variables.append((variable['name'], variable.get('type', 'str')))
+            else:
+                name, typ = variable
+                variables.append((name, typ))
+        object.__setattr__(self, 'locale', locale)
+        object.__setattr__(self, 'output_filename_format', output_filename_format)
+        object.__setattr__(self, 'required_variables', tuple(variables))
+        object.__setattr__(self, 'indent', indent)
+
+    @classmethod
+    def from_mapping(cls, config: Mapping[str, Any]) -> 'RenderConfig':
+        if not isinstance(config, Mapping):
+            raise ConfigError("The program configuration must be a JSON object.")
+        required_variables = config.get('required_variables', [])
+        if not isinstance(required_variables, list):
+            raise ConfigError("'required_variables' must be a list.")
+        return cls(
+            locale=config.get('locale', DEFAULT_LOCALE),
+            output_filename_format=config.get('output_filename_format', DEFAULT_OUTPUT_FILENAME_FORMAT),
+            required_variables=required_variables
+        )
+
+    @classmethod
+    def from_file(cls, config_path: str) -> 'RenderConfig':
+        try:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                return cls.from_mapping(json.load(f))
+        except json.JSONDecodeError as e:
+            raise ConfigError(f"{config_path} contains invalid JSON: {e}") from e
+        except OSError as e:
+            raise ConfigError(f"Error reading {config_path}: {e}") from e
+
+    def __repr__(self) -> str:
+        return f"RenderConfig(locale={self.locale!r}, output_filename_format={self.output_filename_format!r})"
+
+
+DEFAULT_CONFIG = RenderConfig()
+
+
+def parse_template(template_text: str) -> CompiledTemplate:
+    try:
+        return compile_template(template_text)
+    except json.JSONDecodeError as e:
+        raise TemplateSyntaxError(f"Invalid JSON template: {e}", e.lineno, e.colno) from e
+
+
+def normalize_value(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (bool, dict, list)):
+        return json.dumps(value)
+    return str(value)
+
+
+def render(compiled_template: CompiledTemplate, inputs: Mapping[str, Any],
+           config: RenderConfig = DEFAULT_CONFIG, as_bytes: bool = False) -> Union[Any, bytes]:
+    """Render a compiled template with the given inputs, without prompting or writing anything.
+
+    Every placeholder must have a valid input: a missing one raises
+    MissingInputError and a bad one InvalidInputError. Returns the rendered
+    document, or with as_bytes=True the UTF-8 JSON the CLI would write. The
+    returned document shares nothing with the template, so it may be modified.
+    Safe to call from many threads with the same template and config.
+    """
+    converted: Dict[PlaceholderSpec, Any] = {}
+
+    def resolve(spec: PlaceholderSpec, text: str) -> Any:
+        try:
+            return converted[spec]
+        except KeyError:
+            pass
+        value = inputs.get(spec.name)
+        if value is None:
+            raise MissingInputError(spec.name)
+        value = normalize_value(value)
+        kind = spec.kind
+        if not kind.strict:
+            valid, reason = kind.validator(value)
+            if not valid:
+                raise InvalidInputError(spec.name, spec.type, value, reason)
+        try:
+            result = kind.convert(value, spec.options, config.locale)
+        except Exception as e:
+            raise InvalidInputError(spec.name, spec.type, value, str(e)) from e
+        converted[spec] = result
+        return result
+
+    rendered = compiled_template.render(resolve, copy_static=not as_bytes)
+    if as_bytes:
+        return dumps_json(rendered, config.indent).encode('utf-8')
+    return rendered
+
+
+def dumps_json(data: Any, indent: Optional[int] = DEFAULT_INDENT) -> str:
+    """Return json.dumps(data, indent=indent) without holding every encoder chunk at once.
+
+    With an indent, json.dumps runs the pure-Python encoder and joins its chunks,
+    several per value, from one list that costs many times the size of the output.
+    """
+    if indent is None:
+        return json.dumps(data)
+    chunks = json.JSONEncoder(indent=indent).iterencode(data)
+    parts = []
+    while True:
+        batch = ''.join(islice(chunks, ENCODE_BATCH_CHUNKS))
+        if not batch:
+            return ''.join(parts)
+        parts.append(batch)
+
+
+def output_filename(inputs: Mapping[str, Any], config: RenderConfig = DEFAULT_CONFIG,
+                    context: Optional[Mapping[str, Any]] = None) -> str:
+    for name, _ in config.required_variables:
+        if inputs.get(name) is None:
+            raise MissingInputError(name)
+    if context is None:
+        now = datetime.now()
+        context = {'date': now.strftime('%Y%m%d'), 'time': now.strftime('%H%M%S')}
+    try:
+        return config.output_filename_format.format(**{**inputs, **context})
+    except KeyError as e:
+        raise OutputFilenameError(f"Missing variable '{e.args[0]}' required for output filename generation.") from e
+    except (IndexError, ValueError) as e:
+        raise OutputFilenameError(f"Error generating output filename: {e}") from e
+
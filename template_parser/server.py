@@ -0,0 +1,234 @@
+import os
+import json
+import stat
+import time
+import socket
+import logging
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn, UnixStreamServer
+from typing import Any, Dict, Optional
+from . import __version__
+from .application import TemplateApplication
+from .batch import BatchResult, BatchRunner, normalize_row
+from .errors import TemplateParserError
+from .helpers.paths import is_within
+from .watch import TemplateState, file_signature
+
+# Saving the render cache rewrites the whole file, so under a steady stream of
+# requests it is saved at most this often (and always on shutdown).
+RENDER_CACHE_SAVE_INTERVAL = 1.0
+MAX_REQUEST_SIZE = 16 * 1024 * 1024
+
+
+class RequestError(Exception):
+    def __init__(self, status: HTTPStatus, message: str, errors: Optional[list] = None):
+        super().__init__(message)
+        self.status = status
+        self.errors = errors or []
+
+
+class RenderService:
+    """Renders requests against one long-lived application.
+
+    Compiled templates are kept per path and reloaded only when the file's
+    signature changes; locale data and the conversion cache stay warm between
+    requests. Requests run concurrently: only the template table and counters
+    are guarded here, and the render cache, conversion cache and history guard
+    themselves. Written files are made durable by the file manager's policy,
+    not flushed per request.
+    """
+    def __init__(self, app: TemplateApplication):
+        self.app = app
+        self.runner = BatchRunner(app)
+        self.renders = 0
+        self._templates: Dict[str, TemplateState] = {}
+        self._lock = threading.Lock()
+        self._cache_saved_at = time.monotonic()
+
+    def start(self) -> None:
+        self.app.warm_up()
+        self.app.file_manager.ensure_directory(self.app.output_dir)
+        self.app.config_manager.load_config()
+
+    def health(self) -> Dict[str, Any]:
+        return {'status': 'ok', 'version': __version__, 'templates': len(self._templates), 'renders': self.renders}
+
+    def render(self, request: Any) -> Dict[str, Any]:
+        if not isinstance(request, dict) or not isinstance(request.get('template'), str):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "The request must be a JSON object with a 'template' string.")
+        inputs = request.get('inputs', {})
+        if not isinstance(inputs, dict):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "'inputs' must be a JSON object.")
+        row = normalize_row(inputs)
+        path = self.resolve_template(request['template'])
+        with self._lock:
+            state = self.get_template(path)
+        errors = self.runner.validate_row(row, state.fields)
+        if errors:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Invalid inputs.", errors)
+        with self._lock:
+            self.renders += 1
+            row_number = self.renders
+        if not request.get('write', False):
+            try:
+                return {'output': self.app.render_compiled(state.compiled, row, copy_static=False, strict=True)}
+            except TemplateParserError as e:
+                raise RequestError(HTTPStatus.BAD_REQUEST, str(e)) from e
+        return self.write(state, row, row_number)
+
+    def write(self, state: TemplateState, row: Dict[str, str], row_number: int) -> Dict[str, Any]:
+        context = {**self.app.get_context_variables(), 'template': os.path.splitext(os.path.basename(state.path))[0]}
+        outcome = self.runner.process_row(state.compiled, row_number, row, context, confine_output=True)
+        self.runner.settle(outcome)
+        if outcome.error is not None:
+            status = HTTPStatus.BAD_REQUEST if outcome.input_error else HTTPStatus.INTERNAL_SERVER_ERROR
+            raise RequestError(status, outcome.error)
+        self.runner.record(outcome, BatchResult(), {})
+        self.save_render_cache(RENDER_CACHE_SAVE_INTERVAL)
+        return {'output_path': outcome.output_path, 'unchanged': outcome.unchanged}
+
+    def resolve_template(self, template: str) -> str:
+        # Only templates inside templates_dir are served, however the path is written.
+        candidates = [os.path.join(self.app.templates_dir, template)]
+        if not os.path.splitext(template)[1]:
+            candidates.append(candidates[0] + '.json')
+        for path in candidates:
+            path = os.path.realpath(path)
+            if not is_within(path, self.app.templates_dir):
+                raise RequestError(HTTPStatus.FORBIDDEN, f"The template '{template}' is outside the templates directory.")
+            if os.path.isfile(path):
+                return path
+        raise RequestError(HTTPStatus.NOT_FOUND, f"The template file '{template}' does not exist.")
+
+    def get_template(self, path: str) -> TemplateState:
+        state = self._templates.get(path)
+        signature = file_signature(path)
+        if state is None or state.signature != signature:
+            state = TemplateState(path)
+            try:
+                state.compiled, state.fields = self.runner.prepare(path)
+            except json.JSONDecodeError as e:
+                raise RequestError(HTTPStatus.UNPROCESSABLE_ENTITY, f"Invalid JSON template: {e}") from e
+            state.signature = signature
+            self._templates[path] = state
+        return state
+
+    def save_render_cache(self, interval: float = 0.0) -> None:
+        # Saves at most once per interval; the request that claims the slot saves.
+        with self._lock:
+            now = time.monotonic()
+            if now - self._cache_saved_at < interval:
+                return
+            self._cache_saved_at = now
+        if self.app.render_cache is not None:
+            self.app.render_cache.save()
+
+    def close(self) -> None:
+        self.app.file_manager.flush()
+        self.save_render_cache()
+
+
+class RenderRequestHandler(BaseHTTPRequestHandler):
+    # Keep-alive lets a client send many renders over one connection.
+    protocol_version = 'HTTP/1.1'
+    server_version = f'template-parser/{__version__}'
+
+    def do_GET(self) -> None:
+        if self.path != '/health':
+            self.send_json(HTTPStatus.NOT_FOUND, {'error': f"Unknown path '{self.path}'."})
+            return
+        self.send_json(HTTPStatus.OK, self.server.service.health())
+
+    def do_POST(self) -> None:
+        if self.path != '/render':
+            self.send_json(HTTPStatus.NOT_FOUND, {'error': f"Unknown path '{self.path}'."})
+            return
+        try:
+            # A browser page can POST text/plain to localhost without a CORS
+            # preflight, but not application/json.
+            if self.headers.get_content_type() != 'application/json':
+                self.close_connection = True
+                raise RequestError(HTTPStatus.UNSUPPORTED_MEDIA_TYPE, "The request must have Content-Type: application/json.")
+            length = int(self.headers.get('Content-Length', 0))
+            if length > MAX_REQUEST_SIZE:
+                self.close_connection = True
+                raise RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "The request body is too large.")
+            try:
+                request = json.loads(self.rfile.read(length) or b'null')
+            except ValueError as e:
+                raise RequestError(HTTPStatus.BAD_REQUEST, f"Invalid JSON request: {e}") from e
+            self.send_json(HTTPStatus.OK, self.server.service.render(request))
+        except RequestError as e:
+            self.send_json(e.status, {'error': str(e), 'errors': e.errors})
+        except Exception as e:
+            logging.exception("Render request failed")
+            self.send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(e), 'errors': []})
+
+    def send_json(self, status: HTTPStatus, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        logging.debug("%s - %s", self.address_string(), format % args)
+
+
+class LocalHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class UnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super().get_request()
+        # Unix socket peers have no address; handlers expect a (host, port) pair.
+        return request, ('local', 0)
+
+
+def create_server(service: RenderService, socket_path: Optional[str] = None, port: Optional[int] = None):
+    if port is not None:
+        server = LocalHTTPServer(('127.0.0.1', port), RenderRequestHandler)
+    else:
+        remove_stale_socket(socket_path)
+        # Anyone who can connect can write into the output directory, so the
+        # socket is created private rather than chmod-ed after it is listening.
+        umask = os.umask(0o177)
+        try:
+            server = UnixHTTPServer(socket_path, RenderRequestHandler)
+        finally:
+            os.umask(umask)
+    server.service = service
+    return server
+
+
+def remove_stale_socket(socket_path: str) -> None:
+    if not os.path.exists(socket_path):
+        return
+    if not stat.S_ISSOCK(os.stat(socket_path).st_mode):
+        raise OSError(f"'{socket_path}' exists and is not a socket.")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except ConnectionRefusedError:
+        os.unlink(socket_path)
+        return
+    finally:
+        probe.close()
+    raise OSError(f"A render server is already listening on '{socket_path}'.")
+
+
+def serve(service: RenderService, server) -> None:
+    service.start()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        service.close()
+        if isinstance(server, UnixHTTPServer) and os.path.exists(server.server_address):
+            os.unlink(server.server_address)
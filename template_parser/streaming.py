@@ -0,0 +1,236 @@
+import re
+import json
+from functools import lru_cache
+from typing import Any, Callable, Dict, IO, Iterator, List, Optional, Tuple
+from .compiled_template import Resolver, compile_string, parse_options
+from .constants import PLACEHOLDER_PATTERN
+
+READ_CHUNK_SIZE = 64 * 1024
+WRITE_BUFFER_SIZE = 64 * 1024
+
+_TOKEN_PATTERN = re.compile(r'''
+    [ \t\n\r]*
+    (?:
+        (?P<punct>[{}\[\]:,])
+      | (?P<string>"[^"\\]*(?:\\.[^"\\]*)*")
+      | (?P<number>-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?)
+      | (?P<literal>true|false|null|NaN|Infinity|-Infinity)
+    )
+''', re.VERBOSE | re.DOTALL)
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+# First characters of tokens that may still be incomplete at the end of a chunk.
+_PARTIAL_TOKEN_START = frozenset('"-0123456789tfnNI')
+# Strings and numbers that json.dumps(json.loads(token)) would reproduce unchanged.
+_PLAIN_STRING = re.compile(r'"[ !#-\[\]-~]*"')
+_PLAIN_NUMBER = re.compile(r'-?(?:0|[1-9][0-9]*)')
+
+Token = Tuple[str, str]
+
+
+class StreamingJSONError(ValueError):
+    pass
+
+
+def iter_json_tokens(source: IO[str], chunk_size: int = READ_CHUNK_SIZE) -> Iterator[Token]:
+    buffer = ''
+    position = 0
+    consumed = 0
+    eof = False
+    while True:
+        match = _TOKEN_PATTERN.match(buffer, position)
+        # A token near the end of the buffer may continue in the next chunk.
+        if not eof and (_may_continue(match, len(buffer)) if match else _may_be_partial(buffer, position)):
+            chunk = source.read(chunk_size)
+            if chunk:
+                if position:
+                    consumed += position
+                    buffer = buffer[position:]
+                    position = 0
+                buffer += chunk
+                continue
+            eof = True
+            continue
+        if match is None:
+            rest = _WHITESPACE.match(buffer, position).end()
+            if rest == len(buffer):
+                return
+            raise StreamingJSONError(f"Invalid JSON token at char {consumed + rest}")
+        kind = match.lastgroup
+        yield kind, match.group(kind)
+        position = match.end()
+
+
+def _may_continue(match, buffer_length: int) -> bool:
+    # A number such as "1.5e+" can leave up to two unmatched characters behind it.
+    tail = buffer_length - match.end()
+    return tail == 0 or (tail <= 2 and match.lastgroup == 'number')
+
+
+def _may_be_partial(buffer: str, position: int) -> bool:
+    start = _WHITESPACE.match(buffer, position).end()
+    return start == len(buffer) or buffer[start] in _PARTIAL_TOKEN_START
+
+
+def iter_json_events(tokens: Iterator[Token]) -> Iterator[Tuple[str, Optional[str], Optional[str]]]:
+    # Turns tokens into ('start', '{'|'[', None), ('end', '}'|']', None), ('key', None, raw)
+    # and ('value', kind, raw) events, rejecting anything json.loads would reject.
+    stack: List[str] = []
+    expect = 'value'
+    index = 0
+    for index, (kind, text) in enumerate(tokens, start=1):
+        if expect == 'done':
+            raise StreamingJSONError(f"Extra data at token {index}")
+        if expect in ('value', 'value_or_end'):
+            if kind == 'punct' and text in '{[':
+                stack.append(text)
+                yield 'start', text, None
+                expect = 'key_or_end' if text == '{' else 'value_or_end'
+            elif kind == 'punct' and text == ']' and expect == 'value_or_end':
+                stack.pop()
+                yield 'end', text, None
+                expect = 'comma_or_end' if stack else 'done'
+            elif kind != 'punct':
+                yield 'value', kind, text
+                expect = 'comma_or_end' if stack else 'done'
+            else:
+                raise StreamingJSONError(f"Expecting value at token {index}")
+        elif expect in ('key', 'key_or_end'):
+            if kind == 'string':
+                yield 'key', None, text
+                expect = 'colon'
+            elif kind == 'punct' and text == '}' and expect == 'key_or_end':
+                stack.pop()
+                yield 'end', text, None
+                expect = 'comma_or_end' if stack else 'done'
+            else:
+                raise StreamingJSONError(f"Expecting property name enclosed in double quotes at token {index}")
+        elif expect == 'colon':
+            if kind != 'punct' or text != ':':
+                raise StreamingJSONError(f"Expecting ':' delimiter at token {index}")
+            expect = 'value'
+        else:
+            closing = '}' if stack[-1] == '{' else ']'
+            if kind == 'punct' and text == ',':
+                expect = 'key' if closing == '}' else 'value'
+            elif kind == 'punct' and text == closing:
+                stack.pop()
+                yield 'end', text, None
+                expect = 'comma_or_end' if stack else 'done'
+            else:
+                raise StreamingJSONError(f"Expecting ',' delimiter at token {index}")
+    if expect != 'done':
+        raise StreamingJSONError(f"Unexpected end of JSON input at token {index}")
+
+
+class _JSONWriter:
+    def __init__(self, destination: IO[str], indent: Optional[int]):
+        self.destination = destination
+        self.indent = ' ' * indent if indent is not None else None
+        self.item_separator = ',' if indent is not None else ', '
+        self.counts: List[int] = []
+        self.opening: List[str] = []
+        self.after_key = False
+        self.buffer: List[str] = []
+        self.buffered = 0
+
+    def write(self, text: str) -> None:
+        self.buffer.append(text)
+        self.buffered += len(text)
+        if self.buffered >= WRITE_BUFFER_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        self.destination.write(''.join(self.buffer))
+        self.buffer.clear()
+        self.buffered = 0
+
+    def _begin_item(self) -> None:
+        if self.after_key:
+            self.after_key = False
+            return
+        if not self.counts:
+            return
+        prefix = self.opening[-1] if self.counts[-1] == 0 else self.item_separator
+        if self.indent is not None:
+            prefix += '\n' + self.indent * len(self.counts)
+        self.write(prefix)
+        self.counts[-1] += 1
+
+    def start(self, opening: str) -> None:
+        # The opening bracket is written with the first item, since empty containers render as {} / [].
+        self._begin_item()
+        self.counts.append(0)
+        self.opening.append(opening)
+
+    def end(self, closing: str) -> None:
+        count = self.counts.pop()
+        opening = self.opening.pop()
+        if count == 0:
+            self.write(opening + closing)
+        elif self.indent is not None:
+            self.write('\n' + self.indent * len(self.counts) + closing)
+        else:
+            self.write(closing)
+
+    def key(self, encoded: str) -> None:
+        self._begin_item()
+        self.write(encoded + ': ')
+        self.after_key = True
+
+    def value(self, encoded: str) -> None:
+        self._begin_item()
+        self.write(encoded)
+
+
+def _normalize_string(raw: str) -> Tuple[str, str]:
+    value = json.loads(raw)
+    return value, raw if _PLAIN_STRING.fullmatch(raw) else json.dumps(value)
+
+
+def _normalize_number(raw: str) -> str:
+    if _PLAIN_NUMBER.fullmatch(raw) and raw != '-0':
+        return raw
+    return json.dumps(json.loads(raw))
+
+
+def stream_render(source: IO[str], destination: IO[str], resolve: Resolver, indent: Optional[int] = 2) -> None:
+    """Render a template token by token, writing the same text json.dump(..., indent=indent) would.
+
+    Only the current token and the container nesting are kept in memory. Unlike
+    json.loads, duplicate keys are all written out rather than collapsed.
+    """
+    writer = _JSONWriter(destination, indent)
+    for event, kind, raw in iter_json_events(iter_json_tokens(source)):
+        if event == 'start':
+            writer.start(kind)
+        elif event == 'end':
+            writer.end(kind)
+        elif event == 'key':
+            writer.key(_normalize_string(raw)[1])
+        elif kind == 'string':
+            value, encoded = _normalize_string(raw)
+            site = _compile_value(value) if '<' in value else None
+            writer.value(encoded if site is None else json.dumps(site.render(resolve)))
+        elif kind == 'number':
+            writer.value(_normalize_number(raw))
+        else:
+            writer.value(raw)
+    writer.flush()
+
+
+@lru_cache(maxsize=1024)
+def _compile_value(value: str):
+    return compile_string((), value)
+
+
+def scan_placeholders(source: IO[str]) -> Dict[str, Dict[str, Any]]:
+    placeholders = {}
+    for kind, text in iter_json_tokens(source):
+        if kind != 'string' or '<' not in text:
+            continue
+        for match in PLACEHOLDER_PATTERN.finditer(text):
+            placeholders[match.group('name')] = {
+                'type': match.group('type') or 'str',
+                'options': parse_options(match.group('options'))
+            }
+    return placeholders
@@ -0,0 +1,213 @@
+import os
+import time
+import json
+import uuid
+import hashlib
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from . import __version__
+from .compiled_template import CompiledTemplate, Path, compile_at, compile_template
+from .interfaces import ITemplateProcessor
+
+MANIFEST_NAME = '.manifest'
+MANIFEST_FORMAT = 4
+# A file modified this close to the moment it was hashed could change again
+# without its mtime moving, so its stat is only trusted once it is older.
+MTIME_GRANULARITY_NS = 2 * 10 ** 9
+
+
+def iter_template_files(directory: str, extension: str, recursive: bool = True) -> Iterator[Tuple[str, os.stat_result]]:
+    # Yields (path relative to directory, stat) pairs, reusing the stat data scandir
+    # already fetched; hidden files and directories are skipped.
+    pending = ['']
+    while pending:
+        relative_dir = pending.pop()
+        with os.scandir(os.path.join(directory, relative_dir)) as entries:
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                relative_path = os.path.join(relative_dir, entry.name) if relative_dir else entry.name
+                if entry.is_dir():
+                    if recursive:
+                        pending.append(relative_path)
+                elif entry.name.endswith(extension) and entry.is_file():
+                    yield relative_path, entry.stat()
+
+
+class ManifestEntry:
+    __slots__ = ('mtime_ns', 'size', 'digest', 'checked_ns', 'placeholders', 'site_paths', 'path', '_compiled')
+
+    def __init__(self, mtime_ns: int, size: int, digest: str, checked_ns: int,
+                 placeholders: Dict[str, Dict[str, Any]], site_paths: Tuple[Path, ...], path: Optional[str] = None):
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.digest = digest
+        self.checked_ns = checked_ns
+        self.placeholders = placeholders
+        self.site_paths = site_paths
+        # The template file, set by TemplateManifest.get(); not stored.
+        self.path = path
+        self._compiled = None
+
+    @property
+    def compiled(self) -> CompiledTemplate:
+        # Compiled on first use from the template file, parsing only the strings
+        # at the recorded placeholder paths.
+        if self._compiled is None:
+            with open(self.path, 'rb') as f:
+                content = f.read()
+            template_text = content.decode('utf-8')
+            if _digest(content) == self.digest:
+                try:
+                    self._compiled = compile_at(template_text, self.site_paths)
+                except (LookupError, TypeError, ValueError):
+                    pass
+            if self._compiled is None:
+                self._compiled = compile_template(template_text)
+        return self._compiled
+
+    def matches_stat(self, stat: os.stat_result) -> bool:
+        return (stat.st_mtime_ns == self.mtime_ns and stat.st_size == self.size
+                and self.mtime_ns + MTIME_GRANULARITY_NS < self.checked_ns)
+
+    def to_json(self) -> List[Any]:
+        return [self.mtime_ns, self.size, self.digest, self.checked_ns, self.placeholders,
+                [list(path) for path in self.site_paths]]
+
+    @classmethod
+    def from_json(cls, state: List[Any]) -> 'ManifestEntry':
+        mtime_ns, size, digest, checked_ns, placeholders, site_paths = state
+        if not (isinstance(mtime_ns, int) and isinstance(size, int) and isinstance(digest, str)
+                and isinstance(checked_ns, int) and isinstance(placeholders, dict)):
+            raise ValueError("Malformed manifest entry.")
+        return cls(mtime_ns, size, digest, checked_ns, placeholders, tuple(tuple(path) for path in site_paths))
+
+
+def _digest(content: bytes) -> str:
+    return hashlib.blake2b(content, digest_size=20).hexdigest()
+
+
+class TemplateManifest:
+    """Per-template cache of extracted placeholders and where they are in the template.
+
+    Each template has its own small JSON file in files/templates/.manifest/,
+    named after a hash of the template's relative path, so a run reads only the
+    entries of the templates it uses. An entry is reused while the file's mtime
+    and size match, or its content hash does, and rebuilt on its own otherwise.
+    Only metadata is stored, never template source or pickles. Changes are
+    written by save().
+    """
+    def __init__(self, templates_dir: str, template_processor: ITemplateProcessor,
+                 manifest_path: Optional[str] = None, extension: str = '.json', recursive: bool = True):
+        self.templates_dir = templates_dir
+        self.template_processor = template_processor
+        self.manifest_path = manifest_path or os.path.join(templates_dir, MANIFEST_NAME)
+        self.extension = extension
+        self.recursive = recursive
+        self.hits = 0
+        self.misses = 0
+        # The entries read or built in this run, by relative path.
+        self.entries: Dict[str, ManifestEntry] = {}
+        self._stats: Dict[str, os.stat_result] = {}
+        self._changed: Set[str] = set()
+        self._stale_files: Set[str] = set()
+
+    def list_templates(self) -> List[str]:
+        self._stats = dict(iter_template_files(self.templates_dir, self.extension, self.recursive))
+        for stale in set(self.entries) - set(self._stats):
+            del self.entries[stale]
+        try:
+            stored = set(os.listdir(self.manifest_path))
+        except OSError:
+            stored = set()
+        self._stale_files |= stored - {self._entry_file(relative_path) for relative_path in self._stats}
+        return sorted(self._stats)
+
+    def contains(self, template_path: str) -> bool:
+        relative_path = os.path.relpath(os.path.abspath(template_path), os.path.abspath(self.templates_dir))
+        return not relative_path.startswith(os.pardir + os.sep) and relative_path != os.pardir
+
+    def get(self, template_path: str) -> ManifestEntry:
+        relative_path = os.path.relpath(os.path.abspath(template_path), os.path.abspath(self.templates_dir))
+        stat = self._stats.get(relative_path) or os.stat(template_path)
+        entry = self.entries.get(relative_path) or self._load(relative_path)
+        if entry is not None and entry.matches_stat(stat):
+            self.hits += 1
+            entry.path = template_path
+            self.entries[relative_path] = entry
+            return entry
+
+        with open(template_path, 'rb') as f:
+            content = f.read()
+        digest = _digest(content)
+        now = time.time_ns()
+        if entry is not None and entry.digest == digest:
+            self.hits += 1
+            entry.mtime_ns, entry.size, entry.checked_ns = stat.st_mtime_ns, stat.st_size, now
+            entry.path = template_path
+        else:
+            self.misses += 1
+            template_text = content.decode('utf-8')
+            compiled = self.template_processor.compile(template_text)
+            entry = ManifestEntry(
+                stat.st_mtime_ns, stat.st_size, digest, now,
+                self.template_processor.extract_placeholders(template_text),
+                tuple(site.path for site in compiled.sites), template_path
+            )
+            entry._compiled = compiled
+        self.entries[relative_path] = entry
+        self._changed.add(relative_path)
+        return entry
+
+    def invalidate(self, template_path: str) -> None:
+        relative_path = os.path.relpath(os.path.abspath(template_path), os.path.abspath(self.templates_dir))
+        self.entries.pop(relative_path, None)
+        self._changed.discard(relative_path)
+        self._stale_files.add(self._entry_file(relative_path))
+
+    def save(self) -> None:
+        if not self._changed and not self._stale_files:
+            return
+        try:
+            if os.path.isfile(self.manifest_path):
+                # A single-file manifest from an older version.
+                os.unlink(self.manifest_path)
+            os.makedirs(self.manifest_path, exist_ok=True)
+            for file_name in self._stale_files:
+                try:
+                    os.unlink(os.path.join(self.manifest_path, file_name))
+                except FileNotFoundError:
+                    pass
+            self._stale_files.clear()
+            for relative_path in list(self._changed):
+                self._write(relative_path, self.entries[relative_path])
+                self._changed.discard(relative_path)
+        except OSError:
+            # The manifest is only a cache; a read-only templates directory just means no reuse.
+            pass
+
+    def _entry_file(self, relative_path: str) -> str:
+        return hashlib.blake2b(relative_path.encode('utf-8'), digest_size=16).hexdigest() + '.json'
+
+    def _write(self, relative_path: str, entry: ManifestEntry) -> None:
+        path = os.path.join(self.manifest_path, self._entry_file(relative_path))
+        temp_path = f"{path}.{uuid.uuid4().hex[:12]}.tmp"
+        stored = {'format': MANIFEST_FORMAT, 'version': __version__, 'path': relative_path, 'entry': entry.to_json()}
+        try:
+            with open(temp_path, 'x', encoding='utf-8') as f:
+                json.dump(stored, f, separators=(',', ':'))
+            os.replace(temp_path, path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+    def _load(self, relative_path: str) -> Optional[ManifestEntry]:
+        try:
+            with open(os.path.join(self.manifest_path, self._entry_file(relative_path)), 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+            if (stored['format'] != MANIFEST_FORMAT or stored['version'] != __version__
+                    or stored['path'] != relative_path):
+                return None
+            return ManifestEntry.from_json(stored['entry'])
+        except (OSError, LookupError, TypeError, ValueError):
+            return None
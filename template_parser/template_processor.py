@@ -1,6 +1,7 @@
 from typing import Dict
 from .interfaces import ITemplateProcessor
 from .constants import PLACEHOLDER_PATTERN
+from .compiled_template import CompiledTemplate, compile_template, parse_options
 
 
 class TemplateProcessor(ITemplateProcessor):
@@ -12,18 +13,13 @@ class TemplateProcessor(ITemplateProcessor):
         for match in PLACEHOLDER_PATTERN.finditer(template_text):
             name = match.group('name')
             typ = match.group('type') or 'str'
-            options_str = match.group('options')
-            options = {}
-            if options_str:
-                for opt in options_str.lstrip('|').split('|'):
-                    if '=' in opt:
-                        key, value = opt.split('=', 1)
-                        options[key.strip()] = value.strip()
-                    else:
-                        options[opt.strip()] = True
+            options = parse_options(match.group('options'))
             placeholders[name] = {'type': typ, 'options': options}
         return placeholders
 
+    def compile(self, template_text: str) -> CompiledTemplate:
+        return compile_template(template_text)
+
     # def replace_placeholders(self, template_text, user_inputs):
     #     def placeholder_replacer(match):
     #         name = match.group('name')
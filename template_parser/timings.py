@@ -0,0 +1,152 @@
+import sys
+import json
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+PROFILERS = ('cprofile', 'tracemalloc')
+PROFILE_EXTENSIONS = {'cprofile': 'prof', 'tracemalloc': 'tracemalloc'}
+TRACEMALLOC_FRAMES = 25
+
+
+def helper_cache_info() -> Dict[str, Any]:
+    from .helpers.currency import _build_currency_formatter
+    from .helpers.date_utils import compile_date_format, get_date_delta, parse_input_date
+    return {
+        'date parsing': parse_input_date.cache_info(),
+        'date formats': compile_date_format.cache_info(),
+        'date offsets': get_date_delta.cache_info(),
+        'currency formatters': _build_currency_formatter.cache_info(),
+    }
+
+
+class Timings:
+    """Wall-clock time per phase of a run, per-type conversion latency and cache hit rates.
+
+    Phases are recorded in the order they first run. Conversions happen while
+    rendering, so their latency is part of the render phase, not added to it.
+    """
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.total: Optional[float] = None
+        self.phases: Dict[str, List[float]] = {}
+        self.conversions: Dict[str, List[float]] = {}
+        self.caches: Dict[str, Dict[str, int]] = {}
+        self.profile: Optional[Dict[str, Any]] = None
+        # The helper caches live for the whole process (and a zygote warms them), so count from here.
+        self._helper_baseline = helper_cache_info()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase(name, time.perf_counter() - start)
+
+    def add_phase(self, name: str, seconds: float) -> None:
+        totals = self.phases.setdefault(name, [0, 0.0])
+        totals[0] += 1
+        totals[1] += seconds
+
+    def record_conversion(self, typ: str, seconds: float) -> None:
+        totals = self.conversions.setdefault(typ, [0, 0.0])
+        totals[0] += 1
+        totals[1] += seconds
+
+    def record_cache(self, name: str, hits: int, misses: int) -> None:
+        self.caches[name] = {'hits': hits, 'misses': misses}
+
+    def finish(self, app=None) -> None:
+        self.total = time.perf_counter() - self.started
+        if app is not None:
+            self.record_cache('conversions', app.conversion_cache.hits, app.conversion_cache.misses)
+            if app.render_cache is not None:
+                self.record_cache('rendered outputs', app.render_cache.hits, app.render_cache.misses)
+            if app.template_manifest is not None:
+                self.record_cache('template manifest', app.template_manifest.hits, app.template_manifest.misses)
+        for name, info in helper_cache_info().items():
+            baseline = self._helper_baseline[name]
+            self.record_cache(name, info.hits - baseline.hits, info.misses - baseline.misses)
+
+    def to_dict(self) -> Dict[str, Any]:
+        total = self.total if self.total is not None else time.perf_counter() - self.started
+        return {
+            'total_seconds': total,
+            'phases': {name: {'calls': calls, 'seconds': seconds} for name, (calls, seconds) in self.phases.items()},
+            'conversions': {typ: {'count': count, 'seconds': seconds}
+                            for typ, (count, seconds) in sorted(self.conversions.items())},
+            'caches': {name: {**counts, 'hit_rate': hit_rate(counts)} for name, counts in self.caches.items()},
+            'profile': self.profile,
+        }
+
+    def format(self) -> str:
+        data = self.to_dict()
+        total = data['total_seconds']
+        lines = [f"Timings (total {format_ms(total)})", f"  {'phase':<20} {'calls':>6} {'time':>11} {'share':>6}"]
+        for name, phase in data['phases'].items():
+            share = phase['seconds'] / total if total else 0.0
+            lines.append(f"  {name:<20} {phase['calls']:>6} {format_ms(phase['seconds']):>11} {share:>6.1%}")
+        if data['conversions']:
+            lines.append(f"  {'conversion':<20} {'count':>6} {'time':>11} {'mean':>11}")
+            for typ, conversion in data['conversions'].items():
+                mean = conversion['seconds'] / conversion['count']
+                lines.append(f"  {typ:<20} {conversion['count']:>6} {format_ms(conversion['seconds']):>11} {format_ms(mean):>11}")
+        caches = {name: cache for name, cache in data['caches'].items() if cache['hits'] or cache['misses']}
+        if caches:
+            lines.append(f"  {'cache':<20} {'hits':>6} {'misses':>11} {'rate':>6}")
+            for name, cache in caches.items():
+                lines.append(f"  {name:<20} {cache['hits']:>6} {cache['misses']:>11} {cache['hit_rate']:>6.1%}")
+        return '\n'.join(lines)
+
+    def write_json(self, path: str) -> None:
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+def hit_rate(counts: Dict[str, int]) -> Optional[float]:
+    lookups = counts['hits'] + counts['misses']
+    return counts['hits'] / lookups if lookups else None
+
+
+def format_ms(seconds: float) -> str:
+    return f"{seconds * 1000:.3f} ms"
+
+
+def default_profile_path(kind: str) -> str:
+    return f"template-parser.{PROFILE_EXTENSIONS[kind]}"
+
+
+@contextmanager
+def profiling(kind: str, path: str, timings: Optional[Timings] = None) -> Iterator[None]:
+    """Profile the enclosed block and dump the result to path.
+
+    cprofile writes pstats data (`python -m pstats PATH`); tracemalloc writes a
+    snapshot of live allocations at the end of the block
+    (`tracemalloc.Snapshot.load(PATH)`) and reports the peak traced memory.
+    """
+    if kind not in PROFILERS:
+        raise ValueError(f"Unknown profiler '{kind}'. Choose one of: {', '.join(PROFILERS)}")
+    profile: Dict[str, Any] = {'kind': kind, 'path': path}
+    if kind == 'cprofile':
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    else:
+        import tracemalloc
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+    try:
+        yield
+    finally:
+        if kind == 'cprofile':
+            profiler.disable()
+            profiler.dump_stats(path)
+        else:
+            snapshot = tracemalloc.take_snapshot()
+            profile['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            snapshot.dump(path)
+        if timings is not None:
+            timings.profile = profile
+        peak = f", peak traced memory {profile['peak_bytes'] / 2 ** 20:.1f} MiB" if 'peak_bytes' in profile else ''
+        print(f"{kind} profile written to {path}{peak}", file=sys.stderr)
@@ -0,0 +1,165 @@
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+from .constants import DATA_TYPES
+from .helpers.currency import get_currency_formatter
+from .helpers.date_utils import convert_date, parse_input_date
+from .helpers.frozen import _Frozen
+from .validators import InputValidators
+
+ENTRY_POINT_GROUP = 'template_parser.types'
+
+Validator = Callable[[str], Tuple[bool, Optional[str]]]
+Parser = Callable[[str], Any]
+Formatter = Callable[[Any, Mapping[str, Any], str], Any]
+
+
+def _unparsed(value: str) -> str:
+    return value
+
+
+def _unformatted(value: Any, options: Mapping[str, Any], locale: str) -> Any:
+    return value
+
+
+class PlaceholderType(_Frozen):
+    """Everything the tool knows about one placeholder type, such as the `int` in `<n:int>`.
+
+    validator(text) returns (valid, message) and checks prompted and batch
+    inputs. parser(text) turns an input into a value, raising ValueError if it
+    cannot; formatter(value, options, locale) turns that value into what is
+    written to the output. strict means the parser rejects every input the
+    validator would, so render() need not run both; cacheable means conversions
+    are worth keeping in the application's cache; example, if set, returns the
+    hint shown when prompting.
+
+    Templates resolve their types when they are compiled, so register a type
+    before compiling templates that use it.
+    """
+    __slots__ = ('name', 'validator', 'parser', 'formatter', 'strict', 'cacheable', 'example')
+
+    def __init__(self, name: str, validator: Validator = InputValidators.validate_non_empty,
+                 parser: Parser = _unparsed, formatter: Formatter = _unformatted,
+                 strict: bool = False, cacheable: bool = False, example: Optional[Callable[[], str]] = None):
+        object.__setattr__(self, 'name', name)
+        object.__setattr__(self, 'validator', validator)
+        object.__setattr__(self, 'parser', parser)
+        object.__setattr__(self, 'formatter', formatter)
+        object.__setattr__(self, 'strict', strict)
+        object.__setattr__(self, 'cacheable', cacheable)
+        object.__setattr__(self, 'example', example)
+
+    def convert(self, value: str, options: Mapping[str, Any], locale: str) -> Any:
+        return self.formatter(self.parser(value), options, locale)
+
+    def replace(self, **changes) -> 'PlaceholderType':
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields.update(changes)
+        return PlaceholderType(**fields)
+
+    def __reduce__(self):
+        # Pickled by name when compiled templates are sent to pool workers, so each
+        # worker uses the type registered in its own process.
+        return get_type, (self.name,)
+
+    def __repr__(self) -> str:
+        return f"PlaceholderType({self.name!r})"
+
+
+def _parse_date(value: str) -> datetime:
+    date_obj = parse_input_date(value)
+    if date_obj is None:
+        raise ValueError(f"Invalid date input: '{value}'")
+    return date_obj
+
+
+def _format_date(date_obj: datetime, options: Mapping[str, Any], locale: str) -> str:
+    return convert_date(date_obj, options)
+
+
+def _format_currency(number: float, options: Mapping[str, Any], locale: str) -> str:
+    format_style = options.get('format', 'standard')
+    include_symbol = str(options.get('symbol', 'true')).lower() == 'true'
+    currency_code = options.get('currency_code', 'USD')
+
+    if format_style == 'long':
+        from num2words import num2words
+        return num2words(number, to='currency', lang=locale)
+    return get_currency_formatter(locale, currency_code, format_style, include_symbol).format(number)
+
+
+def _date_example() -> str:
+    now = datetime.now()
+    return f"examples: {now.strftime('%d-%m-%Y')} or {now.strftime('%d-%m-%Y %H:%M')}"
+
+
+STRING = PlaceholderType(DATA_TYPES['STRING'])
+INTEGER = PlaceholderType(DATA_TYPES['INTEGER'], InputValidators.validate_int, int, strict=True, cacheable=True)
+FLOAT = PlaceholderType(DATA_TYPES['FLOAT'], InputValidators.validate_float, float, strict=True, cacheable=True)
+URL = PlaceholderType(DATA_TYPES['URL'], InputValidators.validate_url)
+DATE = PlaceholderType(DATA_TYPES['DATE'], InputValidators.validate_date, _parse_date, _format_date,
+                       strict=True, cacheable=True, example=_date_example)
+CURRENCY = PlaceholderType(DATA_TYPES['CURRENCY'], InputValidators.validate_currency, float, _format_currency,
+                           strict=True, cacheable=True, example=lambda: "example: 1000000")
+BUILTIN_TYPES = (STRING, INTEGER, FLOAT, URL, DATE, CURRENCY)
+
+_types: Dict[str, PlaceholderType] = {placeholder_type.name: placeholder_type for placeholder_type in BUILTIN_TYPES}
+# Unknown type names behave like str; each gets its own object so its name is kept.
+_fallbacks: Dict[str, PlaceholderType] = {}
+_entry_points_loaded = False
+_lock = threading.RLock()
+
+
+def register_type(placeholder_type: PlaceholderType, replace: bool = False) -> None:
+    with _lock:
+        if not replace and placeholder_type.name in _types:
+            raise ValueError(f"Placeholder type '{placeholder_type.name}' is already registered.")
+        _types[placeholder_type.name] = placeholder_type
+        _fallbacks.pop(placeholder_type.name, None)
+
+
+def get_type(name: str) -> PlaceholderType:
+    placeholder_type = _types.get(name)
+    if placeholder_type is not None:
+        return placeholder_type
+    if not _entry_points_loaded:
+        load_entry_points()
+        placeholder_type = _types.get(name)
+        if placeholder_type is not None:
+            return placeholder_type
+    with _lock:
+        placeholder_type = _fallbacks.get(name)
+        if placeholder_type is None:
+            placeholder_type = _fallbacks[name] = PlaceholderType(name)
+        return placeholder_type
+
+
+def registered_types() -> Dict[str, PlaceholderType]:
+    load_entry_points()
+    return dict(_types)
+
+
+def load_entry_points() -> None:
+    """Register the types other packages declare in the `template_parser.types` entry point group.
+
+    Each entry point names a PlaceholderType, or a callable returning one. They
+    are loaded once, the first time an unregistered type name is looked up, and
+    cannot replace a type that is already registered.
+    """
+    global _entry_points_loaded
+    with _lock:
+        if _entry_points_loaded:
+            return
+        _entry_points_loaded = True
+        from importlib.metadata import entry_points
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+            try:
+                placeholder_type = entry_point.load()
+                if not isinstance(placeholder_type, PlaceholderType):
+                    placeholder_type = placeholder_type()
+                if not isinstance(placeholder_type, PlaceholderType):
+                    raise TypeError(f"expected a PlaceholderType, got {type(placeholder_type).__name__}")
+                register_type(placeholder_type)
+            except Exception as e:
+                logging.warning(f"Cannot load placeholder type '{entry_point.name}' from {entry_point.value}: {e}")
@@ -1,17 +1,20 @@
 import urllib.parse
 from typing import Callable, Optional, Tuple, Any
-from datetime import datetime
+from .helpers.date_utils import parse_input_date
 
 class InputValidators:
     validators: dict[str, Callable[[str], Tuple[bool, Optional[str]]]] = {}
 
     @classmethod
     def register_validator(cls, name: str, func: Callable[[str], Tuple[bool, Optional[str]]]) -> None:
+        from .type_registry import get_type, register_type
         cls.validators[name] = func
+        register_type(get_type(name).replace(validator=func), replace=True)
 
     @classmethod
     def get_validator(cls, name: str) -> Callable[[str], Tuple[bool, Optional[str]]]:
-        return cls.validators.get(name, cls.validate_non_empty)
+        from .type_registry import get_type
+        return get_type(name).validator
 
     @staticmethod
     def validate_non_empty(value: str) -> Tuple[bool, Optional[str]]:
@@ -49,13 +52,8 @@ class InputValidators:
 
     @staticmethod
     def validate_date(value):
-        formats = ['%d-%m-%Y %H:%M', '%d-%m-%Y']  # List of accepted formats
-        for fmt in formats:
-            try:
-                datetime.strptime(value.strip(), fmt)
-                return True, ""
-            except ValueError:
-                continue
+        if parse_input_date(value) is not None:
+            return True, ""
         return False, "Invalid date format. Expected formats: DD-MM-YYYY or DD-MM-YYYY HH:MM"
     
     @staticmethod
@@ -0,0 +1,208 @@
+import os
+import sys
+import json
+import time
+import ctypes
+import select
+from typing import Dict, List, Optional, Sequence, Tuple
+from .application import TemplateApplication
+from .batch import BatchResult, BatchRunner, read_input_rows
+from .compiled_template import CompiledTemplate
+from .constants import DEFAULT_POLL_INTERVAL
+from .render_cache import content_digest
+
+# inotify(7) event masks for the directories holding watched files; editors
+# often save by writing a new file and renaming it over the old one.
+_IN_MODIFY = 0x002
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+
+Signature = Optional[Tuple[int, int, int]]
+
+
+def file_signature(path: str) -> Signature:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+class PollingWaiter:
+    def wait(self, timeout: float) -> None:
+        time.sleep(timeout)
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWaiter:
+    # Wakes up as soon as anything changes in the watched directories; the
+    # watcher still compares signatures, so spurious wake-ups are harmless.
+    def __init__(self, paths: Sequence[str]):
+        self._libc = ctypes.CDLL(None, use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        for directory in sorted({os.path.dirname(os.path.abspath(path)) for path in paths}):
+            if self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK) < 0:
+                error = ctypes.get_errno()
+                os.close(self._fd)
+                raise OSError(error, f"inotify_add_watch failed for '{directory}'")
+
+    def wait(self, timeout: float) -> None:
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if ready:
+            # Let a burst of events from one save settle before re-rendering.
+            time.sleep(0.05)
+            self._drain()
+
+    def _drain(self) -> None:
+        while True:
+            try:
+                if not os.read(self._fd, 64 * 1024):
+                    return
+            except BlockingIOError:
+                return
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+def create_waiter(paths: Sequence[str], poll: bool = False):
+    if not poll and sys.platform.startswith('linux'):
+        try:
+            return InotifyWaiter(paths)
+        except (OSError, AttributeError):
+            pass
+    return PollingWaiter()
+
+
+class TemplateState:
+    __slots__ = ('path', 'signature', 'digest', 'compiled', 'fields', 'outputs')
+
+    def __init__(self, path: str):
+        self.path = path
+        self.signature: Signature = None
+        self.digest: Optional[str] = None
+        self.compiled: Optional[CompiledTemplate] = None
+        self.fields: Dict[str, str] = {}
+        # Row number -> output path produced from this template.
+        self.outputs: Dict[int, str] = {}
+
+
+class Watcher:
+    """Keeps outputs of templates x input rows up to date as either side changes.
+
+    The dependency graph maps every (template, row) pair to the output it
+    produced. A changed template re-renders its own rows, and a changed inputs
+    file re-renders only rows whose content changed, for every template. The
+    application, its compiled templates and its conversion caches stay warm
+    between renders.
+    """
+    def __init__(self, app: TemplateApplication, template_paths: Sequence[str], inputs_path: str,
+                 context: Optional[Dict[str, str]] = None):
+        self.app = app
+        self.runner = BatchRunner(app)
+        self.templates = [TemplateState(path) for path in template_paths]
+        self.inputs_path = inputs_path
+        self.inputs_signature: Signature = None
+        self.rows: Dict[int, Dict[str, str]] = {}
+        self.row_digests: Dict[int, str] = {}
+        # Fixed for the whole session so re-rendered rows keep their output filenames.
+        self.context = context or app.get_context_variables()
+
+    @property
+    def watched_paths(self) -> List[str]:
+        return [state.path for state in self.templates] + [self.inputs_path]
+
+    def start(self) -> BatchResult:
+        self.app.warm_up()
+        self.app.file_manager.ensure_directory(self.app.output_dir)
+        self.app.config_manager.load_config()
+        return self.poll()
+
+    def poll(self) -> BatchResult:
+        result = BatchResult()
+        changed_rows = self.refresh_inputs()
+        for state in self.templates:
+            if self.refresh_template(state):
+                self.render(state, sorted(self.rows), result)
+            elif changed_rows:
+                self.render(state, changed_rows, result)
+        self.app.file_manager.flush()
+        if self.app.render_cache is not None:
+            self.app.render_cache.save()
+        return result
+
+    def refresh_inputs(self) -> List[int]:
+        signature = file_signature(self.inputs_path)
+        if signature == self.inputs_signature:
+            return []
+        self.inputs_signature = signature
+        try:
+            rows = dict(enumerate(read_input_rows(self.inputs_path), start=1))
+        except (IOError, ValueError) as e:
+            self.app.user_interface.display_error(f"Cannot read inputs: {e}")
+            return []
+        digests = {row_number: content_digest(json.dumps(row, sort_keys=True).encode('utf-8'))
+                   for row_number, row in rows.items()}
+        changed = [row_number for row_number, digest in digests.items() if self.row_digests.get(row_number) != digest]
+        for row_number in set(self.rows) - set(rows):
+            for state in self.templates:
+                output_path = state.outputs.pop(row_number, None)
+                if output_path:
+                    self.app.user_interface.display_warning(
+                        f"Row {row_number} was removed from the inputs; leaving {output_path} in place."
+                    )
+        self.rows = rows
+        self.row_digests = digests
+        return changed
+
+    def refresh_template(self, state: TemplateState) -> bool:
+        signature = file_signature(state.path)
+        if signature == state.signature:
+            return False
+        state.signature = signature
+        if signature is None:
+            self.app.user_interface.display_warning(f"Template '{state.path}' no longer exists.")
+            return False
+        try:
+            with open(state.path, 'rb') as f:
+                digest = content_digest(f.read())
+            if digest == state.digest:
+                return False
+            state.compiled, state.fields = self.runner.prepare(state.path)
+        except Exception as e:
+            self.app.user_interface.display_error(f"Cannot load template '{state.path}': {e}")
+            return False
+        state.digest = digest
+        return True
+
+    def render(self, state: TemplateState, row_numbers: Sequence[int], result: BatchResult) -> None:
+        if state.compiled is None or not row_numbers:
+            return
+        context = {**self.context, 'template': os.path.splitext(os.path.basename(state.path))[0]}
+        chunk = [(row_number, self.rows[row_number]) for row_number in row_numbers]
+        produced: Dict[str, int] = {}
+        rendered_before = result.rendered - result.unchanged
+        with self.app.config_manager.group_commit():
+            for outcome in self.runner.process_chunk(state.compiled, state.fields, chunk, context):
+                self.runner.record(outcome, result, produced)
+                if outcome.error is None:
+                    state.outputs[outcome.row_number] = outcome.output_path
+        self.app.user_interface.display_message(
+            f"{state.path}: re-rendered {result.rendered - result.unchanged - rendered_before} of {len(self.rows)} rows."
+        )
+
+    def run(self, waiter, interval: float = DEFAULT_POLL_INTERVAL, iterations: Optional[int] = None) -> None:
+        self.start()
+        count = 0
+        while iterations is None or count < iterations:
+            waiter.wait(interval)
+            self.poll()
+            count += 1
+
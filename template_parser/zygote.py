@@ -0,0 +1,303 @@
+import os
+import sys
+import json
+import time
+import signal
+import socket
+import struct
+from typing import Any, Dict, List, Optional
+from . import __version__
+from .constants import DEFAULT_ZYGOTE_IDLE_TIMEOUT
+
+# Frames on the zygote socket: a 4-byte length and a JSON header from the client
+# (sent together with its stdin, stdout and stderr), then 4-byte integers back:
+# the pid of the forked child, and later its exit code.
+_LENGTH = struct.Struct('<I')
+_CODE = struct.Struct('<i')
+# Sent instead of a pid when the zygote is running different code than the client.
+STALE = 0
+ZYGOTE_START_TIMEOUT = 10.0
+
+
+def supported() -> bool:
+    return hasattr(os, 'fork') and hasattr(socket, 'send_fds')
+
+
+def socket_path() -> str:
+    base = os.environ.get('XDG_RUNTIME_DIR') or os.environ.get('TMPDIR') or '/tmp'
+    return os.path.join(base, f'template-parser-{os.getuid()}', 'zygote.sock')
+
+
+def code_signature() -> str:
+    # A zygote started before the package was upgraded or edited must not run
+    # the old code, so clients and zygote compare the interpreter and sources.
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    latest, count = 0, 0
+    for directory in (package_dir, os.path.join(package_dir, 'helpers')):
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.endswith('.py'):
+                    latest = max(latest, entry.stat().st_mtime_ns)
+                    count += 1
+    return f"{__version__}:{sys.executable}:{latest}:{count}"
+
+
+def current_umask() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# ---------------------------------------------------------------- client side
+
+def run_in_zygote(argv: List[str]) -> Optional[int]:
+    """Runs the command in a child forked from the zygote and returns its exit code.
+
+    Returns None if no usable zygote is running; one is then started in the
+    background for later invocations and the caller runs the command itself.
+    """
+    path = socket_path()
+    header = {
+        'argv': argv,
+        'cwd': os.getcwd(),
+        'env': dict(os.environ),
+        'umask': current_umask(),
+        'signature': code_signature()
+    }
+    try:
+        connection = _connect(path)
+    except OSError:
+        spawn_zygote()
+        return None
+    with connection:
+        try:
+            _send(connection, header, fds=[0, 1, 2])
+            pid = _receive_code(connection)
+        except OSError:
+            return None
+        if pid is None:
+            return None
+        if pid == STALE:
+            spawn_zygote()
+            return None
+        while True:
+            try:
+                code = _receive_code(connection)
+                break
+            except KeyboardInterrupt:
+                # Ctrl+C only reaches this process; pass it on to the child.
+                _signal(pid, signal.SIGINT)
+        return 1 if code is None else code
+
+
+def request(command: str) -> Optional[Dict[str, Any]]:
+    try:
+        connection = _connect(socket_path())
+    except OSError:
+        return None
+    with connection:
+        _send(connection, {'command': command})
+        return _receive_header(connection)
+
+
+def spawn_zygote() -> None:
+    import subprocess
+    subprocess.Popen(
+        [sys.executable, '-m', 'template_parser.main', 'zygote', 'run'],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True
+    )
+
+
+def _connect(path: str) -> socket.socket:
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(path)
+    except OSError:
+        connection.close()
+        raise
+    return connection
+
+
+def _signal(pid: int, signum: int) -> None:
+    try:
+        os.kill(pid, signum)
+    except ProcessLookupError:
+        pass
+
+
+# ------------------------------------------------------------------ framing
+
+def _send(connection: socket.socket, header: Dict[str, Any], fds: Optional[List[int]] = None) -> None:
+    payload = json.dumps(header).encode('utf-8')
+    message = _LENGTH.pack(len(payload)) + payload
+    if fds:
+        sent = socket.send_fds(connection, [message], fds)
+        connection.sendall(message[sent:])
+    else:
+        connection.sendall(message)
+
+
+def _receive_header(connection: socket.socket, max_fds: int = 0):
+    if max_fds:
+        data, fds, _, _ = socket.recv_fds(connection, 64 * 1024, max_fds)
+    else:
+        data, fds = connection.recv(64 * 1024), []
+    data = _receive_exactly(connection, data, _LENGTH.size)
+    if data is None:
+        return (None, fds) if max_fds else None
+    length = _LENGTH.unpack_from(data)[0]
+    data = _receive_exactly(connection, data, _LENGTH.size + length)
+    header = json.loads(data[_LENGTH.size:]) if data is not None else None
+    return (header, fds) if max_fds else header
+
+
+def _receive_code(connection: socket.socket) -> Optional[int]:
+    data = _receive_exactly(connection, b'', _CODE.size)
+    return None if data is None else _CODE.unpack(data)[0]
+
+
+def _receive_exactly(connection: socket.socket, data: bytes, size: int) -> Optional[bytes]:
+    while len(data) < size:
+        chunk = connection.recv(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+
+# ---------------------------------------------------------------- zygote side
+
+def preload(cwd: str) -> None:
+    # Import everything a command can touch and load the locale data of the
+    # directory the zygote was started from, so forked children start warm.
+    import gc
+    from . import application, batch, main, server, watch  # noqa: F401
+    from .columnar import numpy_available
+    from .config_manager import ProgramConfigManager
+    from .file_manager import FileManager
+    from .helpers.currency import get_currency_formatter
+    from .helpers.date_utils import get_date_delta  # noqa: F401
+    from dateutil.relativedelta import relativedelta  # noqa: F401
+    from num2words import num2words
+
+    program_config_manager = ProgramConfigManager(os.path.join(cwd, 'files', 'program_config.json'), FileManager())
+    locale = program_config_manager.get_locale()
+    try:
+        get_currency_formatter(locale, 'USD')
+        num2words(1, to='currency', lang=locale)
+    except Exception:
+        pass
+    numpy_available()
+    # Keep the preloaded objects out of later collections, so children do not
+    # copy the pages holding them just to update reference counts.
+    gc.freeze()
+
+
+def serve(path: str, idle_timeout: float = DEFAULT_ZYGOTE_IDLE_TIMEOUT) -> None:
+    directory = os.path.dirname(path)
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    if os.stat(directory).st_uid != os.getuid():
+        raise OSError(f"'{directory}' is not owned by the current user.")
+    from .server import remove_stale_socket
+    remove_stale_socket(path)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    os.chmod(path, 0o600)
+    inode = os.stat(path).st_ino
+    listener.listen(64)
+    preload(os.getcwd())
+    signature = code_signature()
+    # Children are never waited for; let the kernel reap them.
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    listener.settimeout(idle_timeout)
+    try:
+        while True:
+            try:
+                connection, _ = listener.accept()
+            except socket.timeout:
+                return
+            with connection:
+                if not handle(listener, connection, signature):
+                    return
+    finally:
+        listener.close()
+        # A replacement zygote may already be listening on the same path.
+        try:
+            if os.stat(path).st_ino == inode:
+                os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+def handle(listener: socket.socket, connection: socket.socket, signature: str) -> bool:
+    # Returns False when the zygote should exit.
+    header, fds = _receive_header(connection, max_fds=3)
+    try:
+        if header is None:
+            return True
+        command = header.get('command')
+        if command == 'status':
+            _send(connection, {'pid': os.getpid(), 'version': __version__})
+            return True
+        if command == 'stop':
+            _send(connection, {'pid': os.getpid()})
+            return False
+        if header.get('signature') != signature:
+            connection.sendall(_CODE.pack(STALE))
+            return False
+        if len(fds) != 3:
+            return True
+        if os.fork() == 0:
+            listener.close()
+            os._exit(run_child(connection, header, fds))
+        return True
+    finally:
+        for fd in fds:
+            os.close(fd)
+
+
+def run_child(connection: socket.socket, header: Dict[str, Any], fds: List[int]) -> int:
+    code = 1
+    try:
+        for signum in (signal.SIGCHLD, signal.SIGTERM):
+            signal.signal(signum, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        for target, fd in enumerate(fds):
+            os.dup2(fd, target)
+        os.chdir(header['cwd'])
+        os.umask(header['umask'])
+        os.environ.clear()
+        os.environ.update(header['env'])
+        if hasattr(time, 'tzset'):
+            time.tzset()
+        sys.stdout.reconfigure(line_buffering=os.isatty(1))
+        sys.argv = ['template-parser'] + header['argv']
+        connection.sendall(_CODE.pack(os.getpid()))
+
+        from .main import run_command
+        try:
+            run_command(header['argv'])
+            code = 0
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                code = e.code or 0
+            else:
+                print(e.code, file=sys.stderr)
+        except KeyboardInterrupt:
+            code = 130
+        except BaseException:
+            import traceback
+            traceback.print_exc()
+    finally:
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.flush()
+            except Exception:
+                pass
+        try:
+            connection.sendall(_CODE.pack(code))
+        except OSError:
+            pass
+    return code
@@ -0,0 +1,53 @@
+import pytest
+from unittest.mock import MagicMock
+from template_parser.application import TemplateApplication
+from template_parser.config_manager import ConfigManager, ProgramConfigManager
+from template_parser.file_manager import FileManager
+from template_parser.render_cache import RENDER_CACHE_NAME, RenderCache
+from template_parser.template_processor import TemplateProcessor
+from template_parser.user_interface import UserInterface
+
+# A real TemplateApplication writing under tmp_path, with mocked configuration,
+# history and user interface. Modules override required_variables,
+# output_filename_format or templates_dir to adjust it.
+
+@pytest.fixture
+def required_variables():
+    return []
+
+@pytest.fixture
+def output_filename_format():
+    return '{name}.json'
+
+@pytest.fixture
+def templates_dir(tmp_path):
+    return tmp_path
+
+@pytest.fixture
+def program_config_manager(required_variables, output_filename_format):
+    manager = MagicMock(spec=ProgramConfigManager)
+    manager.get_locale.return_value = 'en_GB'
+    manager.get_required_variables.return_value = required_variables
+    manager.get_output_filename_format.return_value = output_filename_format
+    return manager
+
+@pytest.fixture
+def build_application(tmp_path, templates_dir, program_config_manager):
+    def build(render_cache=False, force=False):
+        file_manager = FileManager()
+        output_dir = tmp_path / 'output'
+        return TemplateApplication(
+            file_manager=file_manager,
+            config_manager=MagicMock(spec=ConfigManager),
+            template_processor=TemplateProcessor(),
+            templates_dir=str(templates_dir),
+            output_dir=str(output_dir),
+            program_config_manager=program_config_manager,
+            user_interface=MagicMock(spec=UserInterface),
+            render_cache=RenderCache(str(output_dir / RENDER_CACHE_NAME), file_manager, force=force) if render_cache else None
+        )
+    return build
+
+@pytest.fixture
+def application(build_application):
+    return build_application()
@@ -1,3 +1,5 @@
+import json
+import os
 import pytest
 from unittest.mock import MagicMock
 from template_parser.application import TemplateApplication
@@ -7,6 +9,7 @@ from template_parser.user_interface import UserInterface
 from template_parser.file_manager import FileManager
 from template_parser.config_manager import ConfigManager
 from template_parser.template_processor import TemplateProcessor
+from template_parser.template_manifest import TemplateManifest
 from template_parser.validators import InputValidators
 
 @pytest.fixture
@@ -19,7 +22,9 @@ def mock_file_manager():
 
 @pytest.fixture
 def mock_template_processor():
-    return MagicMock(spec=TemplateProcessor)
+    processor = MagicMock(spec=TemplateProcessor)
+    processor.compile.side_effect = TemplateProcessor().compile
+    return processor
 
 @pytest.fixture
 def mock_config_manager():
@@ -301,3 +306,93 @@ class TestGetValidator:
         validator = application.get_validator('unknown_type')
         assert validator == InputValidators.validate_non_empty
 
+
+class TestConversionCache:
+    def test_repeated_conversion_hits_cache(self, application):
+        options = {'format': 'standard', 'currency_code': 'GBP'}
+        first = application.convert_type("99.99", DATA_TYPES['CURRENCY'], options)
+        second = application.convert_type("99.99", DATA_TYPES['CURRENCY'], dict(reversed(list(options.items()))))
+        assert first == second == "£99.99"
+        assert application.conversion_cache.misses == 1
+        assert application.conversion_cache.hits == 1
+
+    def test_locale_is_part_of_cache_key(self, application, mock_program_config_manager):
+        options = {'format': 'standard', 'currency_code': 'EUR'}
+        assert application.convert_type("1000", DATA_TYPES['CURRENCY'], options) == "€1,000.00"
+        mock_program_config_manager.get_locale.return_value = 'de_DE'
+        assert application.convert_type("1000", DATA_TYPES['CURRENCY'], options) == "1.000,00\u00A0€"
+        assert application.conversion_cache.hits == 0
+
+    def test_failed_conversion_is_not_cached(self, application):
+        with pytest.raises(ValueError):
+            application.convert_type("abc", DATA_TYPES['INTEGER'])
+        with pytest.raises(ValueError):
+            application.convert_type("abc", DATA_TYPES['INTEGER'])
+        assert len(application.conversion_cache) == 0
+
+    def test_strings_bypass_cache(self, application):
+        assert application.convert_type("hello", DATA_TYPES['STRING']) == "hello"
+        assert application.conversion_cache.stats()['misses'] == 0
+
+    def test_cache_shared_across_renders(self, application):
+        template_text = '{"a": "<d:date|format=%Y>", "b": "<d:date|format=%Y>", "c": "Year <d:date|format=%Y>"}'
+        application.replace_placeholders(template_text, {'d': '01-01-2024'})
+        application.replace_placeholders(template_text, {'d': '01-01-2024'})
+        assert application.conversion_cache.misses == 1
+        assert application.conversion_cache.hits == 5
+
+class TestCompileTemplate:
+    def test_compiles_through_processor_once(self, application, mock_template_processor):
+        template_text = '{"a": "<name>"}'
+        compiled = application.compile_template(template_text)
+        assert application.compile_template(template_text) is compiled
+        mock_template_processor.compile.assert_called_once_with(template_text)
+
+class TestRun:
+    def test_run_renders_once_and_writes_tree(self, application, mock_file_manager, mock_program_config_manager, tmp_path):
+        template_path = tmp_path / 'template.json'
+        template_path.write_text('{"age": "<age:int>", "note": "Age <age:int>"}')
+        mock_file_manager.read_file.return_value = template_path.read_text()
+        mock_program_config_manager.get_required_variables.return_value = []
+        mock_program_config_manager.get_output_filename_format.return_value = 'out.json'
+        application.template_processor = TemplateProcessor()
+        application.user_interface.get_input = MagicMock(return_value='7')
+
+        application.run(str(template_path))
+
+        mock_file_manager.write_json.assert_called_once_with(
+            os.path.join('output', 'out.json'), {"age": 7, "note": "Age 7"}, indent=2
+        )
+        mock_file_manager.write_file.assert_not_called()
+
+    def test_run_stream_writes_same_output(self, application, mock_program_config_manager, tmp_path):
+        template_path = tmp_path / 'template.json'
+        template_path.write_text('{"age": "<age:int>", "note": "Age <age:int>", "list": []}')
+        mock_program_config_manager.get_required_variables.return_value = []
+        mock_program_config_manager.get_output_filename_format.return_value = 'out.json'
+        application.file_manager = FileManager()
+        application.output_dir = str(tmp_path / 'output')
+        application.user_interface.get_input = MagicMock(return_value='7')
+
+        application.run(str(template_path), stream=True)
+
+        output = (tmp_path / 'output' / 'out.json').read_text()
+        assert output == json.dumps({"age": 7, "note": "Age 7", "list": []}, indent=2)
+
+    def test_run_lists_and_loads_templates_through_manifest(self, application, mock_file_manager, mock_program_config_manager, tmp_path):
+        templates_dir = tmp_path / 'templates'
+        (templates_dir / 'nested').mkdir(parents=True)
+        (templates_dir / 'nested' / 'template.json').write_text('{"age": "<age:int>"}')
+        mock_program_config_manager.get_required_variables.return_value = []
+        mock_program_config_manager.get_output_filename_format.return_value = 'out.json'
+        application.templates_dir = str(templates_dir)
+        application.template_processor = TemplateProcessor()
+        application.template_manifest = TemplateManifest(str(templates_dir), application.template_processor)
+        application.user_interface.get_input = MagicMock(side_effect=['1', '7'])
+
+        application.run()
+
+        mock_file_manager.list_directory.assert_not_called()
+        mock_file_manager.read_file.assert_not_called()
+        mock_file_manager.write_json.assert_called_once_with(os.path.join('output', 'out.json'), {"age": 7}, indent=2)
+        assert 'nested/template.json' in application.template_manifest.entries
@@ -0,0 +1,75 @@
+import json
+import threading
+import pytest
+from unittest.mock import MagicMock
+from template_parser.async_file_manager import AsyncFileManager
+from template_parser.file_manager import FileManager
+from template_parser.helpers.digest import content_digest
+
+class BlockingFileManager(FileManager):
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self.started = threading.Semaphore(0)
+
+    def write_json(self, file_path, data, indent=None):
+        self.started.release()
+        self.release.wait(5)
+        return super().write_json(file_path, data, indent)
+
+def test_writes_land_after_flush(tmp_path):
+    with AsyncFileManager(FileManager(), max_workers=3) as file_manager:
+        for n in range(20):
+            file_manager.write_json(str(tmp_path / f"{n}.json"), {"n": n}, indent=2)
+        file_manager.flush()
+        for n in range(20):
+            assert json.loads((tmp_path / f"{n}.json").read_text()) == {"n": n}
+
+def test_submit_blocks_when_max_pending_reached(tmp_path):
+    inner = BlockingFileManager()
+    file_manager = AsyncFileManager(inner, max_workers=1, max_pending=2)
+    file_manager.submit_json(str(tmp_path / "a.json"), {})
+    file_manager.submit_json(str(tmp_path / "b.json"), {})
+
+    third = threading.Thread(target=file_manager.submit_json, args=(str(tmp_path / "c.json"), {}))
+    third.start()
+    third.join(0.2)
+    assert third.is_alive()
+
+    inner.release.set()
+    third.join(5)
+    assert not third.is_alive()
+    file_manager.close()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.json", "b.json", "c.json"]
+
+def test_flush_raises_write_errors(tmp_path):
+    file_manager = AsyncFileManager(FileManager())
+    file_manager.write_file(str(tmp_path / "missing" / "out.json"), "{}")
+    with pytest.raises(IOError) as exc_info:
+        file_manager.flush()
+    assert "Error writing to file" in str(exc_info.value)
+    file_manager.flush()
+    file_manager.close()
+
+def test_submit_json_returns_future(tmp_path):
+    with AsyncFileManager(FileManager()) as file_manager:
+        future = file_manager.submit_json(str(tmp_path / "out.json"), [1, 2])
+        digest, size = future.result(5)
+    content = (tmp_path / "out.json").read_bytes()
+    assert (digest, size) == (content_digest(content), len(content))
+    assert json.loads((tmp_path / "out.json").read_text()) == [1, 2]
+
+def test_write_json_waits_and_returns_digest(tmp_path):
+    with AsyncFileManager(FileManager()) as file_manager:
+        digest, size = file_manager.write_json(str(tmp_path / "out.json"), {"a": 1})
+        content = (tmp_path / "out.json").read_bytes()
+    assert (digest, size) == (content_digest(content), len(content))
+
+def test_reads_and_directories_delegate():
+    inner = MagicMock(spec=FileManager)
+    inner.read_file.return_value = "content"
+    with AsyncFileManager(inner) as file_manager:
+        assert file_manager.read_file("a.json") == "content"
+        file_manager.ensure_directory("out")
+    inner.ensure_directory.assert_called_once_with("out")
+    inner.flush.assert_called()
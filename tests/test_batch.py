@@ -0,0 +1,210 @@
+import json
+import pytest
+from functools import partial
+from unittest.mock import MagicMock
+from template_parser.application import TemplateApplication
+from template_parser.async_file_manager import AsyncFileManager
+from template_parser.batch import BatchRunner, read_input_rows, normalize_row
+from template_parser.config_manager import ConfigManager, ProgramConfigManager
+from template_parser.file_manager import FileManager
+from template_parser.template_processor import TemplateProcessor
+from template_parser.user_interface import UserInterface
+
+@pytest.fixture
+def required_variables():
+    return [{'name': 'name', 'type': 'str'}]
+
+def build_worker_application(program_config_path, output_dir):
+    file_manager = FileManager()
+    return TemplateApplication(
+        file_manager=file_manager,
+        config_manager=MagicMock(spec=ConfigManager),
+        template_processor=TemplateProcessor(),
+        templates_dir=output_dir,
+        output_dir=output_dir,
+        program_config_manager=ProgramConfigManager(program_config_path, file_manager),
+        user_interface=MagicMock(spec=UserInterface)
+    )
+
+@pytest.fixture
+def template_path(tmp_path):
+    path = tmp_path / 'template.json'
+    path.write_text(json.dumps({"name": "<name>", "age": "<age:int>", "note": "Age <age:int> years"}))
+    return str(path)
+
+def test_read_input_rows_jsonl(tmp_path):
+    path = tmp_path / 'rows.jsonl'
+    path.write_text('{"name": "a", "age": 1}\n\n{"name": "b", "flag": true, "skip": null}\n')
+    rows = read_input_rows(str(path))
+    assert next(rows) == {'name': 'a', 'age': '1'}
+    assert list(rows) == [{'name': 'b', 'flag': 'true'}]
+
+def test_read_input_rows_csv(tmp_path):
+    path = tmp_path / 'rows.csv'
+    path.write_text('name,age\na,1\nb,2\n')
+    assert list(read_input_rows(str(path))) == [{'name': 'a', 'age': '1'}, {'name': 'b', 'age': '2'}]
+
+def test_read_input_rows_rejects_unknown_extension(tmp_path):
+    with pytest.raises(ValueError):
+        list(read_input_rows(str(tmp_path / 'rows.txt')))
+
+def test_read_input_rows_rejects_non_object_line(tmp_path):
+    path = tmp_path / 'rows.jsonl'
+    path.write_text('[1, 2]\n')
+    with pytest.raises(ValueError):
+        list(read_input_rows(str(path)))
+
+def test_normalize_row():
+    assert normalize_row({'a': 1.5, 'b': False, 'c': 'x'}) == {'a': '1.5', 'b': 'false', 'c': 'x'}
+
+def test_batch_renders_every_valid_row(application, template_path, tmp_path):
+    rows = [{'name': 'alice', 'age': '30'}, {'name': 'bob', 'age': '41'}]
+    result = BatchRunner(application).run(template_path, iter(rows))
+    assert result.rendered == 2
+    assert result.failed == 0
+    output = json.loads((tmp_path / 'output' / 'alice.json').read_text())
+    assert output == {"name": "alice", "age": 30, "note": "Age 30 years"}
+    assert application.config_manager.save_config.call_count == 2
+    application.config_manager.save_config.assert_any_call({
+        "output_filename": "bob.json",
+        "details": {'name': 'bob', 'age': '41'}
+    })
+
+def test_batch_skips_invalid_rows(application, template_path, tmp_path):
+    rows = [{'name': 'alice', 'age': 'thirty'}, {'age': '41'}, {'name': 'carol', 'age': '5'}]
+    result = BatchRunner(application).run(template_path, iter(rows))
+    assert result.rendered == 1
+    assert result.failed == 2
+    assert result.errors[0][0] == 1
+    assert "Invalid value for 'age'" in result.errors[0][1]
+    assert result.errors[1] == (2, "Missing value for 'name'.")
+    assert not (tmp_path / 'output' / 'alice.json').exists()
+    assert (tmp_path / 'output' / 'carol.json').exists()
+
+def test_batch_row_number_available_in_filename(application, template_path, tmp_path, program_config_manager):
+    program_config_manager.get_output_filename_format.return_value = 'out_{row}.json'
+    rows = [{'name': 'alice', 'age': '30'}, {'name': 'bob', 'age': '41'}]
+    result = BatchRunner(application).run(template_path, iter(rows))
+    assert [p.rsplit('/', 1)[-1] for p in result.output_paths] == ['out_1.json', 'out_2.json']
+
+def test_batch_parallel_matches_serial_order(application, template_path, tmp_path):
+    program_config_path = tmp_path / 'program_config.json'
+    program_config_path.write_text(json.dumps({
+        "required_variables": [{"name": "name", "type": "str"}],
+        "output_filename_format": "{name}.json"
+    }))
+    rows = [{'name': f'user{i:03d}', 'age': str(i)} for i in range(40)]
+    rows[7]['age'] = 'seven'
+    factory = partial(build_worker_application, str(program_config_path), str(tmp_path / 'output'))
+    result = BatchRunner(application).run(template_path, iter(rows), workers=2, app_factory=factory, chunk_size=5)
+    assert result.rendered == 39
+    assert result.errors[0][0] == 8
+    assert result.output_paths == [str(tmp_path / 'output' / f'user{i:03d}.json') for i in range(40) if i != 7]
+    saved = [c.args[0]['output_filename'] for c in application.config_manager.save_config.call_args_list]
+    assert saved == [f'user{i:03d}.json' for i in range(40) if i != 7]
+    assert json.loads((tmp_path / 'output' / 'user012.json').read_text())['age'] == 12
+
+def test_batch_parallel_requires_factory(application, template_path):
+    with pytest.raises(ValueError):
+        BatchRunner(application).run(template_path, iter([]), workers=2)
+
+def test_batch_vectorized_matches_serial(application, template_path, tmp_path, program_config_manager):
+    program_config_manager.get_output_filename_format.return_value = '{name}_{row}.json'
+    rows = [{'name': 'alice', 'age': '30'}, {'name': 'bob', 'age': 'x'}, {'name': 'carol', 'age': '30'}]
+    result = BatchRunner(application).run(template_path, iter(rows), vectorize=True, chunk_size=2)
+    assert result.rendered == 2
+    assert result.errors[0][0] == 2
+    output = json.loads((tmp_path / 'output' / 'carol_3.json').read_text())
+    assert output == {"name": "carol", "age": 30, "note": "Age 30 years"}
+
+def test_batch_with_async_file_manager_reports_failed_writes(application, template_path, tmp_path, program_config_manager):
+    program_config_manager.get_output_filename_format.return_value = '{name}.json'
+    application.file_manager = AsyncFileManager(FileManager(), max_workers=2, max_pending=2)
+    rows = [{'name': f'user{i}', 'age': str(i)} for i in range(6)] + [{'name': 'missing/dir', 'age': '1'}]
+    result = BatchRunner(application).run(template_path, iter(rows), chunk_size=4)
+    application.file_manager.close()
+    assert result.rendered == 6
+    assert result.errors[0][0] == 7
+    assert "Error writing to file" in result.errors[0][1]
+    assert json.loads((tmp_path / 'output' / 'user5.json').read_text())['age'] == 5
+    assert application.config_manager.save_config.call_count == 6
+
+INVALID_ROWS = [{'name': 'alice', 'age': '30'}, {'name': 'bob', 'age': 'x'}, {'age': '5'}, {'name': 'dan', 'age': '7'}]
+
+def test_validate_inputs_reports_every_invalid_field(application, template_path, tmp_path):
+    report = BatchRunner(application).validate_inputs(template_path, iter(INVALID_ROWS), 'fail')
+    assert not report.valid
+    assert report.checked == 4
+    assert report.invalid_rows == [2, 3]
+    assert report.errors == [(2, 'age', "Invalid value for 'age' (type: int): Invalid input. Please enter an integer."),
+                             (3, 'name', "Missing value for 'name'.")]
+    assert not (tmp_path / 'output').exists()
+    application.config_manager.save_config.assert_not_called()
+
+def test_validation_and_rendering_report_the_same_messages(application, template_path):
+    runner = BatchRunner(application)
+    report = runner.validate_inputs(template_path, iter(INVALID_ROWS), 'skip')
+    result = runner.run(template_path, iter(INVALID_ROWS))
+    assert result.errors == [(row_number, message) for row_number, _, message in report.errors]
+
+def test_validate_inputs_fail_fast_stops_at_first_invalid_row(application, template_path):
+    report = BatchRunner(application).validate_inputs(template_path, iter(INVALID_ROWS), 'fail-fast', chunk_size=3)
+    assert report.checked == 2
+    assert report.invalid_rows == [2]
+
+def test_validate_inputs_parallel_matches_serial(application, template_path):
+    rows = [{'name': f'user{i}', 'age': 'x' if i % 7 == 0 else str(i)} for i in range(40)]
+    serial = BatchRunner(application).validate_inputs(template_path, iter(rows), 'skip')
+    parallel = BatchRunner(application).validate_inputs(template_path, iter(rows), 'skip', workers=2, chunk_size=5)
+    assert parallel.errors == serial.errors
+    assert parallel.checked == 40
+    fail_fast = BatchRunner(application).validate_inputs(template_path, iter(rows[1:]), 'fail-fast', workers=2, chunk_size=5)
+    assert fail_fast.invalid_rows == [7]
+
+def test_validate_inputs_rejects_unknown_policy(application, template_path):
+    with pytest.raises(ValueError):
+        BatchRunner(application).validate_inputs(template_path, iter([]), 'ignore')
+
+def test_validation_report_json(application, template_path, tmp_path):
+    report = BatchRunner(application).validate_inputs(template_path, iter(INVALID_ROWS), 'skip')
+    report.write_json(str(tmp_path / 'report.json'))
+    data = json.loads((tmp_path / 'report.json').read_text())
+    assert data['rows_checked'] == 4
+    assert data['invalid_rows'] == 2
+    assert data['errors'][1] == {'row': 3, 'field': 'name', 'error': "Missing value for 'name'."}
+
+def test_batch_skip_rows_keeps_row_numbers(application, template_path, tmp_path, program_config_manager):
+    program_config_manager.get_output_filename_format.return_value = 'out_{row}.json'
+    result = BatchRunner(application).run(template_path, iter(INVALID_ROWS), skip_rows={2, 3})
+    assert result.failed == 0
+    assert [p.rsplit('/', 1)[-1] for p in result.output_paths] == ['out_1.json', 'out_4.json']
+
+def test_cli_validation_failure_writes_nothing(tmp_path, monkeypatch, template_path):
+    from template_parser.main import run_command
+    monkeypatch.chdir(tmp_path)
+    inputs = tmp_path / 'rows.jsonl'
+    inputs.write_text('\n'.join(json.dumps(row) for row in INVALID_ROWS))
+    with pytest.raises(SystemExit):
+        run_command(['batch', template_path, '--inputs', str(inputs), '--output-dir', 'out',
+                     '--validation-report', 'report.json'])
+    assert json.loads((tmp_path / 'report.json').read_text())['invalid_rows'] == 2
+    assert not (tmp_path / 'out').exists()
+
+def test_batch_fails_rows_whose_values_cannot_be_converted(application, tmp_path, program_config_manager):
+    program_config_manager.get_required_variables.return_value = []
+    program_config_manager.get_output_filename_format.return_value = 'out_{row}.json'
+    path = tmp_path / 'dates.json'
+    path.write_text(json.dumps({"next": "<d:date|add_days=1>", "price": "<c:currency|format=long>"}))
+    rows = [{'d': '31-12-9999', 'c': '1'}, {'d': '01-01-2024', 'c': 'inf'}, {'d': '01-01-2024', 'c': '2'}]
+    result = BatchRunner(application).run(str(path), iter(rows))
+    assert result.rendered == 1
+    assert [row_number for row_number, _ in result.errors] == [1, 2]
+    assert "Invalid value '31-12-9999' for 'd' (type: date)" in result.errors[0][1]
+    assert sorted(p.name for p in (tmp_path / 'output').iterdir()) == ['out_3.json']
+    assert application.config_manager.save_config.call_count == 1
+
+def test_batch_bad_filename_format_fails_the_row(application, template_path, tmp_path, program_config_manager):
+    program_config_manager.get_output_filename_format.return_value = '{age:d}.json'
+    result = BatchRunner(application).run(template_path, iter([{'name': 'alice', 'age': '30'}]))
+    assert result.rendered == 0
+    assert result.errors[0] == (1, "Error generating output filename: Unknown format code 'd' for object of type 'str'")
@@ -0,0 +1,78 @@
+import json
+import pytest
+from benchmarks.generators import generate_history_entry, generate_inputs, generate_template
+from benchmarks.suite import compare, main, time_case
+from template_parser.rendering import parse_template, render
+from template_parser.template_processor import TemplateProcessor
+
+def count_leaves(node):
+    if isinstance(node, dict):
+        return sum(count_leaves(value) for value in node.values())
+    if isinstance(node, list):
+        return sum(count_leaves(value) for value in node)
+    return 1
+
+def depth(node):
+    if isinstance(node, (dict, list)):
+        values = node.values() if isinstance(node, dict) else node
+        return 1 + max((depth(value) for value in values), default=0)
+    return 0
+
+def test_generated_template_is_deterministic():
+    assert generate_template(500, seed=3) == generate_template(500, seed=3)
+    assert generate_template(500, seed=3) != generate_template(500, seed=4)
+
+def test_generated_template_shape():
+    for leaves, levels in ((1, 1), (100, 1), (1000, 4), (1234, 8)):
+        data = json.loads(generate_template(leaves, depth=levels))
+        assert count_leaves(data) == leaves
+        assert depth(data) <= levels + 1
+
+def test_generated_template_density():
+    processor = TemplateProcessor()
+    assert processor.extract_placeholders(generate_template(200, density=0)) == {}
+    text = generate_template(200, depth=1, density=1, inline_ratio=0)
+    values = [value for value in json.loads(text).values()]
+    assert all(isinstance(value, str) and value.startswith('<') for value in values)
+
+def test_generated_inputs_render():
+    text = generate_template(300, depth=3, variables=30)
+    rows = generate_inputs(text, rows=3)
+    assert len(rows) == 3
+    compiled = parse_template(text)
+    for inputs in rows:
+        render(compiled, inputs)
+
+def test_history_entry():
+    assert generate_history_entry(7)['output_filename'] == 'output_7.json'
+
+def test_compare_flags_regressions_beyond_threshold():
+    baseline = {'a': {'best': 1.0}, 'b': {'best': 1.0}, 'c': {'best': 1.0}}
+    results = {'a': {'best': 1.2}, 'b': {'best': 1.5}, 'c': {'best': 0.5}, 'new': {'best': 9.0}}
+    assert compare(results, baseline, 0.25) == [('b', 1.5)]
+
+def test_time_case_calibrates_number():
+    calls = []
+    result = time_case(lambda: calls.append(1), min_time=0.001, repeat=3)
+    assert result['number'] > 1
+    assert result['best'] <= result['median']
+
+def test_suite_saves_baseline_and_detects_regression(tmp_path, capsys):
+    baseline = tmp_path / 'baseline.json'
+    args = ['--filter', 'config_save[jsonl,history=100]', '--baseline', str(baseline), '--min-time', '0.001', '--repeat', '1']
+    main(args + ['--save-baseline'])
+    saved = json.loads(baseline.read_text())
+    assert list(saved['results']) == ['config_save[jsonl,history=100]']
+
+    saved['results']['config_save[jsonl,history=100]']['best'] = 1e-12
+    baseline.write_text(json.dumps(saved))
+    with pytest.raises(SystemExit) as excinfo:
+        main(args)
+    assert excinfo.value.code == 1
+    assert 'FAIL' in capsys.readouterr().out
+
+def test_suite_help(capsys):
+    with pytest.raises(SystemExit) as excinfo:
+        main(['--help'])
+    assert excinfo.value.code == 0
+    assert 'default: 25%' in capsys.readouterr().out
@@ -0,0 +1,25 @@
+from template_parser.helpers.cache import LRUCache, MISSING
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert cache.get('b') is MISSING
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert cache.stats() == {'hits': 3, 'misses': 1, 'size': 2, 'maxsize': 2}
+
+def test_lru_cache_disabled_when_maxsize_is_zero():
+    cache = LRUCache(maxsize=0)
+    cache.put('a', 1)
+    assert cache.get('a', None) is None
+    assert len(cache) == 0
+
+def test_lru_cache_clear_resets_counters():
+    cache = LRUCache()
+    cache.put('a', 1)
+    cache.get('a')
+    cache.clear()
+    assert cache.stats() == {'hits': 0, 'misses': 0, 'size': 0, 'maxsize': 1024}
@@ -0,0 +1,50 @@
+import json
+import pytest
+from unittest.mock import patch
+from template_parser import columnar
+from template_parser.columnar import ColumnarConverter
+from template_parser.compiled_template import compile_template
+from template_parser.helpers.cache import MISSING
+
+TEMPLATE = json.dumps({
+    "end_of_month": "<d:date|format=%Y-%m-%d|add_months=1>",
+    "shifted": "<d:date|subtract_years=1|add_days=-3|add_hours=30>",
+    "words": "<p:currency|format=long|currency_code=GBP>",
+    "plain": "<p:currency|symbol=false|currency_code=EUR>",
+    "short": "Total: <p:currency|format=short>",
+    "count": "<n:int>",
+    "ratio": "<n:float>"
+})
+
+ROWS = [
+    {'d': '31-01-2024', 'p': '99.99', 'n': '3'},
+    {'d': '29-02-2024 23:59', 'p': '1000000', 'n': ' 42'},
+    {'d': '31-01-2024', 'p': '99.99', 'n': '1_000'},
+    {'d': '15-06-2023', 'p': '-2.5', 'n': '7'},
+]
+
+def render_both(application, rows):
+    compiled = compile_template(TEMPLATE)
+    converted = ColumnarConverter(application).convert_rows(compiled, rows)
+    return [
+        (application.render_compiled(compiled, row, values), application.render_compiled(compiled, row))
+        for row, values in zip(rows, converted)
+    ]
+
+def test_vectorized_conversion_matches_scalar(application):
+    pytest.importorskip('numpy')
+    for vectorized, scalar in render_both(application, ROWS):
+        assert vectorized == scalar
+    assert render_both(application, ROWS)[0][0]['end_of_month'] == '2024-02-29'
+
+def test_scalar_fallback_without_numpy(application):
+    with patch.object(columnar, 'np', None):
+        assert not columnar.numpy_available()
+        for vectorized, scalar in render_both(application, ROWS):
+            assert vectorized == scalar
+
+def test_invalid_values_are_left_to_the_renderer(application):
+    converter = ColumnarConverter(application)
+    assert converter.convert_column(['1', 'x'], 'int', {}) == [1, MISSING]
+    assert converter.convert_column(['31-02-2024', '01-01-2024'], 'date', {'format': '%Y'}) == [MISSING, '2024']
+    assert converter.convert_column(['01-01-9999'], 'date', {'add_years': '1'}) == [MISSING]
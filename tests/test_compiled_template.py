@@ -0,0 +1,97 @@
+import json
+import pickle
+import pytest
+from template_parser.compiled_template import (
+    CompiledTemplate, PlaceholderSpec, UNRESOLVED, compile_template, parse_options
+)
+
+def upper_resolver(spec, text):
+    return spec.name.upper()
+
+def test_parse_options():
+    assert parse_options('|format=%Y-%m-%d|optional') == {'format': '%Y-%m-%d', 'optional': True}
+    assert parse_options('') == {}
+
+def test_compile_records_full_and_mixed_sites():
+    compiled = compile_template(json.dumps({
+        "a": "<number:int>",
+        "b": ["plain", "Hello <name>!"],
+        "c": 5
+    }))
+    sites = {site.path: site for site in compiled.sites}
+    assert set(sites) == {('a',), ('b', 1)}
+    assert sites[('a',)].full is True
+    assert sites[('b', 1)].full is False
+    assert sites[('b', 1)].segments[0] == 'Hello '
+    assert sites[('b', 1)].segments[2] == '!'
+
+def test_compile_pre_parses_type_and_options():
+    compiled = compile_template('{"d": "<when:date|format=%d/%m/%y|add_days=7>"}')
+    spec = compiled.sites[0].specs[0]
+    assert spec.name == 'when'
+    assert spec.type == 'date'
+    assert dict(spec.options) == {'format': '%d/%m/%y', 'add_days': '7'}
+    assert spec.options_key == (('add_days', '7'), ('format', '%d/%m/%y'))
+    assert compiled.placeholders['when']['type'] == 'date'
+
+def test_render_copies_static_subtrees():
+    compiled = compile_template('{"static": {"x": [1, 2]}, "dynamic": {"v": "<name>"}}')
+    first = compiled.render(upper_resolver)
+    assert first == {"static": {"x": [1, 2]}, "dynamic": {"v": "NAME"}}
+    first['static']['x'].append(99)
+    first['dynamic']['extra'] = True
+    second = compiled.render(upper_resolver)
+    assert second == {"static": {"x": [1, 2]}, "dynamic": {"v": "NAME"}}
+    assert compiled.data == {"static": {"x": [1, 2]}, "dynamic": {"v": "<name>"}}
+
+def test_render_can_share_static_subtrees():
+    compiled = compile_template('{"static": {"x": [1, 2]}, "dynamic": {"v": "<name>"}}')
+    first = compiled.render(upper_resolver, copy_static=False)
+    second = compiled.render(upper_resolver, copy_static=False)
+    assert first['static'] is compiled.data['static']
+    assert first['dynamic'] is not second['dynamic']
+    assert compiled.data['dynamic']['v'] == '<name>'
+
+def test_render_unresolved_keeps_placeholder_text():
+    compiled = compile_template('{"a": " <age:int> ", "b": "Hi <name>"}')
+    result = compiled.render(lambda spec, text: UNRESOLVED)
+    assert result == {"a": " <age:int> ", "b": "Hi <name>"}
+
+def test_render_root_string_and_no_placeholders():
+    assert compile_template('"<name>"').render(upper_resolver) == 'NAME'
+    compiled = compile_template('{"a": 1}')
+    assert compiled.sites == ()
+    rendered = compiled.render(upper_resolver)
+    assert rendered == compiled.data and rendered is not compiled.data
+
+def test_compiled_objects_are_immutable():
+    compiled = compile_template('{"a": "<name>"}')
+    spec = compiled.sites[0].specs[0]
+    with pytest.raises(AttributeError):
+        compiled.sites = ()
+    with pytest.raises(AttributeError):
+        spec.name = 'other'
+    with pytest.raises(TypeError):
+        spec.options['x'] = 1
+    assert isinstance(compiled, CompiledTemplate)
+    assert isinstance(spec, PlaceholderSpec)
+
+def test_repeated_placeholders_share_one_spec():
+    compiled = compile_template('{"a": "<n:int>", "b": ["<n:int>", "x <n:int> y"], "c": "<n:float>"}')
+    specs = [spec for site in compiled.sites for spec in site.specs]
+    assert specs[0] is specs[1] is specs[2]
+    assert specs[3] is not specs[0]
+
+@pytest.mark.parametrize('template', [
+    '{"a": {"b": ["<name>", 1, {"c": "x <n:int> y"}]}, "d": "plain", "e": " <name> "}',
+    '"<name>"',
+    '{"a": 1}',
+])
+def test_pickle_round_trip(template):
+    compiled = compile_template(template)
+    restored = pickle.loads(pickle.dumps(compiled))
+    assert restored.data == compiled.data
+    assert [(site.path, site.text, site.full) for site in restored.sites] == \
+        [(site.path, site.text, site.full) for site in compiled.sites]
+    assert dict(restored.placeholders) == dict(compiled.placeholders)
+    assert restored.render(upper_resolver) == compiled.render(upper_resolver)
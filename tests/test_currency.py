@@ -0,0 +1,21 @@
+import pytest
+from babel.numbers import format_currency
+from template_parser.helpers.currency import get_currency_formatter
+
+@pytest.mark.parametrize('locale,currency_code', [('en_GB', 'GBP'), ('de_DE', 'EUR'), ('ja_JP', 'JPY'), ('en_US', 'XYZ')])
+def test_standard_formatter_matches_format_currency(locale, currency_code):
+    formatter = get_currency_formatter(locale, currency_code)
+    for number in (0, 2.5, 1234567.891):
+        assert formatter.format(number) == format_currency(number, currency_code, locale=locale, currency_digits=True)
+
+def test_short_formatter_uses_short_pattern():
+    assert get_currency_formatter('en_GB', 'USD', 'short').format(1500000) == "US$1,500,000.00"
+
+def test_formatter_without_symbol():
+    assert get_currency_formatter('en_GB', 'USD', 'standard', include_symbol=False).format(2500) == "2,500.00"
+
+def test_formatters_are_reused():
+    first = get_currency_formatter('en_GB', 'EUR', 'standard', True)
+    assert get_currency_formatter('en_GB', 'EUR', 'standard', True) is first
+    assert get_currency_formatter('en_GB', 'EUR', 'short', False) is get_currency_formatter('en_GB', 'EUR', 'short', True)
+    assert get_currency_formatter('en_GB', 'EUR', 'standard', False) is not first
@@ -0,0 +1,43 @@
+import pytest
+from datetime import datetime
+from dateutil.relativedelta import relativedelta
+from template_parser.helpers.date_utils import (
+    apply_date_operations, compile_date_format, convert_date, get_date_delta, parse_input_date
+)
+
+@pytest.mark.parametrize('value', [
+    '25-12-2023', '1-1-2024', '01-01-2024 10:30', '25-12-2023  7:5', ' 5-5-2024 ',
+    '29-02-2024', '29-02-2023', '31-04-2024', '25-12-2023 24:00', '25-12-23', '25/12/2023', 'x',
+])
+def test_parse_input_date_matches_strptime(value):
+    expected = None
+    for fmt in ('%d-%m-%Y %H:%M', '%d-%m-%Y'):
+        try:
+            expected = datetime.strptime(value.strip(), fmt)
+            break
+        except ValueError:
+            continue
+    assert parse_input_date(value) == expected
+
+def test_get_date_delta_is_cached_per_options():
+    options = (('add_years', '1'), ('format', '%Y'), ('subtract_months', '2'))
+    delta = get_date_delta(options)
+    assert delta == relativedelta(years=1, months=-2)
+    assert get_date_delta(options) is delta
+    assert get_date_delta((('format', '%Y'),)) is None
+
+def test_get_date_delta_invalid_amount():
+    with pytest.raises(ValueError, match="Invalid value for add_days: soon. Must be an integer."):
+        get_date_delta((('add_days', 'soon'),))
+
+def test_apply_date_operations():
+    result = apply_date_operations(datetime(2024, 1, 31), {'add_months': '1', 'subtract_days': '2'})
+    assert result == datetime(2024, 2, 27)
+
+@pytest.mark.parametrize('output_format', ['%Y-%m %d', '%d/%m/%y', '%d %B %Y', '%Y-%m-%dT%H:%M:%S', '{%Y}', '100%%', '%'])
+def test_compile_date_format_matches_strftime(output_format):
+    for date_obj in (datetime(2023, 12, 25, 7, 5, 9), datetime(999, 1, 2)):
+        assert compile_date_format(output_format)(date_obj) == date_obj.strftime(output_format)
+
+def test_convert_date_defaults_to_iso_format():
+    assert convert_date(datetime(2024, 1, 1, 10, 30), {'add_days': '7'}) == '2024-01-08T10:30:00'
@@ -1,7 +1,9 @@
 import pytest
 import os
+import json
 from unittest.mock import patch, MagicMock
 from template_parser.file_manager import FileManager
+from template_parser.helpers.digest import content_digest
 
 @pytest.fixture
 def file_manager():
@@ -103,3 +105,132 @@ def test_ensure_directory_no_permission(file_manager, tmp_path):
             file_manager.ensure_directory(str(dir_path))
         assert "Permission denied" in str(exc_info.value)
 
+
+def test_write_json_matches_json_dumps(file_manager, tmp_path):
+    file_path = tmp_path / "out.json"
+    data = {"a": [1, 2.5, None, True], "b": {"c": "ünïcode"}, "d": ["x" * 70000]}
+    file_manager.write_json(str(file_path), data, indent=2)
+    assert file_path.read_text(encoding='utf-8') == json.dumps(data, indent=2)
+
+def test_write_json_returns_digest_and_size(file_manager, tmp_path):
+    file_path = tmp_path / "out.json"
+    data = {"b": {"c": "ünïcode"}, "d": ["x" * 70000, "y" * 70000]}
+    digest, size = file_manager.write_json(str(file_path), data, indent=2)
+    content = file_path.read_bytes()
+    assert (digest, size) == (content_digest(content), len(content))
+
+def test_write_json_no_permission(file_manager, tmp_path):
+    file_path = tmp_path / "out.json"
+    with patch("builtins.open", side_effect=PermissionError("Permission denied")):
+        with pytest.raises(IOError) as exc_info:
+            file_manager.write_json(str(file_path), {})
+        assert f"Error writing to file {file_path}" in str(exc_info.value)
+
+def test_write_json_failure_keeps_previous_file(file_manager, tmp_path):
+    file_path = tmp_path / "out.json"
+    file_path.write_text('{"old": true}', encoding='utf-8')
+    with pytest.raises(IOError):
+        file_manager.write_json(str(file_path), {"bad": object()})
+    assert file_path.read_text(encoding='utf-8') == '{"old": true}'
+    assert os.listdir(tmp_path) == ["out.json"]
+
+def test_open_file_write_is_atomic(file_manager, tmp_path):
+    file_path = tmp_path / "out.json"
+    with file_manager.open_file(str(file_path), 'w') as f:
+        f.write("partial")
+        assert not file_path.exists()
+    assert file_path.read_text(encoding='utf-8') == "partial"
+
+    with pytest.raises(RuntimeError):
+        with file_manager.open_file(str(file_path), 'w') as f:
+            f.write("replacement")
+            raise RuntimeError("interrupted")
+    assert file_path.read_text(encoding='utf-8') == "partial"
+    assert os.listdir(tmp_path) == ["out.json"]
+
+def test_unknown_durability_policy():
+    with pytest.raises(ValueError):
+        FileManager(durability='sometimes')
+
+def test_per_file_durability_syncs_file_and_directory(tmp_path):
+    file_manager = FileManager(durability='per-file')
+    with patch("template_parser.file_manager.os.fsync") as fsync, \
+            patch("template_parser.file_manager._sync_directory") as sync_directory:
+        file_manager.write_file(str(tmp_path / "a.json"), "{}")
+        file_manager.write_json(str(tmp_path / "b.json"), {})
+    assert fsync.call_count == 2
+    assert sync_directory.call_count == 2
+
+def test_batched_durability_syncs_directory_once_per_batch(tmp_path):
+    file_manager = FileManager(durability='batched', batch_size=3)
+    with patch("template_parser.file_manager.os.fsync") as fsync, \
+            patch("template_parser.file_manager._sync_directory") as sync_directory:
+        for n in range(5):
+            file_manager.write_json(str(tmp_path / f"{n}.json"), {"n": n})
+        assert fsync.call_count == 5
+        sync_directory.assert_called_once_with(str(tmp_path))
+        file_manager.flush()
+        assert sync_directory.call_count == 2
+        file_manager.flush()
+        assert sync_directory.call_count == 2
+
+@pytest.mark.parametrize("durability, fsyncs", [
+    ('none', 0),
+    ('per-file', 12),
+    ('batched', 8),
+])
+def test_fsync_calls_per_durability_policy(tmp_path, durability, fsyncs):
+    # Six files in one directory, batches of three; counts include directory syncs.
+    file_manager = FileManager(durability=durability, batch_size=3)
+    with patch("template_parser.file_manager.os.fsync") as fsync:
+        for n in range(6):
+            file_manager.write_json(str(tmp_path / f"{n}.json"), {"n": n})
+        file_manager.flush()
+    assert fsync.call_count == fsyncs
+
+def test_batched_durability_syncs_contents_before_replacing(tmp_path):
+    file_manager = FileManager(durability='batched')
+    file_path = tmp_path / "out.json"
+    file_path.write_text('{"old": true}')
+    def fsync(fd):
+        # The destination still holds the previous file while the new one is synced.
+        assert json.loads(file_path.read_text()) == {"old": True}
+    with patch("template_parser.file_manager.os.fsync", side_effect=fsync) as fsync_mock:
+        file_manager.write_json(str(file_path), {"new": True})
+    fsync_mock.assert_called_once()
+    assert json.loads(file_path.read_text()) == {"new": True}
+
+def test_batched_durability_syncs_pending_directories_before_history(tmp_path):
+    file_manager = FileManager(durability='batched')
+    with patch("template_parser.file_manager.os.fsync") as fsync, \
+            patch("template_parser.file_manager._sync_directory") as sync_directory:
+        file_manager.write_json(str(tmp_path / "out.json"), {})
+        with open(tmp_path / "history.jsonl", 'ab') as history:
+            file_manager.sync_file(history)
+    sync_directory.assert_called_once_with(str(tmp_path))
+    assert fsync.call_count == 2
+
+def test_no_durability_never_syncs(file_manager, tmp_path):
+    with patch("template_parser.file_manager.os.fsync") as fsync:
+        file_manager.write_file(str(tmp_path / "a.json"), "{}")
+        file_manager.flush()
+    fsync.assert_not_called()
+
+def test_ensure_directory_is_cached(file_manager, tmp_path):
+    dir_path = str(tmp_path / "out")
+    with patch("os.makedirs") as makedirs:
+        file_manager.ensure_directory(dir_path)
+        file_manager.ensure_directory(dir_path)
+    makedirs.assert_called_once_with(dir_path, exist_ok=True)
+
+def test_removed_directory_is_recreated_once(file_manager, tmp_path):
+    dir_path = tmp_path / "out"
+    file_manager.ensure_directory(str(dir_path))
+    dir_path.rmdir()
+    file_manager.write_json(str(dir_path / "a.json"), {"a": 1})
+    assert json.loads((dir_path / "a.json").read_text()) == {"a": 1}
+
+def test_unensured_directory_is_not_created(file_manager, tmp_path):
+    with pytest.raises(IOError):
+        file_manager.write_json(str(tmp_path / "missing" / "a.json"), {})
+    assert not (tmp_path / "missing").exists()
@@ -0,0 +1,206 @@
+import os
+import json
+import time
+import multiprocessing
+import threading
+import pytest
+from unittest.mock import MagicMock
+from template_parser.config_manager import JsonLinesConfigManager
+from template_parser.file_manager import FileManager
+from template_parser.user_interface import UserInterface
+
+@pytest.fixture
+def mock_user_interface():
+    return MagicMock(spec=UserInterface)
+
+@pytest.fixture
+def history(tmp_path, mock_user_interface):
+    return JsonLinesConfigManager(str(tmp_path / "config.jsonl"), FileManager(), mock_user_interface,
+                                  legacy_path=str(tmp_path / "config.json"))
+
+def entry(n):
+    return {"output_filename": f"out{n}.json", "details": {"n": str(n)}}
+
+class TestJsonLinesConfigManager:
+    def test_save_appends_one_line_per_entry(self, history, tmp_path):
+        for n in range(3):
+            history.save_config(entry(n))
+
+        lines = (tmp_path / "config.jsonl").read_text().splitlines()
+        assert [json.loads(line) for line in lines] == [entry(0), entry(1), entry(2)]
+        assert len(history) == 3
+        assert (tmp_path / "config.jsonl.idx").stat().st_size == 3 * JsonLinesConfigManager.INDEX_RECORD.size
+
+    def test_get_entry_by_position(self, history):
+        for n in range(5):
+            history.save_config(entry(n))
+
+        assert history.get_entry(0) == entry(0)
+        assert history.get_entry(3) == entry(3)
+        assert history.get_entry(-1) == entry(4)
+        with pytest.raises(IndexError):
+            history.get_entry(5)
+
+    def test_config_data_reads_lazily(self, history):
+        assert history.config_data == []
+        history.save_config(entry(1))
+        assert history.config_data == [entry(1)]
+
+    def test_migrates_legacy_list(self, history, tmp_path, mock_user_interface):
+        (tmp_path / "config.json").write_text(json.dumps([entry(0), entry(1)]))
+
+        history.load_config()
+        history.save_config(entry(2))
+
+        assert history.config_data == [entry(0), entry(1), entry(2)]
+        assert not (tmp_path / "config.json").exists()
+        assert (tmp_path / "config.json.migrated").exists()
+        mock_user_interface.display_message.assert_any_call(
+            f"Migrated 2 entries from {tmp_path / 'config.json'} to {tmp_path / 'config.jsonl'}"
+        )
+
+    def test_invalid_legacy_file_is_left_alone(self, history, tmp_path, mock_user_interface):
+        (tmp_path / "config.json").write_text("{not json")
+
+        history.load_config()
+
+        assert (tmp_path / "config.json").exists()
+        assert len(history) == 0
+        mock_user_interface.display_warning.assert_called_with(
+            f"{tmp_path / 'config.json'} contains invalid JSON. Skipping migration."
+        )
+
+    def test_repairs_index_after_interrupted_write(self, history, tmp_path, mock_user_interface):
+        for n in range(2):
+            history.save_config(entry(n))
+        with open(tmp_path / "config.jsonl", "a") as f:
+            f.write(json.dumps(entry(2)) + "\n")
+            f.write('{"output_filename": "torn')
+
+        reopened = JsonLinesConfigManager(str(tmp_path / "config.jsonl"), FileManager(), mock_user_interface)
+        assert len(reopened) == 3
+        assert reopened.get_entry(2) == entry(2)
+        reopened.save_config(entry(3))
+        assert reopened.config_data == [entry(0), entry(1), entry(2), entry(3)]
+
+    def test_long_lived_writer_repairs_before_each_append(self, history, tmp_path):
+        history.save_config(entry(0))
+        # Another process appends a complete line, crashes before indexing it,
+        # and a third crashes halfway through its line.
+        with open(tmp_path / "config.jsonl", "a") as f:
+            f.write(json.dumps(entry(1)) + "\n")
+            f.write('{"output_filename": "torn')
+
+        history.save_config(entry(2))
+        assert history.config_data == [entry(0), entry(1), entry(2)]
+        assert len(history) == 3
+        assert [history.get_entry(i) for i in range(3)] == [entry(0), entry(1), entry(2)]
+
+def append_entries(history_path, start, count):
+    history = JsonLinesConfigManager(history_path, FileManager(), MagicMock(spec=UserInterface))
+    for n in range(start, start + count):
+        history.save_config(entry(n))
+
+class TestConcurrentAppends:
+    def test_threads_share_commits(self, history):
+        barrier = threading.Barrier(16)
+
+        def writer(start):
+            barrier.wait()
+            for n in range(start, start + 25):
+                history.save_config(entry(n))
+
+        threads = [threading.Thread(target=writer, args=(i * 25,)) for i in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        saved = history.config_data
+        assert sorted(int(e["details"]["n"]) for e in saved) == list(range(400))
+        assert len(history) == 400
+        assert [history.get_entry(i) for i in range(400)] == saved
+        assert history.commits <= 400
+
+    def test_processes_do_not_lose_entries(self, tmp_path):
+        history_path = str(tmp_path / "config.jsonl")
+        context = multiprocessing.get_context("spawn")
+        processes = [context.Process(target=append_entries, args=(history_path, i * 50, 50)) for i in range(4)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        history = JsonLinesConfigManager(history_path, FileManager(), MagicMock(spec=UserInterface))
+        saved = history.config_data
+        assert sorted(int(e["details"]["n"]) for e in saved) == list(range(200))
+        assert [history.get_entry(i) for i in range(200)] == saved
+
+    def test_group_commit_writes_pending_entries_together(self, history, mock_user_interface):
+        history.load_config()
+        with history.group_commit(max_pending=4):
+            for n in range(10):
+                history.save_config(entry(n))
+            assert len(history) == 8
+
+        assert history.config_data == [entry(n) for n in range(10)]
+        assert history.commits == 3
+        mock_user_interface.display_message.assert_called_with(f"2 entries appended to {history.history_path}")
+
+    @pytest.mark.skipif(os.name != 'posix', reason="needs fcntl")
+    def test_blocked_writer_spools_for_the_lock_holder(self, history, tmp_path, mock_user_interface):
+        import fcntl
+        history.load_config()
+        other = JsonLinesConfigManager(history.history_path, FileManager(), mock_user_interface)
+        with open(history.history_path, 'ab') as locked:
+            # Stands in for another process holding the history lock.
+            fcntl.flock(locked.fileno(), fcntl.LOCK_EX)
+            writer = threading.Thread(target=history.save_config, args=(entry(0),))
+            writer.start()
+            spool = tmp_path / "config.jsonl.spool"
+            deadline = time.monotonic() + 5
+            while not (spool.is_dir() and os.listdir(spool)) and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert len(os.listdir(spool)) == 1
+        # Whichever of the two gets the lock first appends the spooled entry first.
+        other.save_config(entry(1))
+        writer.join(5)
+
+        assert history.config_data == [entry(0), entry(1)]
+        assert [history.get_entry(i) for i in range(2)] == [entry(0), entry(1)]
+        assert os.listdir(spool) == []
+        assert 1 <= history.commits + other.commits <= 2
+
+    def test_lock_holder_appends_spooled_entries_with_its_own(self, history, tmp_path):
+        history.save_config(entry(0))
+        spool = tmp_path / "config.jsonl.spool"
+        spool.mkdir()
+        (spool / "00000000000000000001-1-abcd.jsonl").write_text(json.dumps(entry(1)) + "\n" + json.dumps(entry(2)) + "\n")
+        (spool / ".00000000000000000002-2-abcd.jsonl").write_text('{"partial')
+
+        history.save_config(entry(3))
+        assert history.config_data == [entry(0), entry(1), entry(2), entry(3)]
+        assert len(history) == 4
+        assert history.commits == 2
+        assert os.listdir(spool) == [".00000000000000000002-2-abcd.jsonl"]
+
+def test_rebuilds_index_that_runs_ahead_of_history(history, tmp_path, mock_user_interface):
+    for n in range(3):
+        history.save_config(entry(n))
+    lines = (tmp_path / "config.jsonl").read_text().splitlines(keepends=True)
+    (tmp_path / "config.jsonl").write_text(lines[0])
+
+    reopened = JsonLinesConfigManager(str(tmp_path / "config.jsonl"), FileManager(), mock_user_interface)
+    assert len(reopened) == 1
+    reopened.save_config(entry(4))
+    assert [reopened.get_entry(i) for i in range(2)] == [entry(0), entry(4)]
+
+def test_rebuilds_missing_index_in_batches(history, tmp_path, mock_user_interface, monkeypatch):
+    monkeypatch.setattr(JsonLinesConfigManager, 'INDEX_WRITE_BATCH', 3)
+    with open(tmp_path / "config.jsonl", "w") as f:
+        f.writelines(json.dumps(entry(n)) + "\n" for n in range(10))
+        f.write('{"output_filename": "torn')
+
+    reopened = JsonLinesConfigManager(str(tmp_path / "config.jsonl"), FileManager(), mock_user_interface)
+    assert len(reopened) == 10
+    assert [reopened.get_entry(i) for i in (0, 2, 3, 9)] == [entry(0), entry(2), entry(3), entry(9)]
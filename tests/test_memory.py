@@ -0,0 +1,29 @@
+import pytest
+from benchmarks.bench_memory import BUDGETS, MiB, budget, measure_in_subprocess, prepare
+
+# The smallest sizes of benchmarks/bench_memory.py; the budgets scale with the
+# input, so a regression in how memory grows already shows here.
+SIZES = {
+    'render': 1 * MiB,
+    'render --stream': 1 * MiB,
+    'library render': 1 * MiB,
+    'history append': 10 ** 4,
+    'history index rebuild': 10 ** 4,
+}
+
+@pytest.mark.parametrize('scenario', list(BUDGETS))
+def test_peak_memory_within_budget(scenario, tmp_path):
+    path, input_size = prepare(scenario, SIZES[scenario], str(tmp_path))
+    limit = budget(scenario, input_size)
+
+    traced = measure_in_subprocess(scenario, path, 'tracemalloc')
+    rss = measure_in_subprocess(scenario, path, 'rss')
+
+    assert traced <= limit, f"{scenario}: tracemalloc peak {traced / MiB:.1f} MiB over {limit / MiB:.1f} MiB budget"
+    assert rss <= limit, f"{scenario}: RSS grew {rss / MiB:.1f} MiB, over {limit / MiB:.1f} MiB budget"
+
+def test_streaming_memory_does_not_grow_with_template(tmp_path):
+    small, _ = prepare('render --stream', MiB // 4, str(tmp_path / 'small'))
+    large, _ = prepare('render --stream', 1 * MiB, str(tmp_path / 'large'))
+    assert measure_in_subprocess('render --stream', large, 'tracemalloc') < \
+        2 * measure_in_subprocess('render --stream', small, 'tracemalloc') + MiB
@@ -0,0 +1,96 @@
+import gc
+import os
+import json
+import pytest
+from unittest.mock import MagicMock
+from template_parser.batch import BatchRunner
+from template_parser.compiled_template import compile_template
+from template_parser.file_manager import FileManager
+from template_parser.render_cache import RENDER_CACHE_NAME, RenderCache, content_digest
+
+@pytest.fixture
+def template_path(tmp_path):
+    path = tmp_path / 'template.json'
+    path.write_text(json.dumps({"name": "<name>", "age": "<age:int>"}))
+    return str(path)
+
+ROWS = [{'name': 'ann', 'age': '1'}, {'name': 'bob', 'age': '2'}, {'name': 'cy', 'age': '3'}]
+
+def run_batch(build_application, template_path, rows=ROWS, force=False):
+    app = build_application(render_cache=True, force=force)
+    result = BatchRunner(app).run(template_path, iter(rows))
+    return app, result
+
+def test_keys_depend_on_template_inputs_and_config():
+    cache = RenderCache('cache.json', MagicMock(spec=FileManager))
+    compiled = compile_template('{"a": "<a>"}')
+    base = cache.template_key(compiled, 'en_GB', '{a}.json')
+    assert base == cache.template_key(compiled, 'en_GB', '{a}.json')
+    assert base != cache.template_key(compiled, 'pl_PL', '{a}.json')
+    assert base != cache.template_key(compiled, 'en_GB', '{a}_{date}.json')
+    assert base != cache.template_key(compile_template('{"a": "<a> "}'), 'en_GB', '{a}.json')
+    assert cache.render_key(base, {'a': '1', 'b': '2'}) == cache.render_key(base, {'b': '2', 'a': '1'})
+    assert cache.render_key(base, {'a': '1'}) != cache.render_key(base, {'a': '2'})
+
+def test_template_keys_are_released_with_their_template():
+    cache = RenderCache('cache.json', MagicMock(spec=FileManager))
+    for n in range(3):
+        cache.template_key(compile_template(json.dumps({"a": f"<a> {n}"})), 'en_GB', '{a}.json')
+    gc.collect()
+    assert len(cache._template_keys) == 0
+
+def test_second_run_skips_unchanged_outputs(build_application, tmp_path, template_path):
+    _, first = run_batch(build_application, template_path)
+    assert (first.rendered, first.unchanged) == (3, 0)
+    assert json.loads((tmp_path / 'output' / 'bob.json').read_text()) == {"name": "bob", "age": 2}
+
+    app, second = run_batch(build_application, template_path)
+    assert (second.rendered, second.unchanged) == (3, 3)
+    assert app.render_cache.stats() == {'hits': 3, 'misses': 0}
+    assert app.config_manager.save_config.call_count == 3
+
+def test_changed_row_or_edited_output_is_rerendered(build_application, tmp_path, template_path):
+    run_batch(build_application, template_path)
+    (tmp_path / 'output' / 'cy.json').write_text('{"tampered": true}')
+    rows = [ROWS[0], {'name': 'bob', 'age': '20'}, ROWS[2]]
+
+    app, result = run_batch(build_application, template_path, rows)
+
+    assert result.unchanged == 1
+    assert app.render_cache.stats() == {'hits': 1, 'misses': 2}
+    assert json.loads((tmp_path / 'output' / 'bob.json').read_text())['age'] == 20
+    assert json.loads((tmp_path / 'output' / 'cy.json').read_text()) == {"name": "cy", "age": 3}
+
+def test_config_change_invalidates(build_application, program_config_manager, template_path):
+    run_batch(build_application, template_path)
+    program_config_manager.get_locale.return_value = 'pl_PL'
+    _, result = run_batch(build_application, template_path)
+    assert result.unchanged == 0
+
+def test_force_rerenders_everything(build_application, template_path):
+    run_batch(build_application, template_path)
+    app, result = run_batch(build_application, template_path, force=True)
+    assert result.unchanged == 0
+    assert app.render_cache.stats() == {'hits': 0, 'misses': 3}
+    _, result = run_batch(build_application, template_path)
+    assert result.unchanged == 3
+
+def test_verified_output_is_trusted_by_stat(build_application, tmp_path, template_path):
+    run_batch(build_application, template_path)
+    output = tmp_path / 'output' / 'ann.json'
+    old = output.stat().st_mtime_ns - 10 ** 10
+    os.utime(output, ns=(old, old))
+    run_batch(build_application, template_path)
+
+    cache = RenderCache(str(tmp_path / 'output' / RENDER_CACHE_NAME), FileManager())
+    assert cache.entries['ann.json'][3] == old
+    assert cache.entries['ann.json'][1] == content_digest(output.read_bytes())
+
+def test_run_skips_unchanged_output(build_application, tmp_path, template_path):
+    for expected in ("Modified JSON saved to", "Output unchanged, skipped writing"):
+        app = build_application(render_cache=True)
+        app.user_interface.get_input = MagicMock(side_effect=['ann', '4'])
+        app.run(template_path)
+        message = app.user_interface.display_message.call_args_list[-1].args[0]
+        assert message.startswith(expected)
+    assert json.loads((tmp_path / 'output' / 'ann.json').read_text()) == {"name": "ann", "age": 4}
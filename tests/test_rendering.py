@@ -0,0 +1,128 @@
+import copy
+import json
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+import template_parser
+from template_parser.errors import (
+    ConfigError, InvalidInputError, MissingInputError, OutputFilenameError, TemplateParserError, TemplateSyntaxError
+)
+from template_parser.rendering import RenderConfig, dumps_json, output_filename, parse_template, render
+
+TEMPLATE = json.dumps({
+    "name": "<name>",
+    "age": "<age:int>",
+    "greeting": "Hello <name>, you are <age:int> today",
+    "born": "<born:date|format=%d/%m/%Y|subtract_years=1>",
+    "price": "<price:currency|currency_code=EUR>",
+    "site": "<site:url>",
+    "static": {"list": [1, 2, {"deep": "value"}]}
+})
+
+INPUTS = {'name': 'Ann', 'age': '30', 'born': '05-06-2024', 'price': '1000', 'site': 'https://example.com'}
+
+@pytest.fixture(scope='module')
+def compiled():
+    return parse_template(TEMPLATE)
+
+def test_render_returns_document(compiled):
+    assert render(compiled, INPUTS) == {
+        "name": "Ann",
+        "age": 30,
+        "greeting": "Hello Ann, you are 30 today",
+        "born": "05/06/2023",
+        "price": "€1,000.00",
+        "site": "https://example.com",
+        "static": {"list": [1, 2, {"deep": "value"}]}
+    }
+
+def test_render_result_can_be_modified(compiled):
+    first = render(compiled, INPUTS)
+    first['static']['list'][2]['deep'] = 'changed'
+    first['static']['list'].append(99)
+    assert render(compiled, INPUTS)['static'] == {"list": [1, 2, {"deep": "value"}]}
+
+def test_render_uses_config_locale(compiled):
+    assert render(compiled, INPUTS, RenderConfig(locale='de_DE'))['price'] == "1.000,00 €"
+
+def test_render_as_bytes_matches_cli_output(compiled):
+    rendered = render(compiled, INPUTS)
+    assert render(compiled, INPUTS, as_bytes=True) == json.dumps(rendered, indent=2).encode('utf-8')
+    assert render(compiled, INPUTS, RenderConfig(indent=None), as_bytes=True) == json.dumps(rendered).encode('utf-8')
+
+def test_non_string_inputs_are_accepted(compiled):
+    assert render(compiled, {**INPUTS, 'age': 31, 'price': 2.5})['age'] == 31
+
+def test_missing_input_raises(compiled):
+    inputs = dict(INPUTS)
+    del inputs['age']
+    with pytest.raises(MissingInputError) as excinfo:
+        render(compiled, inputs)
+    assert excinfo.value.name == 'age'
+
+@pytest.mark.parametrize('name, value', [('age', 'thirty'), ('born', '2024-06-05'), ('price', 'lots'),
+                                         ('site', 'example'), ('name', '')])
+def test_invalid_input_raises(compiled, name, value):
+    with pytest.raises(InvalidInputError) as excinfo:
+        render(compiled, {**INPUTS, name: value})
+    assert excinfo.value.name == name
+    assert excinfo.value.value == value
+    assert isinstance(excinfo.value, ValueError)
+    assert isinstance(excinfo.value, TemplateParserError)
+
+def test_invalid_template_raises():
+    with pytest.raises(TemplateSyntaxError) as excinfo:
+        parse_template('{\n  "name": \n}')
+    assert excinfo.value.line == 3
+
+def test_config_is_immutable():
+    config = RenderConfig(required_variables=[{'name': 'id', 'type': 'int'}])
+    assert config.required_variables == (('id', 'int'),)
+    with pytest.raises(AttributeError):
+        config.locale = 'de_DE'
+
+def test_config_from_file(tmp_path):
+    path = tmp_path / 'program_config.json'
+    path.write_text(json.dumps({'locale': 'de_DE', 'output_filename_format': '{name}.json',
+                                'required_variables': [{'name': 'name'}]}))
+    config = RenderConfig.from_file(str(path))
+    assert (config.locale, config.output_filename_format, config.required_variables) == ('de_DE', '{name}.json', (('name', 'str'),))
+
+    path.write_text('{"locale": ')
+    with pytest.raises(ConfigError):
+        RenderConfig.from_file(str(path))
+    with pytest.raises(ConfigError):
+        RenderConfig.from_file(str(tmp_path / 'missing.json'))
+    with pytest.raises(ConfigError):
+        RenderConfig.from_mapping({'required_variables': [{'type': 'int'}]})
+
+def test_output_filename():
+    config = RenderConfig(output_filename_format='{name}_{date}.json', required_variables=[('name', 'str')])
+    assert output_filename({'name': 'ann'}, config, {'date': '20240101'}) == 'ann_20240101.json'
+    with pytest.raises(MissingInputError):
+        output_filename({}, config, {'date': '20240101'})
+    with pytest.raises(OutputFilenameError):
+        output_filename({'name': 'ann'}, RenderConfig(output_filename_format='{missing}.json'))
+
+def test_package_exports_api():
+    assert template_parser.render is render
+    assert template_parser.MissingInputError is MissingInputError
+    with pytest.raises(AttributeError):
+        template_parser.not_there
+
+def test_concurrent_renders_share_template_and_config(compiled):
+    config = RenderConfig(locale='en_US')
+    original = copy.deepcopy(compiled.data)
+    requests = [{**INPUTS, 'name': f'user{i}', 'age': str(i), 'price': str(i * 10)} for i in range(2000)]
+    expected = [render(compiled, inputs, config) for inputs in requests]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda inputs: render(compiled, inputs, config), requests))
+
+    assert results == expected
+    assert compiled.data == original
+
+@pytest.mark.parametrize('indent', [None, 0, 2, 4])
+def test_dumps_json_matches_json_dumps(indent, monkeypatch):
+    monkeypatch.setattr('template_parser.rendering.ENCODE_BATCH_CHUNKS', 7)
+    data = {"a": [1, 2.5, None, True, {"b": "é \"q\""}], "c": {}, "d": [], "e": [{"f": list(range(20))}]}
+    assert dumps_json(data, indent) == json.dumps(data, indent=indent)
@@ -0,0 +1,209 @@
+import os
+import json
+import socket
+import threading
+import pytest
+from unittest.mock import MagicMock
+from template_parser.client import RenderClient, ServerError
+from template_parser.server import RenderService, UnixHTTPServer, create_server, remove_stale_socket
+
+@pytest.fixture
+def output_filename_format():
+    return '{template}_{name}.json'
+
+@pytest.fixture
+def templates_dir(tmp_path):
+    (tmp_path / 'templates').mkdir()
+    (tmp_path / 'templates' / 'person.json').write_text(json.dumps({"name": "<name>", "age": "<age:int>"}))
+    return tmp_path / 'templates'
+
+@pytest.fixture
+def application(build_application):
+    return build_application(render_cache=True)
+
+@pytest.fixture
+def service(application):
+    service = RenderService(application)
+    service.start()
+    return service
+
+@pytest.fixture
+def client(service, tmp_path):
+    socket_path = str(tmp_path / 'serve.sock')
+    server = create_server(service, socket_path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = RenderClient(socket_path, timeout=5)
+    yield client
+    client.close()
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+def test_render_returns_output(client):
+    response = client.render('person.json', {'name': 'ann', 'age': 7})
+    assert response == {'output': {'name': 'ann', 'age': 7}}
+
+def test_render_accepts_absolute_path_and_name_without_extension(client, tmp_path):
+    other = tmp_path / 'templates' / 'other.json'
+    other.write_text(json.dumps({"greeting": "Hi <name>"}))
+    assert client.render(str(other), {'name': 'bob'})['output'] == {'greeting': 'Hi bob'}
+    assert client.render('person', {'name': 'bob', 'age': '3'})['output'] == {'name': 'bob', 'age': 3}
+
+@pytest.mark.parametrize('template', ['../outside.json', 'OUTSIDE', 'link.json'])
+def test_templates_outside_templates_dir_are_refused(client, tmp_path, template):
+    outside = tmp_path / 'outside.json'
+    outside.write_text(json.dumps({"greeting": "Hi <name>"}))
+    (tmp_path / 'templates' / 'link.json').symlink_to(outside)
+    with pytest.raises(ServerError) as excinfo:
+        client.render(str(outside) if template == 'OUTSIDE' else template, {'name': 'bob'})
+    assert excinfo.value.status == 403
+
+def test_output_filename_outside_output_dir_is_refused(client, tmp_path):
+    with pytest.raises(ServerError) as excinfo:
+        client.render('person.json', {'name': '/../../escaped', 'age': '7'}, write=True)
+    assert excinfo.value.status == 400
+    assert 'outside the output directory' in str(excinfo.value)
+    assert not list(tmp_path.rglob('*escaped*'))
+
+def test_bad_output_filename_format_is_reported(client, application):
+    application.program_config_manager.get_output_filename_format.return_value = '{age:d}.json'
+    with pytest.raises(ServerError) as excinfo:
+        client.render('person.json', {'name': 'ann', 'age': '7'}, write=True)
+    assert excinfo.value.status == 400
+    assert "Unknown format code 'd'" in str(excinfo.value)
+    assert client.health()['status'] == 'ok'
+
+def test_unconvertible_value_is_reported(client, tmp_path):
+    (tmp_path / 'templates' / 'event.json').write_text(json.dumps({"next": "<d:date|add_days=1>"}))
+    with pytest.raises(ServerError) as excinfo:
+        client.render('event.json', {'d': '31-12-9999'})
+    assert excinfo.value.status == 400
+
+def test_render_writes_output_and_history(client, application, tmp_path):
+    response = client.render('person.json', {'name': 'ann', 'age': '7'}, write=True)
+
+    assert response['output_path'] == str(tmp_path / 'output' / 'person_ann.json')
+    assert response['unchanged'] is False
+    assert json.loads((tmp_path / 'output' / 'person_ann.json').read_text()) == {'name': 'ann', 'age': 7}
+    application.config_manager.save_config.assert_called_once_with({
+        'output_filename': 'person_ann.json',
+        'details': {'name': 'ann', 'age': '7'}
+    })
+    assert client.render('person.json', {'name': 'ann', 'age': '7'}, write=True)['unchanged'] is True
+
+def test_invalid_inputs_are_reported(client):
+    with pytest.raises(ServerError) as excinfo:
+        client.render('person.json', {'name': 'ann', 'age': 'seven'})
+    assert excinfo.value.status == 400
+    assert len(excinfo.value.errors) == 1
+    assert "'age'" in excinfo.value.errors[0]
+
+def test_unknown_template_is_not_found(client):
+    with pytest.raises(ServerError) as excinfo:
+        client.render('missing.json', {})
+    assert excinfo.value.status == 404
+
+def test_connection_is_reused_across_requests(client, service):
+    for age in range(5):
+        client.render('person.json', {'name': 'ann', 'age': age})
+    assert client.health()['renders'] == 5
+
+def test_compiled_template_is_reused_until_file_changes(service, application, tmp_path):
+    service.render({'template': 'person.json', 'inputs': {'name': 'a', 'age': 1}})
+    compiled = service.get_template(str(tmp_path / 'templates' / 'person.json')).compiled
+
+    service.render({'template': 'person.json', 'inputs': {'name': 'b', 'age': 2}})
+    assert service.get_template(str(tmp_path / 'templates' / 'person.json')).compiled is compiled
+
+    path = tmp_path / 'templates' / 'person.json'
+    path.write_text(json.dumps({"person": "<name>"}))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_mtime_ns + 10 ** 9, stat.st_mtime_ns + 10 ** 9))
+    assert service.render({'template': 'person.json', 'inputs': {'name': 'c'}}) == {'output': {'person': 'c'}}
+
+def test_render_does_not_wait_for_a_slow_write(service, application):
+    release = threading.Event()
+    write_json = application.file_manager.write_json
+    def slow_write_json(file_path, data, indent=None):
+        release.wait(5)
+        return write_json(file_path, data, indent)
+    application.file_manager.write_json = slow_write_json
+    application.file_manager.flush = MagicMock()
+    writer = threading.Thread(target=service.render, args=({'template': 'person.json', 'inputs': {'name': 'ann', 'age': 1}, 'write': True},))
+    writer.start()
+    try:
+        assert service.render({'template': 'person.json', 'inputs': {'name': 'bob', 'age': 2}}) == {'output': {'name': 'bob', 'age': 2}}
+        assert writer.is_alive()
+    finally:
+        release.set()
+        writer.join(5)
+    assert service.renders == 2
+    application.file_manager.flush.assert_not_called()
+
+def test_invalid_template_is_reported(service, tmp_path):
+    (tmp_path / 'templates' / 'broken.json').write_text('{"name": ')
+    with pytest.raises(Exception) as excinfo:
+        service.render({'template': 'broken.json', 'inputs': {}})
+    assert excinfo.value.status == 422
+
+def test_stale_socket_is_replaced_and_live_one_is_not(tmp_path):
+    socket_path = str(tmp_path / 'stale.sock')
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(socket_path)
+    stale.close()
+    remove_stale_socket(socket_path)
+    assert not os.path.exists(socket_path)
+
+    live = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    live.bind(socket_path)
+    live.listen(1)
+    try:
+        with pytest.raises(OSError, match='already listening'):
+            remove_stale_socket(socket_path)
+    finally:
+        live.close()
+
+def test_socket_is_private(service, tmp_path):
+    socket_path = str(tmp_path / 'serve.sock')
+    server = create_server(service, socket_path)
+    try:
+        assert isinstance(server, UnixHTTPServer)
+        assert os.stat(socket_path).st_mode & 0o777 == 0o600
+    finally:
+        server.server_close()
+
+def test_localhost_http(service):
+    server = create_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        assert server.server_address[0] == '127.0.0.1'
+        with RenderClient(port=server.server_address[1], timeout=5) as client:
+            assert client.render('person.json', {'name': 'ann', 'age': '1'})['output'] == {'name': 'ann', 'age': 1}
+            assert client.health()['status'] == 'ok'
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+def test_non_json_content_type_is_refused(service, tmp_path):
+    import http.client
+    server = create_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        connection = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=5)
+        body = json.dumps({'template': 'person.json', 'inputs': {'name': 'ann', 'age': '1'}, 'write': True})
+        connection.request('POST', '/render', body, {'Content-Type': 'text/plain'})
+        assert connection.getresponse().status == 415
+        connection.close()
+        assert not (tmp_path / 'output' / 'person_ann.json').exists()
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+def test_client_reports_missing_server(tmp_path):
+    with pytest.raises(OSError):
+        RenderClient(str(tmp_path / 'missing.sock')).health()
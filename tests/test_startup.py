@@ -0,0 +1,32 @@
+import sys
+import subprocess
+
+HEAVY_MODULES = ('babel', 'num2words', 'dateutil', 'numpy')
+
+def imported_after(code):
+    completed = subprocess.run(
+        [sys.executable, '-c', code + '\nimport sys; print(" ".join(sorted({m.split(".")[0] for m in sys.modules})))'],
+        capture_output=True, text=True, check=True
+    )
+    return set(completed.stdout.split()) & set(HEAVY_MODULES)
+
+def test_cli_import_skips_heavy_dependencies():
+    assert imported_after('import template_parser.main') == set()
+
+def test_plain_conversions_skip_heavy_dependencies():
+    code = (
+        'from unittest.mock import MagicMock\n'
+        'from template_parser.application import TemplateApplication\n'
+        'import template_parser.batch, template_parser.columnar\n'
+        'app = TemplateApplication(MagicMock(), MagicMock(), MagicMock(), "t", "o", MagicMock(), MagicMock())\n'
+        'assert app.convert_type("5", "int", {}) == 5\n'
+        'assert app.convert_type("01-02-2024", "date", {}) == "2024-02-01T00:00:00"\n'
+    )
+    assert imported_after(code) == set()
+
+def test_date_arithmetic_loads_dateutil_on_first_use():
+    code = (
+        'from template_parser.helpers.date_utils import get_date_delta\n'
+        'get_date_delta((("add_days", "1"),))\n'
+    )
+    assert imported_after(code) == {'dateutil'}
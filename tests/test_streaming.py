@@ -0,0 +1,59 @@
+import io
+import json
+import pytest
+from template_parser.compiled_template import UNRESOLVED, compile_template
+from template_parser.streaming import (
+    StreamingJSONError, iter_json_tokens, scan_placeholders, stream_render
+)
+
+class TrickleReader(io.StringIO):
+    # Hands out a few characters at a time so tokens straddle chunk boundaries.
+    def read(self, size=-1):
+        return super().read(3)
+
+def resolver(spec, text):
+    values = {'n': 12, 'when': '2024-01-01', 'missing': UNRESOLVED}
+    return values[spec.name]
+
+TEMPLATE = json.dumps({
+    "count": "<n:int>",
+    "note": "On <when:date> we had <n:int> items",
+    "keep": "<missing>",
+    "empty": {"list": [], "object": {}},
+    "numbers": [1, -0.5, 1.5e300, 12345678901234567890, 1E-7],
+    "literals": [True, False, None],
+    "text": "é \"quoted\" \\ \n",
+    "k<n>": "key placeholders are not replaced"
+}, ensure_ascii=False)
+
+@pytest.mark.parametrize('indent', [2, None])
+def test_stream_render_matches_tree_render(indent):
+    output = io.StringIO()
+    stream_render(TrickleReader(TEMPLATE), output, resolver, indent=indent)
+    expected = json.dumps(compile_template(TEMPLATE).render(resolver), indent=indent)
+    assert output.getvalue() == expected
+
+def test_iter_json_tokens_across_chunks():
+    tokens = list(iter_json_tokens(TrickleReader('[1.5e+3, "a\\"b", -Infinity]')))
+    assert tokens == [
+        ('punct', '['), ('number', '1.5e+3'), ('punct', ','), ('string', '"a\\"b"'),
+        ('punct', ','), ('literal', '-Infinity'), ('punct', ']')
+    ]
+
+@pytest.mark.parametrize('text', ['{"a": 1,}', '[1 2]', '{"a" 1}', '{"a": 1} x', '[', '"abc', '{1: 2}', '[01]', '[1.]', '"\x01"', ''])
+def test_stream_render_rejects_invalid_json(text):
+    with pytest.raises(ValueError):
+        json.loads(text)
+    with pytest.raises(ValueError):
+        stream_render(TrickleReader(text), io.StringIO(), resolver)
+
+def test_invalid_token_raises_streaming_error():
+    with pytest.raises(StreamingJSONError, match="Invalid JSON token at char 1"):
+        list(iter_json_tokens(io.StringIO('[?]')))
+
+def test_scan_placeholders():
+    placeholders = scan_placeholders(TrickleReader('{"a": ["<y:date|format=%Y>", 1, "Hi <name>"]}'))
+    assert placeholders == {
+        'y': {'type': 'date', 'options': {'format': '%Y'}},
+        'name': {'type': 'str', 'options': {}}
+    }
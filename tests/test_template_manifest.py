@@ -0,0 +1,167 @@
+import os
+import json
+import pytest
+from unittest.mock import MagicMock
+from template_parser.template_manifest import MTIME_GRANULARITY_NS, TemplateManifest, iter_template_files
+from template_parser.template_processor import TemplateProcessor
+
+@pytest.fixture
+def templates_dir(tmp_path):
+    (tmp_path / "nested" / "deeper").mkdir(parents=True)
+    (tmp_path / ".hidden").mkdir()
+    (tmp_path / "a.json").write_text(json.dumps({"name": "<name>", "age": "<age:int|add=1>"}))
+    (tmp_path / "nested" / "b.json").write_text(json.dumps({"when": "<when:date|format=%Y>"}))
+    (tmp_path / "nested" / "deeper" / "c.json").write_text(json.dumps({"x": 1}))
+    (tmp_path / "nested" / "notes.txt").write_text("ignored")
+    (tmp_path / ".hidden" / "d.json").write_text("{}")
+    return tmp_path
+
+def age_files(directory):
+    # Make every template look old enough for its stat to be trusted.
+    for root, _, files in os.walk(directory):
+        for name in files:
+            path = os.path.join(root, name)
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns - 2 * MTIME_GRANULARITY_NS))
+
+def test_iter_template_files_recurses(templates_dir):
+    found = dict(iter_template_files(str(templates_dir), '.json'))
+    assert sorted(found) == ["a.json", os.path.join("nested", "b.json"), os.path.join("nested", "deeper", "c.json")]
+    assert found["a.json"].st_size == (templates_dir / "a.json").stat().st_size
+    assert list(iter_template_files(str(templates_dir), '.json', recursive=False))[0][0] == "a.json"
+
+def test_get_compiles_and_extracts_once(templates_dir):
+    age_files(templates_dir)
+    manifest = TemplateManifest(str(templates_dir), TemplateProcessor())
+    manifest.list_templates()
+    entry = manifest.get(str(templates_dir / "a.json"))
+    assert entry.placeholders == {"name": {"type": "str", "options": {}}, "age": {"type": "int", "options": {"add": "1"}}}
+    assert manifest.misses == 1
+    manifest.save()
+    assert (templates_dir / ".manifest").exists()
+
+    processor = MagicMock(wraps=TemplateProcessor())
+    reloaded = TemplateManifest(str(templates_dir), processor)
+    reloaded.list_templates()
+    entry = reloaded.get(str(templates_dir / "a.json"))
+    assert reloaded.hits == 1
+    processor.compile.assert_not_called()
+    assert entry.compiled.render(lambda spec, text: spec.name.upper()) == {"name": "NAME", "age": "AGE"}
+
+def test_changed_template_is_rebuilt_alone(templates_dir):
+    manifest = TemplateManifest(str(templates_dir), TemplateProcessor())
+    manifest.get(str(templates_dir / "a.json"))
+    manifest.get(str(templates_dir / "nested" / "b.json"))
+    manifest.save()
+
+    (templates_dir / "a.json").write_text(json.dumps({"name": "<other>"}))
+    reloaded = TemplateManifest(str(templates_dir), TemplateProcessor())
+    assert list(reloaded.get(str(templates_dir / "a.json")).placeholders) == ["other"]
+    assert reloaded.get(str(templates_dir / "nested" / "b.json")).placeholders["when"]["type"] == "date"
+    assert (reloaded.misses, reloaded.hits) == (1, 1)
+
+def test_recent_file_with_same_stat_is_rehashed(templates_dir):
+    manifest = TemplateManifest(str(templates_dir), TemplateProcessor())
+    path = templates_dir / "a.json"
+    manifest.get(str(path))
+    stat = path.stat()
+    path.write_text(json.dumps({"name": "<zzzz>", "age": "<age:int|add=1>"}))
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert "zzzz" in manifest.get(str(path)).placeholders
+
+def test_deleted_templates_are_dropped(templates_dir):
+    manifest = TemplateManifest(str(templates_dir), TemplateProcessor())
+    manifest.get(str(templates_dir / "a.json"))
+    (templates_dir / "a.json").unlink()
+    assert "a.json" not in manifest.list_templates()
+    assert "a.json" not in manifest.entries
+
+def test_corrupt_manifest_is_ignored(templates_dir):
+    (templates_dir / ".manifest").write_bytes(b"not a pickle")
+    manifest = TemplateManifest(str(templates_dir), TemplateProcessor())
+    assert manifest.get(str(templates_dir / "a.json")).placeholders["name"]["type"] == "str"
+
+def test_invalid_json_template_raises(templates_dir):
+    (templates_dir / "bad.json").write_text("{")
+    manifest = TemplateManifest(str(templates_dir), TemplateProcessor())
+    with pytest.raises(json.JSONDecodeError):
+        manifest.get(str(templates_dir / "bad.json"))
+
+def test_contains(templates_dir, tmp_path_factory):
+    manifest = TemplateManifest(str(templates_dir), TemplateProcessor())
+    assert manifest.contains(str(templates_dir / "nested" / "b.json"))
+    assert not manifest.contains(str(tmp_path_factory.mktemp("elsewhere") / "x.json"))
+
+def test_manifest_is_json_metadata_without_source(templates_dir):
+    manifest = TemplateManifest(str(templates_dir), TemplateProcessor())
+    manifest.get(str(templates_dir / "nested" / "b.json"))
+    manifest.save()
+    (entry_file,) = (templates_dir / ".manifest").iterdir()
+    stored = json.loads(entry_file.read_text())
+    assert stored["path"] == os.path.join("nested", "b.json")
+    assert stored["entry"][4:] == [{"when": {"type": "date", "options": {"format": "%Y"}}}, [["when"]]]
+    assert "<when" not in json.dumps(stored["entry"][:4])
+
+def test_templates_compile_lazily_from_recorded_sites(templates_dir, monkeypatch):
+    age_files(templates_dir)
+    manifest = TemplateManifest(str(templates_dir), TemplateProcessor())
+    manifest.get(str(templates_dir / "a.json"))
+    manifest.save()
+
+    reloaded = TemplateManifest(str(templates_dir), TemplateProcessor())
+    entry = reloaded.get(str(templates_dir / "a.json"))
+    assert entry._compiled is None
+    monkeypatch.setattr('template_parser.template_manifest.compile_template', MagicMock(side_effect=AssertionError))
+    assert [site.path for site in entry.compiled.sites] == [("name",), ("age",)]
+    assert entry.compiled.render(lambda spec, text: spec.name.upper()) == {"name": "NAME", "age": "AGE"}
+
+def test_only_used_entries_are_read(templates_dir, monkeypatch):
+    manifest = TemplateManifest(str(templates_dir), TemplateProcessor())
+    manifest.list_templates()
+    for name in ("a.json", os.path.join("nested", "b.json")):
+        manifest.get(str(templates_dir / name))
+    manifest.save()
+    assert len(list((templates_dir / ".manifest").iterdir())) == 2
+
+    reloaded = TemplateManifest(str(templates_dir), TemplateProcessor())
+    reloaded.get(str(templates_dir / "a.json"))
+    assert list(reloaded.entries) == ["a.json"]
+
+def test_deleted_templates_are_removed_from_disk(templates_dir):
+    manifest = TemplateManifest(str(templates_dir), TemplateProcessor())
+    manifest.get(str(templates_dir / "a.json"))
+    manifest.get(str(templates_dir / "nested" / "b.json"))
+    manifest.save()
+    (templates_dir / "a.json").unlink()
+
+    reloaded = TemplateManifest(str(templates_dir), TemplateProcessor())
+    reloaded.list_templates()
+    reloaded.save()
+    (entry_file,) = (templates_dir / ".manifest").iterdir()
+    assert json.loads(entry_file.read_text())["path"] == os.path.join("nested", "b.json")
+
+def test_pickled_entries_are_not_loaded(templates_dir):
+    import pickle
+    marker = templates_dir / "pwned"
+
+    class Payload:
+        def __reduce__(self):
+            return (open, (str(marker), 'w'))
+
+    manifest = TemplateManifest(str(templates_dir), TemplateProcessor())
+    manifest.get(str(templates_dir / "a.json"))
+    manifest.save()
+    (entry_file,) = (templates_dir / ".manifest").iterdir()
+    entry_file.write_bytes(pickle.dumps(Payload()))
+
+    reloaded = TemplateManifest(str(templates_dir), TemplateProcessor())
+    assert reloaded.get(str(templates_dir / "a.json")).placeholders["name"]["type"] == "str"
+    assert reloaded.misses == 1
+    assert not marker.exists()
+
+def test_single_file_manifest_is_replaced(templates_dir):
+    (templates_dir / ".manifest").write_bytes(b"old pickled manifest")
+    manifest = TemplateManifest(str(templates_dir), TemplateProcessor())
+    manifest.get(str(templates_dir / "a.json"))
+    manifest.save()
+    assert len(list((templates_dir / ".manifest").iterdir())) == 1
@@ -104,3 +104,9 @@ def test_extract_placeholders_no_placeholders():
     expected = {}
     result = processor.extract_placeholders(template_text)
     assert result == expected
+
+def test_compile_returns_compiled_template():
+    processor = TemplateProcessor()
+    compiled = processor.compile('{"amount": "<amount:float>", "note": "Paid <amount:float>"}')
+    assert [site.path for site in compiled.sites] == [('amount',), ('note',)]
+    assert compiled.placeholders['amount'] == {'type': 'float', 'options': {}}
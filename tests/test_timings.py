@@ -0,0 +1,92 @@
+import json
+import pstats
+import tracemalloc
+import pytest
+from template_parser.main import run_command
+from template_parser.timings import Timings, profiling
+
+TEMPLATE = {"name": "<name>", "count": "<count:int>", "total": "<total:currency|currency_code=GBP>",
+            "summary": "<count:int> items for <name>"}
+ANSWERS = {'name': 'Ann', 'count': '3', 'total': '12.5'}
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    templates = tmp_path / 'files' / 'templates'
+    templates.mkdir(parents=True)
+    (templates / 'invoice.json').write_text(json.dumps(TEMPLATE))
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr('builtins.input', lambda prompt: ANSWERS[prompt.split("'")[1]])
+    return tmp_path
+
+def test_phases_and_conversions_accumulate():
+    timings = Timings()
+    with timings.phase('read'):
+        pass
+    with timings.phase('read'):
+        pass
+    timings.record_conversion('int', 0.25)
+    timings.record_conversion('int', 0.5)
+    timings.finish()
+
+    data = timings.to_dict()
+    assert data['phases']['read']['calls'] == 2
+    assert data['conversions'] == {'int': {'count': 2, 'seconds': 0.75}}
+    assert data['total_seconds'] >= data['phases']['read']['seconds']
+
+def test_phase_is_recorded_when_it_raises():
+    timings = Timings()
+    with pytest.raises(ValueError):
+        with timings.phase('render'):
+            raise ValueError
+    assert timings.phases['render'][0] == 1
+
+def test_cache_hit_rates():
+    timings = Timings()
+    timings.record_cache('conversions', 3, 1)
+    timings.record_cache('empty', 0, 0)
+    caches = timings.to_dict()['caches']
+    assert caches['conversions']['hit_rate'] == 0.75
+    assert caches['empty']['hit_rate'] is None
+    assert 'empty' not in timings.format()
+
+def test_cprofile_dump(tmp_path):
+    path = tmp_path / 'run.prof'
+    timings = Timings()
+    with profiling('cprofile', str(path), timings):
+        sum(range(1000))
+    assert pstats.Stats(str(path)).total_calls > 0
+    assert timings.profile == {'kind': 'cprofile', 'path': str(path)}
+
+def test_tracemalloc_dump(tmp_path):
+    path = tmp_path / 'run.tracemalloc'
+    timings = Timings()
+    with profiling('tracemalloc', str(path), timings):
+        data = [bytes(1024) for _ in range(1000)]
+    assert timings.profile['peak_bytes'] >= 1024 * 1000
+    assert tracemalloc.Snapshot.load(str(path)).traces
+    assert not tracemalloc.is_tracing()
+    del data
+
+def test_unknown_profiler(tmp_path):
+    with pytest.raises(ValueError):
+        with profiling('perf', str(tmp_path / 'x')):
+            pass
+
+def test_cli_timings_report(workspace, capsys):
+    run_command(['files/templates/invoice.json', '--timings', '--timings-json', 'timings.json'])
+
+    report = json.loads((workspace / 'timings.json').read_text())
+    assert list(report['phases']) == ['setup', 'manifest', 'prompt', 'compile', 'cache check', 'render', 'write',
+                                      'cache save', 'history']
+    assert report['conversions']['int']['count'] == 2
+    assert report['conversions']['currency']['count'] == 1
+    assert report['caches']['conversions'] == {'hits': 1, 'misses': 2, 'hit_rate': pytest.approx(1 / 3)}
+    assert report['caches']['rendered outputs']['misses'] == 1
+    assert 'history' in capsys.readouterr().err
+
+def test_cli_profile(workspace, capsys):
+    run_command(['files/templates/invoice.json', '--profile', 'cprofile', '--timings-json', 'timings.json'])
+
+    assert pstats.Stats(str(workspace / 'template-parser.prof')).total_calls > 0
+    assert json.loads((workspace / 'timings.json').read_text())['profile']['kind'] == 'cprofile'
+    assert 'cprofile profile written to template-parser.prof' in capsys.readouterr().err
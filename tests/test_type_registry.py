@@ -0,0 +1,107 @@
+import json
+import pickle
+import uuid
+import importlib.metadata
+import pytest
+from unittest.mock import MagicMock
+from template_parser import type_registry
+from template_parser.errors import InvalidInputError
+from template_parser.rendering import parse_template, render
+from template_parser.type_registry import PlaceholderType, get_type, register_type, registered_types
+from template_parser.validators import InputValidators
+
+def validate_bool(value):
+    if value.lower() in ('true', 'false', 'yes', 'no'):
+        return True, None
+    return False, "Please enter true or false."
+
+BOOL_TYPE = PlaceholderType('bool', validate_bool, lambda value: value.lower() in ('true', 'yes'), strict=False)
+
+def validate_uuid(value):
+    try:
+        uuid.UUID(value)
+        return True, None
+    except ValueError:
+        return False, "Please enter a UUID."
+
+UUID_TYPE = PlaceholderType('uuid', validate_uuid, uuid.UUID, lambda value, options, locale: str(value), strict=True)
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    monkeypatch.setattr(type_registry, '_types', dict(type_registry._types))
+    monkeypatch.setattr(type_registry, '_fallbacks', {})
+    monkeypatch.setattr(type_registry, '_entry_points_loaded', True)
+    monkeypatch.setattr(InputValidators, 'validators', {})
+
+def test_builtin_types_convert():
+    assert get_type('int').convert('42', {}, 'en_GB') == 42
+    assert get_type('date').convert('05-06-2024', {'format': '%d/%m/%Y'}, 'en_GB') == '05/06/2024'
+    assert get_type('str').validator is InputValidators.validate_non_empty
+    with pytest.raises(ValueError):
+        get_type('date').convert('not a date', {}, 'en_GB')
+
+def test_unknown_type_behaves_like_str():
+    placeholder_type = get_type('colour')
+    assert placeholder_type.name == 'colour'
+    assert placeholder_type.convert('red', {}, 'en_GB') == 'red'
+    assert get_type('colour') is placeholder_type
+
+def test_spec_resolves_type_at_compile_time():
+    register_type(BOOL_TYPE)
+    compiled = parse_template(json.dumps({"active": "<active:bool>"}))
+    assert compiled.sites[0].specs[0].kind is BOOL_TYPE
+    assert render(compiled, {'active': 'Yes'}) == {"active": True}
+    with pytest.raises(InvalidInputError, match='true or false'):
+        render(compiled, {'active': 'maybe'})
+
+def test_strict_type_errors_come_from_the_parser():
+    register_type(UUID_TYPE)
+    compiled = parse_template(json.dumps({"id": "<id:uuid>"}))
+    value = '12345678-1234-5678-1234-567812345678'
+    assert render(compiled, {'id': value.upper()}) == {"id": value}
+    with pytest.raises(InvalidInputError):
+        render(compiled, {'id': 'nope'})
+
+def test_duplicate_registration_is_rejected():
+    with pytest.raises(ValueError):
+        register_type(PlaceholderType('int'))
+    register_type(get_type('int').replace(cacheable=False), replace=True)
+    assert not get_type('int').cacheable
+
+def test_registering_replaces_fallback():
+    fallback = get_type('bool')
+    register_type(BOOL_TYPE)
+    assert get_type('bool') is BOOL_TYPE is not fallback
+
+def test_types_pickle_by_name():
+    register_type(BOOL_TYPE)
+    assert pickle.loads(pickle.dumps(BOOL_TYPE)) is BOOL_TYPE
+    compiled = pickle.loads(pickle.dumps(parse_template(json.dumps({"a": "<a:bool>"}))))
+    assert compiled.sites[0].specs[0].kind is BOOL_TYPE
+
+def test_register_validator_updates_type():
+    InputValidators.register_validator('bool', validate_bool)
+    assert get_type('bool').validator is validate_bool
+    assert InputValidators.get_validator('bool') is validate_bool
+    assert InputValidators.validators == {'bool': validate_bool}
+
+def test_entry_points_are_loaded_on_first_unknown_name(monkeypatch):
+    entry_point = importlib.metadata.EntryPoint('uuid', 'tests.test_type_registry:UUID_TYPE', type_registry.ENTRY_POINT_GROUP)
+    broken = MagicMock()
+    broken.load.side_effect = ImportError('missing dependency')
+    entry_points = MagicMock(return_value=[entry_point, broken])
+    monkeypatch.setattr(importlib.metadata, 'entry_points', entry_points)
+    monkeypatch.setattr(type_registry, '_entry_points_loaded', False)
+
+    assert get_type('int') is type_registry.INTEGER
+    entry_points.assert_not_called()
+    assert get_type('uuid') is UUID_TYPE
+    assert 'uuid' in registered_types()
+    entry_points.assert_called_once_with(group=type_registry.ENTRY_POINT_GROUP)
+
+def test_entry_point_may_be_a_factory(monkeypatch):
+    entry_point = MagicMock()
+    entry_point.load.return_value = lambda: BOOL_TYPE
+    monkeypatch.setattr(importlib.metadata, 'entry_points', MagicMock(return_value=[entry_point]))
+    monkeypatch.setattr(type_registry, '_entry_points_loaded', False)
+    assert get_type('bool') is BOOL_TYPE
@@ -0,0 +1,98 @@
+import os
+import sys
+import json
+import time
+import threading
+import pytest
+from template_parser.watch import InotifyWaiter, PollingWaiter, Watcher, file_signature
+
+@pytest.fixture
+def output_filename_format():
+    return '{template}_{name}.json'
+
+def write(path, text):
+    # Bump the mtime explicitly so changes are seen even on coarse-grained filesystems.
+    previous = file_signature(str(path))
+    path.write_text(text)
+    if previous is not None:
+        os.utime(path, ns=(previous[0] + 10 ** 9, previous[0] + 10 ** 9))
+
+def write_rows(path, rows):
+    write(path, ''.join(json.dumps(row) + '\n' for row in rows))
+
+@pytest.fixture
+def watcher(application, tmp_path):
+    write(tmp_path / 'a.json', json.dumps({"name": "<name>", "age": "<age:int>"}))
+    write(tmp_path / 'b.json', json.dumps({"greeting": "Hi <name>"}))
+    write_rows(tmp_path / 'rows.jsonl', [{'name': 'ann', 'age': '1'}, {'name': 'bob', 'age': '2'}, {'name': 'cy', 'age': '3'}])
+    return Watcher(application, [str(tmp_path / 'a.json'), str(tmp_path / 'b.json')], str(tmp_path / 'rows.jsonl'))
+
+def read_output(tmp_path, name):
+    return json.loads((tmp_path / 'output' / name).read_text())
+
+def test_start_renders_every_template_and_row(watcher, tmp_path):
+    result = watcher.start()
+    assert result.rendered == 6
+    assert read_output(tmp_path, 'a_bob.json') == {"name": "bob", "age": 2}
+    assert read_output(tmp_path, 'b_cy.json') == {"greeting": "Hi cy"}
+
+def test_unchanged_files_render_nothing(watcher, tmp_path):
+    watcher.start()
+    assert watcher.poll().rendered == 0
+    os.utime(tmp_path / 'a.json')
+    assert watcher.poll().rendered == 0
+
+def test_template_change_rerenders_only_that_template(watcher, tmp_path, application):
+    watcher.start()
+    application.config_manager.save_config.reset_mock()
+    write(tmp_path / 'b.json', json.dumps({"greeting": "Hello <name>"}))
+
+    result = watcher.poll()
+
+    assert result.rendered == 3
+    assert read_output(tmp_path, 'b_ann.json') == {"greeting": "Hello ann"}
+    saved = sorted(c.args[0]['output_filename'] for c in application.config_manager.save_config.call_args_list)
+    assert saved == ['b_ann.json', 'b_bob.json', 'b_cy.json']
+
+def test_input_change_rerenders_only_changed_rows(watcher, tmp_path, application):
+    watcher.start()
+    application.config_manager.save_config.reset_mock()
+    write_rows(tmp_path / 'rows.jsonl', [{'name': 'ann', 'age': '1'}, {'name': 'bob', 'age': '20'}, {'name': 'cy', 'age': '3'}])
+
+    result = watcher.poll()
+
+    assert result.rendered == 2
+    assert read_output(tmp_path, 'a_bob.json') == {"name": "bob", "age": 20}
+    saved = sorted(c.args[0]['output_filename'] for c in application.config_manager.save_config.call_args_list)
+    assert saved == ['a_bob.json', 'b_bob.json']
+
+def test_broken_template_keeps_previous_outputs(watcher, tmp_path, application):
+    watcher.start()
+    write(tmp_path / 'a.json', '{"name": ')
+    assert watcher.poll().rendered == 0
+    application.user_interface.display_error.assert_called()
+    assert read_output(tmp_path, 'a_ann.json') == {"name": "ann", "age": 1}
+
+    write(tmp_path / 'a.json', json.dumps({"who": "<name>"}))
+    assert watcher.poll().rendered == 3
+    assert read_output(tmp_path, 'a_ann.json') == {"who": "ann"}
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason="inotify is Linux-only")
+def test_inotify_waiter_wakes_on_change(tmp_path):
+    path = tmp_path / 'a.json'
+    path.write_text('{}')
+    waiter = InotifyWaiter([str(path)])
+    try:
+        timer = threading.Timer(0.1, path.write_text, args=('{"a": 1}',))
+        timer.start()
+        start = time.monotonic()
+        waiter.wait(5)
+        assert time.monotonic() - start < 4
+        timer.join()
+    finally:
+        waiter.close()
+
+def test_polling_waiter_sleeps():
+    start = time.monotonic()
+    PollingWaiter().wait(0.01)
+    assert time.monotonic() - start >= 0.01
@@ -0,0 +1,101 @@
+import os
+import sys
+import json
+import socket
+import subprocess
+import pytest
+from unittest.mock import MagicMock
+from template_parser import zygote
+
+pytestmark = pytest.mark.skipif(not zygote.supported(), reason="the zygote needs fork() and fd passing")
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture
+def environment(tmp_path, monkeypatch):
+    runtime_dir = tmp_path / 'run'
+    runtime_dir.mkdir()
+    monkeypatch.setenv('XDG_RUNTIME_DIR', str(runtime_dir))
+    env = dict(os.environ, XDG_RUNTIME_DIR=str(runtime_dir), PYTHONPATH=PACKAGE_ROOT, TEMPLATE_PARSER_ZYGOTE='1')
+    (tmp_path / 'files' / 'templates').mkdir(parents=True)
+    (tmp_path / 'files' / 'program_config.json').write_text(json.dumps({
+        'required_variables': [], 'output_filename_format': '{name}.json', 'locale': 'en_GB'
+    }))
+    (tmp_path / 'files' / 'templates' / 'person.json').write_text(json.dumps({"name": "<name>", "age": "<age:int>"}))
+    return env
+
+def cli(tmp_path, env, *args, stdin=''):
+    return subprocess.run([sys.executable, '-m', 'template_parser.main', *args], cwd=tmp_path, env=env,
+                          input=stdin, capture_output=True, text=True, timeout=30)
+
+@pytest.fixture
+def running_zygote(tmp_path, environment):
+    assert cli(tmp_path, environment, 'zygote', 'start').returncode == 0
+    yield zygote.request('status')
+    cli(tmp_path, environment, 'zygote', 'stop')
+
+def test_command_runs_in_zygote_with_callers_cwd_and_streams(tmp_path, environment, running_zygote):
+    result = cli(tmp_path, environment, 'files/templates/person.json', stdin='ann\n7\n')
+
+    assert result.returncode == 0
+    assert 'Modified JSON saved to' in result.stdout
+    assert json.loads((tmp_path / 'files' / 'output' / 'ann.json').read_text()) == {'name': 'ann', 'age': 7}
+    assert zygote.request('status')['pid'] == running_zygote['pid']
+
+def test_exit_code_is_returned(tmp_path, environment, running_zygote):
+    result = cli(tmp_path, environment, 'batch', 'missing.json', '--inputs', 'rows.jsonl')
+    assert result.returncode == 2
+    assert "does not exist" in result.stderr
+
+def test_status_and_stop(tmp_path, environment, running_zygote):
+    assert cli(tmp_path, environment, 'zygote', 'status').returncode == 0
+    cli(tmp_path, environment, 'zygote', 'stop')
+    assert zygote.request('status') is None
+    assert cli(tmp_path, environment, 'zygote', 'status').returncode == 1
+
+def test_without_zygote_one_is_spawned_and_caller_runs_command(environment, monkeypatch):
+    spawn = MagicMock()
+    monkeypatch.setattr(zygote, 'spawn_zygote', spawn)
+    assert zygote.run_in_zygote(['--help']) is None
+    spawn.assert_called_once_with()
+
+def test_stale_zygote_refuses_and_exits():
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server_side, client_side = socket.socketpair()
+    read_fd, write_fd = os.pipe()
+    try:
+        zygote._send(client_side, {'argv': [], 'signature': 'old'}, fds=[read_fd, write_fd, write_fd])
+        assert zygote.handle(listener, server_side, 'new') is False
+        assert zygote._receive_code(client_side) == zygote.STALE
+    finally:
+        for sock in (listener, server_side, client_side):
+            sock.close()
+        os.close(read_fd)
+        os.close(write_fd)
+
+def test_header_and_fds_round_trip():
+    left, right = socket.socketpair()
+    read_fd, write_fd = os.pipe()
+    try:
+        header = {'argv': ['batch'], 'env': {'X': 'y' * 100000}}
+        zygote._send(left, header, fds=[write_fd])
+        received, fds = zygote._receive_header(right, max_fds=3)
+        assert received == header
+        assert len(fds) == 1
+        os.write(fds[0], b'ok')
+        os.close(fds[0])
+        assert os.read(read_fd, 2) == b'ok'
+    finally:
+        left.close()
+        right.close()
+        os.close(read_fd)
+        os.close(write_fd)
+
+def test_signature_changes_when_sources_change(tmp_path, monkeypatch):
+    (tmp_path / 'helpers').mkdir()
+    (tmp_path / 'zygote.py').write_text('')
+    (tmp_path / 'helpers' / 'cache.py').write_text('')
+    monkeypatch.setattr(zygote, '__file__', str(tmp_path / 'zygote.py'))
+    before = zygote.code_signature()
+    os.utime(tmp_path / 'helpers' / 'cache.py', ns=(0, 10 ** 19))
+    assert zygote.code_signature() != before